@@ -0,0 +1,51 @@
+'''
+SHARED BY THE TESTS TO CREATE FAKE (BUT REPRODUCIBLE) DATA.
+'''
+import utils.model_generation_engine.array_dataset as ad
+import utils.model_generation_engine.data_preprocessor as dpp
+import utils.model_generation_engine.neural_nets as nn
+
+import numpy as np
+import pandas as pd
+
+
+
+def create_fake_raw_data(n_rows: int = 450, seed: int = 42, start_date: str = "2020-01-01") -> pd.DataFrame:
+    '''
+    Daily random walks from start_date, sorted newest first like the raw datasets.
+    '''
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        "date": pd.date_range(start=start_date, periods=n_rows)[::-1],
+        "price": np.cumprod(1 + rng.normal(0, 0.05, n_rows)) * 100,
+        "market_cap": np.cumprod(1 + rng.normal(0, 0.05, n_rows)) * 1e9,
+        "volume": rng.uniform(1e6, 1e8, n_rows),
+        "fear_greed": rng.integers(1, 100, n_rows).astype(np.float64),
+    })
+
+    return data
+
+
+
+def create_fake_all_features(n_rows: int = 450, seed: int = 7) -> pd.DataFrame:
+    '''
+    Same steps as data_preprocessor.clean_data up until (and including) the raw_all_features dataset, in chronological order.
+    '''
+    data = create_fake_raw_data(n_rows, seed)
+    data = dpp.calculate_SMAs(data)
+    data = dpp.calculate_RSIs(data)
+    data = dpp.calculate_signals(data)
+
+    return data
+
+
+
+def create_fake_dataset(n_rows: int, seed: int) -> ad.ArrayDataset:
+    '''
+    Random features with learnable signals, i.e., given by the first feature.
+    '''
+    rng = np.random.default_rng(seed)
+    features = rng.uniform(0, 1, (n_rows, nn.N_FEATURES))
+    labels = np.digitize(features[:, 0], [0.33, 0.67])
+
+    return ad.ArrayDataset(features, labels)
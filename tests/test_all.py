@@ -2,9 +2,27 @@
 RUN $ python3 -m tests.test_all
 '''
 from . import test_data_aggregator as tda
+from . import test_fetch_engine as tfe
+from . import test_response_cache as trc
+from . import test_dead_letter_store as tdls
+from . import test_http_client as thc
+from . import test_fear_greed_store as tfgs
+from . import test_fetch_planner as tfp
+from . import test_dataset_storage as tds
 from . import test_data_preprocessor as tdpp
+from . import test_normalizer as tnz
+from . import test_indicators as tind
+from . import test_incremental_preprocessor as tipp
+from . import test_streaming_indicators as tsi
 from . import test_data_processor as tdp
+from . import test_model_methods as tmm
+from . import test_model_bank as tmb
+from . import test_sweep_executor as tse
+from . import test_search_scheduler as tss
 from . import test_dataset_methods as tdm
+from . import test_dataset_validator as tdv
+from . import test_array_dataset as tad
+from . import test_augmented_dataset as taud
 from . import test_signal_generator as tsg
 from . import test_risk_adjusted_return_calculator as trarc
 from . import test_portfolio_optimizer as tpo
@@ -13,9 +31,27 @@ from . import test_portfolio_optimizer as tpo
 
 def run_tests():
         tda.run_data_aggregator_tests()
+        tfe.run_fetch_engine_tests()
+        trc.run_response_cache_tests()
+        tdls.run_dead_letter_store_tests()
+        thc.run_http_client_tests()
+        tfgs.run_fear_greed_store_tests()
+        tfp.run_fetch_planner_tests()
+        tds.run_dataset_storage_tests()
         tdpp.run_data_preprocessor_tests()
+        tnz.run_normalizer_tests()
+        tind.run_indicators_tests()
+        tipp.run_incremental_preprocessor_tests()
+        tsi.run_streaming_indicators_tests()
         tdp.run_data_processor_tests()
+        tmm.run_model_methods_tests()
+        tmb.run_model_bank_tests()
+        tse.run_sweep_executor_tests()
+        tss.run_search_scheduler_tests()
         tdm.run_dataset_methods_tests()
+        tdv.run_dataset_validator_tests()
+        tad.run_array_dataset_tests()
+        taud.run_augmented_dataset_tests()
         tsg.run_signal_generator_tests()
         trarc.run_risk_adjusted_return_calculator_tests()
         tpo.run_portfolio_optimzer_tests()
@@ -0,0 +1,45 @@
+'''
+RUN $ python3 -m tests.test_array_dataset
+'''
+import utils.model_generation_engine.array_dataset as ad
+
+import numpy as np
+
+
+
+def test_array_dataset():
+    features = np.arange(12, dtype=np.float64).reshape(4, 3)
+    labels = [0, 1, 2, 1]
+    dataset = ad.ArrayDataset(features, labels)
+
+    # behaves like a list of (features, target) tuples
+    assert len(dataset) == 4, "Failed length in array_dataset test."
+    assert dataset[1][0].tolist() == [3.0, 4.0, 5.0] and dataset[1][1] == 1, "Failed indexing in array_dataset test."
+    assert [int(target) for _, target in dataset] == labels, "Failed iterating in array_dataset test."
+    assert len(dataset[1:3]) == 2 and isinstance(dataset[1:3], ad.ArrayDataset), "Failed slicing in array_dataset test."
+
+    combined = dataset + dataset[:2]
+    assert len(combined) == 6 and combined.labels.tolist() == labels + [0, 1], "Failed concatenating in array_dataset test."
+
+    # rows stay whole when shuffled
+    shuffled = dataset.shuffled(np.random.default_rng(0))
+    assert sorted(shuffled.labels.tolist()) == sorted(labels), "Failed shuffled labels in array_dataset test."
+    for row, target in shuffled:
+        assert labels[int(row[0]) // 3] == target, "Failed shuffled rows in array_dataset test."
+
+    try:
+        ad.ArrayDataset(features, labels[:3])
+        assert False, "Failed to raise on mismatched lengths in array_dataset test."
+    except ValueError:
+        pass
+
+
+
+def run_array_dataset_tests():
+    test_array_dataset()
+    print("test_array_dataset() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_array_dataset_tests()
@@ -0,0 +1,89 @@
+'''
+RUN $ python3 -m tests.test_augmented_dataset
+'''
+import utils.model_generation_engine.dataset_methods as dm
+
+import numpy as np
+import pandas as pd
+import torch
+
+
+
+def create_fake_data(n_rows: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    data = pd.DataFrame(rng.uniform(0.1, 1, (n_rows, 4)), columns=["a", "b", "c", "d"])
+    # unbalanced signals
+    data["signal"] = rng.choice(3, n_rows, p=[0.2, 0.7, 0.1])
+
+    return data
+
+
+
+def test_upsampling():
+    data = create_fake_data()
+    materialized = dm.generate_dataset(data, len(data), 0, 8, seed=0)
+    lazy = dm.generate_lazy_dataset(data, len(data), 0, 8, seed=0)
+
+    # same number of datapoints per epoch, without storing the augmented ones
+    assert len(lazy) == len(materialized), "Failed epoch length in upsampling test."
+    assert lazy.features.shape == (len(data), 4), "Failed base rows only in upsampling test."
+    assert len(dm.generate_lazy_dataset(data, len(data), 0, 512)) == len(dm.generate_dataset(data, len(data), 0, 512)), "Failed large augmentation factor in upsampling test."
+    assert dm.generate_lazy_dataset(data, len(data), 0, 512).features.nbytes == lazy.features.nbytes, "Failed constant memory in upsampling test."
+
+    # the signals are as balanced as in the materialized dataset
+    labels = np.concatenate([batch_labels for _ in range(20) for _, batch_labels in lazy.iter_batches()])
+    expected_frequencies = np.bincount(materialized.labels) / len(materialized)
+    assert np.allclose(np.bincount(labels) / len(labels), expected_frequencies, atol=0.01), "Failed signal frequencies in upsampling test."
+
+
+
+def test_get_batch():
+    data = create_fake_data()
+    lazy = dm.generate_lazy_dataset(data, len(data), 0, 8, seed=0)
+    base_features = data.iloc[:, :-1].to_numpy(dtype=np.float32)
+
+    # copy 0 is the original row, every other copy is jittered
+    features, labels = lazy.get_batch([3, 3 + len(data), 3 + 2*len(data)])
+    assert np.array_equal(features[0], base_features[3]), "Failed original row in get_batch test."
+    assert labels.tolist() == [data["signal"][3]] * 3, "Failed labels in get_batch test."
+    relative_noise = features[1:] / base_features[3] - 1
+    assert np.all(np.abs(relative_noise) <= 1.2e-6) and np.any(relative_noise != 0), "Failed jitter in get_batch test."
+
+    features, label = lazy[3]
+    assert np.array_equal(features, base_features[3]) and label == data["signal"][3], "Failed indexing in get_batch test."
+
+    # seeded mode is reproducible
+    epoch_1 = np.concatenate([features for features, _ in dm.generate_lazy_dataset(data, len(data), 0, 8, seed=1).iter_batches()])
+    epoch_2 = np.concatenate([features for features, _ in dm.generate_lazy_dataset(data, len(data), 0, 8, seed=1).iter_batches()])
+    assert np.array_equal(epoch_1, epoch_2), "Failed seeded epochs in get_batch test."
+
+
+
+def test_data_loader():
+    data = create_fake_data()
+    lazy = dm.generate_lazy_dataset(data, len(data), 0, 4, seed=0)
+    loader = torch.utils.data.DataLoader(lazy, batch_size=64, sampler=lazy.get_sampler())
+
+    n_samples = 0
+    for features, labels in loader:
+        assert features.dtype == torch.float32 and labels.dtype == torch.int64, "Failed dtypes in data_loader test."
+        n_samples += len(labels)
+    assert n_samples == len(lazy), "Failed epoch length in data_loader test."
+
+    # iterating directly, like the training loop does
+    assert sum(1 for _ in dm.shuffle_data(lazy)) == len(lazy), "Failed iterating in data_loader test."
+
+
+
+def run_augmented_dataset_tests():
+    test_upsampling()
+    print("test_upsampling() tests all passed.")
+    test_get_batch()
+    print("test_get_batch() tests all passed.")
+    test_data_loader()
+    print("test_data_loader() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_augmented_dataset_tests()
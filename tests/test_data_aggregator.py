@@ -2,9 +2,15 @@
 RUN $ python3 -m tests.test_data_aggregator
 '''
 import utils.model_generation_engine.data_aggregator as da
+import utils.model_generation_engine.dead_letter_store as dls
+import utils.model_generation_engine.fetch_engine as fe
+import utils.model_generation_engine.response_cache as rc
 
+import json
+import os
+import tempfile
 import time
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
 
 
@@ -56,6 +62,87 @@ def test_extract_basic_data():
 
 
 
+def test_extract_market_chart_data():
+    # recorded market_chart/range response with two datapoints per day and no data on 14-06-2021
+    with open("tests/fixtures/bitcoin_market_chart_range.json") as f:
+        data = json.load(f)
+    dates = ["15-06-2021", "14-06-2021", "13-06-2021", "12-06-2021"]
+    historical_data = da.extract_market_chart_data(data, dates)
+
+    assert [x["date"] for x in historical_data] == dates, "Failed date order in extract_market_chart_data test."
+    assert list(historical_data[0].keys()) == list(da.extract_basic_data({}, dates[0]).keys()), "Failed schema in extract_market_chart_data test."
+    assert historical_data[0]["price"] == 1124902.11, "Failed extract 00:00 price in extract_market_chart_data test."
+    assert historical_data[2]["market_cap"] == 18744103498422.5, "Failed extract 00:00 market cap in extract_market_chart_data test."
+    assert historical_data[3]["volume"] == 1091239815400.7, "Failed extract 00:00 volume in extract_market_chart_data test."
+    assert historical_data[1]["price"] == 0 and historical_data[1]["market_cap"] == 0 and historical_data[1]["volume"] == 0, "Failed missing day in extract_market_chart_data test."
+
+
+
+def test_fetch_historic_data_for_range():
+    # serves one datapoint at 00:00 UTC per day in the requested range
+    calls = []
+    def fake_market_chart(coin, from_timestamp, to_timestamp):
+        calls.append((coin, from_timestamp, to_timestamp))
+        timestamps = range(from_timestamp * 1000, to_timestamp * 1000, 86400000)
+        return {"prices": [[t, t] for t in timestamps], "market_caps": [[t, 2] for t in timestamps], "total_volumes": [[t, 3] for t in timestamps]}
+
+    get_market_chart_by_range = da.get_market_chart_by_range
+    da.get_market_chart_by_range = fake_market_chart
+    try:
+        n_days = da.MARKET_CHART_MAX_DAYS + 10
+        historical_data, missing_dates = da.fetch_historic_data_for_range(["fakecoin", "othercoin"], n_days, start_delta=1)
+    finally:
+        da.get_market_chart_by_range = get_market_chart_by_range
+
+    assert len(calls) == 4, "Failed number of api calls in fetch_historic_data_for_range test."
+    assert missing_dates == {"fakecoin": [], "othercoin": []}, "Failed missing dates in fetch_historic_data_for_range test."
+    assert [x["date"] for x in historical_data["fakecoin"]] == da.get_dates_by_range(n_days, 1), "Failed dates in fetch_historic_data_for_range test."
+    yesterday = date.today() - timedelta(1)
+    assert historical_data["othercoin"][0]["price"] == da.get_unix_timestamp(yesterday) * 1000, "Failed most recent price in fetch_historic_data_for_range test."
+    assert all(x["price"] > 0 and x["volume"] == 3 for x in historical_data["fakecoin"]), "Failed no gaps between chunks in fetch_historic_data_for_range test."
+
+
+
+def test_fetch_historic_data_for_dates():
+    acquired = []
+    class CountingTokenBucket(fe.TokenBucket):
+        async def acquire(self):
+            acquired.append(1)
+            await super().acquire()
+
+    urls = []
+    def fake_get_json(url):
+        urls.append(url)
+        return {"market_data": {"current_price": {"twd": 9}, "market_cap": {"twd": 9}, "total_volume": {"twd": 9}}}
+
+    dates = ["14-06-2021", "15-06-2021", "16-06-2021"]
+    patched = {"api_response_cache": da.api_response_cache, "dead_letters": da.dead_letters, "coingecko_rate_limiter": da.coingecko_rate_limiter, "get_json": da.get_json}
+    with tempfile.TemporaryDirectory() as directory:
+        da.api_response_cache = rc.ResponseCache(os.path.join(directory, "api_responses.sqlite"))
+        da.dead_letters = dls.DeadLetterStore(os.path.join(directory, "dead_letters.json"))
+        da.coingecko_rate_limiter = CountingTokenBucket(da.COINGECKO_CALLS_PER_MINUTE)
+        da.get_json = fake_get_json
+        try:
+            for i, date in enumerate(dates):
+                da.api_response_cache.put(*da.get_historic_data_cache_key("fakecoin", date), {"market_data": {"current_price": {"twd": i}, "market_cap": {"twd": 2}, "total_volume": {"twd": 3}}})
+
+            # a warm cache answers every job without taking a token
+            historical_data, missing_dates = da.fetch_historic_data_for_dates({"fakecoin": dates})
+            assert acquired == [] and urls == [], "Failed warm cache in fetch_historic_data_for_dates test."
+            assert [x["price"] for x in historical_data["fakecoin"]] == [0, 1, 2], "Failed cached data in fetch_historic_data_for_dates test."
+            assert missing_dates == {"fakecoin": []}, "Failed missing dates in fetch_historic_data_for_dates test."
+            assert da.api_response_cache.get_stats() == (3, 0), "Failed hit/miss counts in fetch_historic_data_for_dates test."
+
+            # only the misses take a token
+            historical_data, _ = da.fetch_historic_data_for_dates({"fakecoin": dates + ["17-06-2021"], "othercoin": ["14-06-2021"]})
+            assert len(acquired) == 2 and len(urls) == 2, "Failed misses in fetch_historic_data_for_dates test."
+            assert [x["price"] for x in historical_data["fakecoin"]] == [0, 1, 2, 9], "Failed mixed data in fetch_historic_data_for_dates test."
+        finally:
+            for name, value in patched.items():
+                setattr(da, name, value)
+
+
+
 def run_data_aggregator_tests():
     test_get_time()
     print("test_get_time() tests all passed.")
@@ -63,6 +150,12 @@ def run_data_aggregator_tests():
     print("test_get_correct_date_format() tests all passed.")
     test_extract_basic_data()
     print("test_extract_basic_data() tests all passed.")
+    test_extract_market_chart_data()
+    print("test_extract_market_chart_data() tests all passed.")
+    test_fetch_historic_data_for_range()
+    print("test_fetch_historic_data_for_range() tests all passed.")
+    test_fetch_historic_data_for_dates()
+    print("test_fetch_historic_data_for_dates() tests all passed.")
 
 
 
@@ -2,7 +2,12 @@
 RUN $ python3 -m tests.test_data_preprocessor
 '''
 import utils.model_generation_engine.data_preprocessor as dpp
+import utils.model_generation_engine.data_aggregator as da
+import utils.model_generation_engine.dataset_storage as ds
+import tests.fake_data as fd
 
+import numpy as np
+import os
 import pandas as pd
 
 
@@ -126,6 +131,54 @@ def test_handle_missing_data():
 
 
 
+def fill_gaps_by_loop(values):
+        # the original row-by-row gap filler, used as the reference for fill_gaps
+        filled = values.astype(np.float64)
+        for i in range(values.shape[0]):
+                for column in range(values.shape[1]):
+                        if values[i, column] == 0:
+                                next_non_zero = 0
+                                start_ind = i + 1
+                                while next_non_zero == 0 and start_ind < values.shape[0]:
+                                        next_non_zero += filled[start_ind, column]
+                                        start_ind += 1
+
+                                if i == 0:
+                                        filled[i, column] = next_non_zero
+                                elif next_non_zero > 0:
+                                        filled[i, column] = (filled[i-1, column] + next_non_zero) / 2
+                                else:
+                                        filled[i, column] = filled[i-1, column]
+
+        return filled
+
+
+
+def test_fill_gaps():
+        rng = np.random.default_rng(42)
+        for trial in range(200):
+                n_rows = int(rng.integers(1, 40))
+                n_cols = int(rng.integers(1, 6))
+                values = rng.normal(size=(n_rows, n_cols)) * 1000
+                if trial % 2 == 0:
+                        values = np.round(values)
+                # anywhere from no gaps to only gaps
+                values[rng.random((n_rows, n_cols)) < rng.random()] = 0
+
+                assert np.array_equal(dpp.fill_gaps(values), fill_gaps_by_loop(values)), f"Failed randomized equivalence (trial {trial}) in fill_gaps test."
+
+        # input is left untouched
+        values = np.array([[0.0], [1.0], [0.0]])
+        dpp.fill_gaps(values)
+        assert values.tolist() == [[0.0], [1.0], [0.0]], "Failed input untouched in fill_gaps test."
+
+        # handle_missing_data keeps integer columns integer when the filled values are whole
+        data = pd.DataFrame([['2020-10-01', 1, 1], ['2020-10-02', 0, 0], ['2020-10-03', 3, 2]], columns=["date", 1, 2])
+        data = dpp.handle_missing_data("fakecoin", data, "2020-10-01", "2020-10-03")
+        assert str(data[1].dtype) == "int64" and str(data[2].dtype) == "float64", "Failed column dtypes in fill_gaps test."
+
+
+
 def test_normalize_data():
         # check fear greed are out of 100
         data = [['2020-10-01', 1, 1, 1],
@@ -249,6 +302,36 @@ def test_get_signal_value():
 
 
 
+def test_get_signal_values():
+        percent_deltas = np.array([0, -0.176, 0.151, -0.175, 0.15, np.nan])
+        signals = dpp.get_signal_values(percent_deltas)
+
+        assert signals.tolist() == [dpp.get_signal_value(x) for x in percent_deltas], "Failed same as get_signal_value in get_signal_values test."
+        assert signals.tolist() == [1, 2, 0, 1, 1, 1], "Failed signal values in get_signal_values test."
+        assert dpp.get_signal_values(percent_deltas, 0.1, -0.1).tolist() == [1, 2, 0, 2, 0, 1], "Failed custom thresholds in get_signal_values test."
+
+
+
+def test_calculate_weighted_price_deltas():
+        rng = np.random.default_rng(42)
+        prices = np.exp(rng.normal(size=120).cumsum() * 0.05)
+        interval = 35
+        weighting_constant = dpp.get_weighting_constant(interval)
+
+        # the original row-by-row loop
+        expected = []
+        for ind in range(len(prices) - interval):
+                price_delta_avg = 0.0
+                for days_from_now in range(1, interval+1):
+                        percent_delta = (prices[ind+days_from_now] - prices[ind]) / prices[ind]
+                        price_delta_avg += percent_delta * weighting_constant * days_from_now
+                expected.append(price_delta_avg)
+
+        assert dpp.calculate_weighted_price_deltas(prices, interval).tolist() == expected, "Failed same as loop in calculate_weighted_price_deltas test."
+        assert len(dpp.calculate_weighted_price_deltas(prices[:interval], interval)) == 0, "Failed too few prices in calculate_weighted_price_deltas test."
+
+
+
 def test_get_weighting_constant():
         w_const1 = dpp.get_weighting_constant(4)
         w_const2 = dpp.get_weighting_constant(7)
@@ -294,9 +377,88 @@ def test_calculate_signals():
 
 
 
+def test_preprocess_coins():
+        coins = ["fakecoin", "fakecoin2"]
+        end_date = "2021-03-01"
+        rng = np.random.default_rng(3)
+        for coin in coins:
+                dates = pd.date_range(start="2020-01-01", end=end_date)[::-1]
+                data = pd.DataFrame({
+                        "date": dates.strftime("%Y-%m-%d"),
+                        "price": rng.uniform(1, 100, len(dates)),
+                        "market_cap": rng.uniform(1, 100, len(dates)),
+                        "volume": rng.uniform(1, 100, len(dates)),
+                        "fear_greed": rng.integers(1, 100, len(dates)),
+                })
+                ds.write_dataset(data, f"datasets/raw/{coin}_historical_data_raw.csv")
+
+        try:
+                # fakecoin2 starts before its raw dataset does and is thus still missing dates, which must not be fetched (or retried forever)
+                start_dates = {"fakecoin": "2020-01-01", "fakecoin2": "2019-12-30"}
+                timings = dpp.preprocess_coins(coins, start_dates, end_date, fetch=False, n_workers=2)
+
+                assert set(timings["fakecoin"]) == {"read", "missing_data", "SMAs", "RSIs", "signals", "write_all_features", "normalization", "write_clean"}, "Failed stage timings in preprocess_coins test."
+                assert list(timings["fakecoin2"]) == ["read"], "Failed skipping missing dates in preprocess_coins test."
+                assert not os.path.exists("datasets/clean/fakecoin2_historical_data_clean.csv"), "Failed skipping missing dates in preprocess_coins test."
+
+                raw_data = ds.read_dataset("datasets/raw/fakecoin_historical_data_raw.csv")
+                expected = dpp.clean_data("fakecoin", raw_data, start_dates["fakecoin"], end_date)
+                clean_data = ds.read_dataset("datasets/clean/fakecoin_historical_data_clean.csv")
+                assert clean_data.equals(expected), "Failed clean dataset in preprocess_coins test."
+        finally:
+                for filepath in ["datasets/raw/fakecoin_historical_data_raw.csv", "datasets/raw/fakecoin2_historical_data_raw.csv", "datasets/raw/fakecoin_historical_data_raw_all_features.csv", "datasets/clean/fakecoin_historical_data_clean.csv"]:
+                        if os.path.exists(filepath):
+                                ds.remove_dataset(filepath)
+
+
+
+def test_preprocess_coin_offline():
+        coin = "fakecoin"
+        end_date = "2021-03-01"
+        data = fd.create_fake_raw_data(len(pd.date_range(start="2020-01-01", end=end_date)), seed=4)
+        # fear/greed gaps, which must only be looked up in the stored index
+        data.loc[::7, "fear_greed"] = 0
+        ds.write_dataset(data, f"datasets/raw/{coin}_historical_data_raw.csv")
+
+        calls = []
+        def no_network(*args, **kwargs):
+                calls.append(args)
+                raise ConnectionError("No network in the preprocessing workers.")
+
+        get_json, api_client_get, last_update = da.get_json, da.api_client.get, da.fear_greed_index.last_update
+        da.get_json, da.api_client.get = no_network, no_network
+        # i.e., the store would be due for an update
+        da.fear_greed_index.last_update = 0.0
+        try:
+                message, timings = dpp.preprocess_coin(coin, "2020-01-01", end_date)
+
+                assert calls == [], "Failed no network calls in preprocess_coin_offline test."
+                assert "preprocessed" in message and "write_clean" in timings, "Failed preprocessing in preprocess_coin_offline test."
+                clean_data = ds.read_dataset(f"datasets/clean/{coin}_historical_data_clean.csv")
+                assert not clean_data.isna().any().any(), "Failed filled fear/greed gaps in preprocess_coin_offline test."
+        finally:
+                da.get_json, da.api_client.get, da.fear_greed_index.last_update = get_json, api_client_get, last_update
+                for filepath in [f"datasets/raw/{coin}_historical_data_raw.csv", f"datasets/raw/{coin}_historical_data_raw_all_features.csv", f"datasets/clean/{coin}_historical_data_clean.csv"]:
+                        if os.path.exists(filepath):
+                                ds.remove_dataset(filepath)
+
+
+
+def test_parse_start_dates():
+        start_dates = dpp.parse_start_dates(["bitcoin=2018-02-28", "solana=2020-05-01"])
+
+        assert start_dates["bitcoin"] == "2018-02-28", "Failed new coin in parse_start_dates test."
+        assert start_dates["solana"] == "2020-05-01", "Failed override in parse_start_dates test."
+        assert start_dates["polkadot"] == dpp.START_DATES["polkadot"], "Failed defaults in parse_start_dates test."
+        assert dpp.get_start_date("cardano", start_dates) == dpp.DEFAULT_START_DATE, "Failed default start date in parse_start_dates test."
+
+
+
 def run_data_preprocessor_tests():
         test_handle_missing_data()
         print("test_handle_missing_data() tests all passed.")
+        test_fill_gaps()
+        print("test_fill_gaps() tests all passed.")
         test_normalize_data()
         print("test_normalize_data() tests all passed.")
         test_calculate_price_SMAs()
@@ -305,10 +467,20 @@ def run_data_preprocessor_tests():
         print("test_calculate_fear_greed_SMAs() tests all passed.")
         test_get_signal_value()
         print("test_get_signal_value() tests all passed.")
+        test_get_signal_values()
+        print("test_get_signal_values() tests all passed.")
+        test_calculate_weighted_price_deltas()
+        print("test_calculate_weighted_price_deltas() tests all passed.")
         test_get_weighting_constant()
         print("test_get_weighting_constant() tests all passed.")
         test_calculate_signals()
         print("test_calculate_signals() tests all passed.")
+        test_preprocess_coins()
+        print("test_preprocess_coins() tests all passed.")
+        test_preprocess_coin_offline()
+        print("test_preprocess_coin_offline() tests all passed.")
+        test_parse_start_dates()
+        print("test_parse_start_dates() tests all passed.")
 
 
 
@@ -2,6 +2,14 @@
 RUN $ python3 -m tests.test_data_processor
 '''
 import utils.model_generation_engine.data_processor as dp
+import utils.model_generation_engine.neural_nets as nn
+import tests.fake_data as fd
+
+import numpy as np
+import os
+import tempfile
+import time
+import torch
 
 
 
@@ -17,9 +25,94 @@ def test_terminate_early():
 
 
 
+def get_eta(model: nn.CryptoSoothsayer) -> float:
+    return model.get_optimizer().param_groups[0]["lr"]
+
+
+
+def test_step_scheduler():
+    per_sample_model = nn.create_model(10, 0.0, 0.01, 0.999)
+    batch_model = nn.create_model(10, 0.0, 0.01, 0.999)
+    # no gradients yet, so these steps only keep the scheduler from warning about its order
+    per_sample_model.get_optimizer().step()
+    batch_model.get_optimizer().step()
+    for _ in range(64):
+        per_sample_model.step_scheduler()
+    batch_model.step_scheduler(64)
+
+    # one batch of 64 samples decays eta as much as 64 single-sample steps
+    assert np.isclose(get_eta(per_sample_model), 0.01 * 0.999**64), "Failed per-sample decay in step_scheduler test."
+    assert np.isclose(get_eta(batch_model), get_eta(per_sample_model)), "Failed batch decay in step_scheduler test."
+
+
+
+def test_take_one_batch():
+    torch.manual_seed(0)
+    train_data = fd.create_fake_dataset(1000, 0)
+    valid_data = fd.create_fake_dataset(200, 1)
+    model = nn.create_model(20, 0.0, 0.01, 0.9999)
+    initial_valid_loss, _ = dp.common.validate_model(model, valid_data, np.inf, "")
+
+    for _ in range(5):
+        for features, targets in dp.common.iter_batches(train_data, 50):
+            train_loss = dp.take_one_batch(model, features, targets)
+    final_valid_loss, _ = dp.common.validate_model(model, valid_data, np.inf, "")
+
+    assert np.isfinite(train_loss) and final_valid_loss < 0.75 * initial_valid_loss, "Failed to learn in take_one_batch test."
+    # eta decays per sample, not per batch
+    assert np.isclose(get_eta(model), 0.01 * 0.9999**(5 * len(train_data))), "Failed eta decay in take_one_batch test."
+
+    # the batches cover the dataset in order, the last one holding the remaining samples
+    batches = list(dp.common.iter_batches(train_data, 300))
+    assert [len(targets) for _, targets in batches] == [300, 300, 300, 100], "Failed batch sizes in take_one_batch test."
+    assert np.array_equal(np.concatenate([features for features, _ in batches]), train_data.features), "Failed batch order in take_one_batch test."
+    assert np.array_equal(next(dp.common.iter_batches(list(train_data), 300))[0], train_data.features[:300]), "Failed list dataset in take_one_batch test."
+
+
+
+def test_fully_train():
+    train_data = fd.create_fake_dataset(500, 0)
+    valid_data = fd.create_fake_dataset(100, 1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for per_sample in [False, True]:
+            filepath = os.path.join(tmp_dir, f"model_{per_sample}.pt")
+            model = nn.create_model(20, 0.0, 0.01, 0.9999)
+            final_valid_loss = dp.fully_train(model, (train_data, valid_data), time.time(), filepath, n_epochs=2, batch_size=50, per_sample=per_sample)
+
+            assert np.isfinite(final_valid_loss), f"Failed final validation loss with per_sample = {per_sample} in fully_train test."
+            assert os.path.exists(filepath), f"Failed to save the lowest validation loss model with per_sample = {per_sample} in fully_train test."
+
+
+
+def test_resume_fully_train():
+    torch.manual_seed(0)
+    train_data = fd.create_fake_dataset(200, 0)
+    valid_data = fd.create_fake_dataset(100, 1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = os.path.join(tmp_dir, "model.pt")
+        model = nn.create_model(20, 0.0, 0.01, 0.9999)
+        # no weights beat a validation loss of 0, so the ones at filepath (none here) are kept
+        dp.fully_train(model, (train_data, valid_data), time.time(), filepath, n_epochs=1, batch_size=50, lowest_valid_loss=0.0)
+        assert not os.path.exists(filepath), "Failed keeping better weights in resume_fully_train test."
+
+        dp.fully_train(model, (train_data, valid_data), time.time(), filepath, n_epochs=1, batch_size=50)
+        assert os.path.exists(filepath), "Failed saving the lowest validation loss weights in resume_fully_train test."
+
+
+
 def run_data_processor_tests():
     test_terminate_early()
     print("test_terminate_early() tests all passed.")
+    test_step_scheduler()
+    print("test_step_scheduler() tests all passed.")
+    test_take_one_batch()
+    print("test_take_one_batch() tests all passed.")
+    test_fully_train()
+    print("test_fully_train() tests all passed.")
+    test_resume_fully_train()
+    print("test_resume_fully_train() tests all passed.")
 
 
 
@@ -3,10 +3,14 @@ RUN $ python3 -m tests.test_dataset_methods
 '''
 import utils.model_generation_engine.data_preprocessor as dpp
 import utils.model_generation_engine.dataset_methods as dm
+import utils.model_generation_engine.dataset_storage as ds
+import utils.model_generation_engine.dataset_validator as dv
 import utils.model_generation_engine.neural_nets as nn
 
+import numpy as np
 import os
 import pandas as pd
+import tempfile
 
 
 
@@ -57,6 +61,26 @@ def test_generate_dataset():
     assert len(altered_data[0]) == 2, "2 limit feature/target tuple length test failed"
     assert len(altered_data[0][0]) == nn.N_FEATURES, "2 limit feature vector length test failed."
 
+    # array-native output
+    altered_data = dm.generate_dataset(data, len(data), 0, 10, seed=42)
+    assert altered_data.features.dtype == np.float32 and altered_data.features.flags["C_CONTIGUOUS"], "float32 feature matrix test failed."
+    assert altered_data.labels.dtype == np.int64, "int64 label vector test failed."
+    # each original datapoint (unchanged) is followed by its augmented ones
+    assert altered_data.labels[:31].tolist() == [0]*31 and altered_data.labels[31] == 1, "Augmentation order test failed."
+    assert np.array_equal(altered_data.features[0], np.arange(1, nn.N_FEATURES+1)), "Original datapoint test failed."
+    relative_noise = altered_data.features[1:31] / np.arange(1, nn.N_FEATURES+1, dtype=np.float32) - 1
+    assert np.all(np.abs(relative_noise) <= 1.5e-6) and np.any(relative_noise != 0), "Augmentation noise range test failed."
+
+    # seeded mode is reproducible
+    assert np.array_equal(dm.generate_dataset(data, len(data), 0, 10, seed=42).features, altered_data.features), "Seeded augmentation test failed."
+    assert not np.array_equal(dm.generate_dataset(data, len(data), 0, 10, seed=7).features, altered_data.features), "Differently seeded augmentation test failed."
+
+    # the noise is centred on the original values, like random.uniform's (give or take float32's resolution)
+    big_data = pd.DataFrame(np.ones((1000, nn.N_FEATURES+1)), columns=data.columns)
+    big_data["signal"] = 0
+    noise = dm.generate_dataset(big_data, len(big_data), 0, 10, seed=1).features.astype(np.float64) - 1
+    assert abs(noise.mean()) < 1e-8 and noise.max() <= 1.2e-6 and noise.min() >= -1.2e-6, "Augmentation noise distribution test failed."
+
 
 
 def create_fake_csv():
@@ -82,7 +106,7 @@ def create_fake_csv():
 
 
 def destroy_fake_coin():
-    os.remove("datasets/complete/fakecoin_historical_data_complete.csv")
+    ds.remove_dataset("datasets/complete/fakecoin_historical_data_complete.csv")
 
 
 
@@ -101,6 +125,11 @@ def test_get_datasets():
     assert valid_data[int(len(data)*0.15)-1][0][0] == 1.0, "Failed valid_data value test in get_datasets test."
     assert test_data[int(len(data)*0.15)-1][0][0] == 1.0, "Failed test_data value test in get_datasets test."
 
+    # test lazy 16x augmentation
+    lazy_train_data, _, _ = dm.get_datasets(coin, data_aug_factor=16, lazy=True)
+    assert len(lazy_train_data) == len(train_data), "Failed lazy train_data size test in get_datasets test."
+    assert lazy_train_data.features.shape[0] == len(data)*0.7, "Failed lazy train_data base rows test in get_datasets test."
+
     # test with 0 augmentation
     train_data, valid_data, test_data = dm.get_datasets(coin)
 
@@ -133,6 +162,86 @@ def test_shuffle_data():
 
 
 
+def remove_artifacts_by_loop(data):
+    '''
+    The original cell-by-cell implementation of remove_greater_than_one_artifacts, as a reference.
+    '''
+    count = 0
+    for c in range(1, len(data.columns)):
+        for r in range(1, len(data)-1):
+            former_cell = data.iloc[r-1, c]
+            curr_cell = data.iloc[r, c]
+            latter_cell = data.iloc[r+1, c]
+            if (curr_cell / 10) > former_cell or (curr_cell / 10) > latter_cell:
+                factor = curr_cell // min(former_cell, latter_cell)
+                if factor >= 100:
+                    data.iloc[r, c] = data.iloc[r, c] / 1000
+                elif factor >= 10:
+                    data.iloc[r, c] = data.iloc[r, c] / 100
+                count += 1
+
+    return data, count
+
+
+
+def test_remove_artifacts():
+    rng = np.random.default_rng(11)
+    for trial in range(50):
+        values = rng.uniform(0.01, 1, (60, 3))
+        # spikes by several orders of magnitude, some of them consecutive
+        spikes = rng.random(values.shape) < 0.1
+        values[spikes] *= 10.0 ** rng.integers(1, 5, spikes.sum())
+        data = pd.DataFrame(values, columns=["a", "b", "c"])
+        data.insert(0, "date", pd.date_range(start="2021-01-01", periods=len(values)))
+
+        expected, count = remove_artifacts_by_loop(data.copy())
+        repaired, audit_log = dm.remove_artifacts("fakecoin", data)
+
+        assert repaired.equals(expected), "Failed repairs in remove_artifacts test."
+        assert len(audit_log) == count, "Failed flagged count in remove_artifacts test."
+
+    # audit log
+    data = pd.DataFrame({"date": pd.date_range(start="2021-01-01", periods=4), "price": [0.5, 600.0, 0.4, 0.3]})
+    repaired, audit_log = dm.remove_artifacts("fakecoin", data)
+    assert repaired["price"].tolist() == [0.5, 0.6, 0.4, 0.3], "Failed /1000 correction in remove_artifacts test."
+    assert list(audit_log.columns) == dm.ARTIFACT_AUDIT_COLUMNS, "Failed audit log columns in remove_artifacts test."
+    assert audit_log[["column", "old_value", "new_value", "factor"]].values.tolist() == [["price", 600.0, 0.6, 600.0 // 0.4]], "Failed audit log entry in remove_artifacts test."
+    assert audit_log["date"].iloc[0] == pd.Timestamp("2021-01-02"), "Failed audit log date in remove_artifacts test."
+
+
+
+def test_combine_all_datasets():
+    get_complete_filepath = dm.get_complete_filepath
+    verdict_cache_filepath = dv.VERDICT_CACHE_FILEPATH
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dm.get_complete_filepath = lambda coin: os.path.join(tmp_dir, f"{coin}_historical_data_complete.csv")
+        dv.VERDICT_CACHE_FILEPATH = os.path.join(tmp_dir, "verdicts.json")
+        try:
+            for coin, price in [("fakecoin", 0.1), ("othercoin", 0.2)]:
+                ds.write_dataset(pd.DataFrame({
+                    "date": pd.date_range(start="2021-01-01", periods=5),
+                    "price": np.linspace(price, price + 0.4, 5),
+                    "market_cap": np.full(5, price),
+                    "volume": np.full(5, price),
+                    "signal": [0, 1, 2, 1, 0],
+                }), dm.get_complete_filepath(coin))
+            dm.combine_all_datasets(["fakecoin", "othercoin"])
+            data = ds.read_dataset(dm.get_complete_filepath("all"))
+
+            # newest first, with the dates repeated across coins
+            assert len(data) == 10, "Failed number of rows in combine_all_datasets test."
+            assert data["date"].is_monotonic_decreasing, "Failed date order in combine_all_datasets test."
+            assert sorted(data["market_cap"].tolist()) == [0.1]*5 + [0.2]*5, "Failed coins in combine_all_datasets test."
+
+            # so its dates are only required to be non-increasing
+            assert len(dm.load_data("all", check=True)) == 10, "Failed validation in combine_all_datasets test."
+            assert dv.find_violations(data)["violation"].tolist() == ["date_not_increasing"]*9, "Failed strictly increasing dates in combine_all_datasets test."
+        finally:
+            dm.get_complete_filepath = get_complete_filepath
+            dv.VERDICT_CACHE_FILEPATH = verdict_cache_filepath
+
+
+
 def run_dataset_methods_tests():
     test_generate_dataset()
     print("test_generate_dataset() tests all passed.")
@@ -140,6 +249,10 @@ def run_dataset_methods_tests():
     print("test_get_datasets() tests all passed.")
     test_shuffle_data()
     print("test_shuffle_data() tests all passed.")
+    test_remove_artifacts()
+    print("test_remove_artifacts() tests all passed.")
+    test_combine_all_datasets()
+    print("test_combine_all_datasets() tests all passed.")
 
 
 
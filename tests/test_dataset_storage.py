@@ -0,0 +1,85 @@
+'''
+RUN $ python3 -m tests.test_dataset_storage
+'''
+import utils.model_generation_engine.dataset_storage as ds
+
+import os
+import tempfile
+import time
+import pandas as pd
+
+
+
+def create_fake_data():
+    return pd.DataFrame({
+        "date": ["2022-04-15", "2022-04-14", "2022-04-13"],
+        "price": [1158076.9731953214, 0.1 + 0.2, 1 / 3],
+        "fear_greed": [22.0, 28.0, 31.0],
+    })
+
+
+
+def test_write_and_read_dataset():
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "fakecoin_historical_data_raw.csv")
+        data = create_fake_data()
+        ds.write_dataset(data, filepath)
+
+        assert os.path.exists(filepath), "Failed CSV export in write_and_read_dataset test."
+        assert os.path.exists(ds.get_binary_filepath(filepath)) == ds.BINARY_FORMAT_AVAILABLE, "Failed binary copy in write_and_read_dataset test."
+
+        loaded_data = ds.read_dataset(filepath)
+        assert loaded_data["date"].dtype == "datetime64[ns]", "Failed typed dates in write_and_read_dataset test."
+        assert loaded_data["date"][0] == pd.Timestamp(2022, 4, 15), "Failed date value in write_and_read_dataset test."
+        assert loaded_data["price"].tolist() == data["price"].tolist(), "Failed lossless floats in write_and_read_dataset test."
+
+        # the CSV export is lossless too
+        csv_data = pd.read_csv(filepath, float_precision="round_trip")
+        assert csv_data["price"].tolist() == data["price"].tolist(), "Failed lossless CSV in write_and_read_dataset test."
+        assert csv_data["date"][0] == "2022-04-15", "Failed CSV date format in write_and_read_dataset test."
+
+        assert ds.read_dataset(filepath, columns=["date"]).columns.tolist() == ["date"], "Failed columns in write_and_read_dataset test."
+
+        ds.remove_dataset(filepath)
+        assert not os.path.exists(filepath) and not os.path.exists(ds.get_binary_filepath(filepath)), "Failed remove in write_and_read_dataset test."
+
+
+
+def test_newer_csv():
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "fakecoin_historical_data_raw.csv")
+        ds.write_dataset(create_fake_data(), filepath)
+
+        # a CSV edited after the binary copy was written takes precedence over it
+        time.sleep(0.01)
+        data = create_fake_data()
+        data.loc[0, "price"] = 42.0
+        data.to_csv(filepath, index=False)
+        assert ds.read_dataset(filepath)["price"][0] == 42.0, "Failed newer CSV in newer_csv test."
+        # and it refreshes the binary copy
+        assert ds.is_binary_fresh(filepath) == ds.BINARY_FORMAT_AVAILABLE, "Failed refreshed binary copy in newer_csv test."
+
+
+
+def test_parse_dates():
+    data = pd.DataFrame({"date": ["30-03-2022", "31-03-2022"]})
+    assert ds.parse_dates(data)["date"].tolist() == [pd.Timestamp(2022, 3, 30), pd.Timestamp(2022, 3, 31)], "Failed coingecko format in parse_dates test."
+
+    # normalized dates are not touched
+    data = pd.DataFrame({"date": [0.0, 0.5, 1.0]})
+    assert ds.parse_dates(data)["date"].tolist() == [0.0, 0.5, 1.0], "Failed normalized dates in parse_dates test."
+
+
+
+def run_dataset_storage_tests():
+    test_write_and_read_dataset()
+    print("test_write_and_read_dataset() tests all passed.")
+    test_newer_csv()
+    print("test_newer_csv() tests all passed.")
+    test_parse_dates()
+    print("test_parse_dates() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_dataset_storage_tests()
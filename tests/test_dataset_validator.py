@@ -0,0 +1,99 @@
+'''
+RUN $ python3 -m tests.test_dataset_validator
+'''
+import utils.model_generation_engine.dataset_storage as ds
+import utils.model_generation_engine.dataset_validator as dv
+
+import numpy as np
+import os
+import pandas as pd
+
+
+
+def create_fake_data() -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.date_range(start="2021-01-01", periods=5),
+        "price": [0.1, 0.2, 0.3, 0.4, 0.5],
+        "volume": [0.5, 0.4, 0.3, 0.2, 0.1],
+        "signal": [0, 1, 2, 1, 0],
+    })
+
+
+
+def test_find_violations():
+    data = create_fake_data()
+    assert len(dv.find_violations(data)) == 0, "Failed clean data in find_violations test."
+
+    data.loc[1, "price"] = 3.0
+    data.loc[3, "price"] = 1.5
+    data.loc[2, "volume"] = np.nan
+    data.loc[4, "volume"] = np.inf
+    data.loc[3, "date"] = data.loc[2, "date"]
+    violations = dv.find_violations(data)
+
+    # every violation is reported, not only the first
+    assert violations[["row", "column", "violation"]].values.tolist() == [
+        [1, "price", "greater_than_one"],
+        [2, "volume", "nan"],
+        [3, "price", "greater_than_one"],
+        [3, "date", "date_not_increasing"],
+        [4, "volume", "inf"],
+    ], "Failed violations in find_violations test."
+
+    # the signal may be > 1, but not NaN
+    data = create_fake_data()
+    data["signal"] = data["signal"].astype(np.float64)
+    data.loc[0, "signal"] = np.nan
+    assert dv.find_violations(data)[["row", "column", "violation"]].values.tolist() == [[0, "signal", "nan"]], "Failed signal column in find_violations test."
+
+    try:
+        dv.check_data(pd.DataFrame({"price": [2.0, 0.5, 3.0], "signal": [0, 1, 2]}))
+        assert False, "Failed to raise in find_violations test."
+    except ValueError as e:
+        assert "2 violations" in str(e) and "rows = [0, 2]" in str(e), "Failed report in find_violations test."
+
+
+
+def test_check_dataset():
+    verdict_cache_filepath = dv.VERDICT_CACHE_FILEPATH
+    dv.VERDICT_CACHE_FILEPATH = "datasets/cache/validation/test_verdicts.json"
+    filepath = "datasets/complete/fakecoin_historical_data_complete.csv"
+    data = create_fake_data()
+    ds.write_dataset(data, filepath)
+
+    try:
+        assert not dv.check_dataset(filepath, data), "Failed first validation in check_dataset test."
+        assert dv.check_dataset(filepath, data), "Failed cached verdict in check_dataset test."
+
+        # changed content is validated again
+        data.loc[0, "price"] = 2.0
+        ds.write_dataset(data, filepath)
+        try:
+            dv.check_dataset(filepath, data)
+            assert False, "Failed to raise after change in check_dataset test."
+        except ValueError:
+            pass
+        # failing verdicts are not cached
+        try:
+            dv.check_dataset(filepath, data)
+            assert False, "Failed to raise again in check_dataset test."
+        except ValueError:
+            pass
+    finally:
+        ds.remove_dataset(filepath)
+        if os.path.exists(dv.VERDICT_CACHE_FILEPATH):
+            os.remove(dv.VERDICT_CACHE_FILEPATH)
+        dv.VERDICT_CACHE_FILEPATH = verdict_cache_filepath
+
+
+
+def run_dataset_validator_tests():
+    test_find_violations()
+    print("test_find_violations() tests all passed.")
+    test_check_dataset()
+    print("test_check_dataset() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_dataset_validator_tests()
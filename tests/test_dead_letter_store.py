@@ -0,0 +1,39 @@
+'''
+RUN $ python3 -m tests.test_dead_letter_store
+'''
+import utils.model_generation_engine.dead_letter_store as dls
+
+import os
+import tempfile
+
+
+
+def test_update():
+    with tempfile.TemporaryDirectory() as directory:
+        store = dls.DeadLetterStore(os.path.join(directory, "cache", "dead_letters.json"))
+        assert store.get("fakecoin") == [], "Failed empty store in update test."
+
+        store.update("fakecoin", ["01-10-2020", "02-10-2020"], [])
+        store.update("othercoin", ["01-10-2020"], [])
+        assert store.get("fakecoin") == ["01-10-2020", "02-10-2020"], "Failed adding dates in update test."
+
+        # a rerun that fetches one of them only leaves the other
+        store.update("fakecoin", ["02-10-2020"], ["01-10-2020"])
+        assert store.get("fakecoin") == ["02-10-2020"], "Failed removing dates in update test."
+
+        # persists across runs
+        store = dls.DeadLetterStore(os.path.join(directory, "cache", "dead_letters.json"))
+        store.update("fakecoin", [], ["02-10-2020"])
+        assert store.get("fakecoin") == [], "Failed removing last date in update test."
+        assert store.load() == {"othercoin": ["01-10-2020"]}, "Failed persistence in update test."
+
+
+
+def run_dead_letter_store_tests():
+    test_update()
+    print("test_update() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_dead_letter_store_tests()
@@ -0,0 +1,65 @@
+'''
+RUN $ python3 -m tests.test_fear_greed_store
+'''
+import utils.model_generation_engine.fear_greed_store as fgs
+
+import os
+import tempfile
+from datetime import date, timedelta
+
+
+
+def fake_index(n_days: int):
+    # the api returns the whole history for 0 days; here the whole history is 30 days long
+    n_days = 30 if n_days == 0 else n_days
+    return [{"value": str(i + 1), "timestamp": str(date.today() - timedelta(i))} for i in range(n_days)]
+
+
+
+def test_update():
+    requested = []
+    def fake_fetch(n_days):
+        requested.append(n_days)
+        return fake_index(n_days)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "fear_and_greed_index.csv")
+
+        # empty store fetches the whole history
+        store = fgs.FearGreedStore(filepath, fake_fetch)
+        store.update()
+        assert requested == [0], "Failed whole history in update test."
+        assert store.get(date.today()) == 1 and store.get(date.today() - timedelta(29)) == 30, "Failed lookup in update test."
+        assert store.get(date.today() - timedelta(30)) is None, "Failed unknown date in update test."
+
+        # up to date store does not fetch anything
+        store = fgs.FearGreedStore(filepath, fake_fetch)
+        store.update()
+        assert requested == [0], "Failed up to date in update test."
+
+        # stale store only fetches the days after its newest date
+        with open(filepath, 'r') as f:
+            rows = f.read().splitlines()
+        with open(filepath, 'w') as f:
+            f.write("\n".join([rows[0]] + rows[4:]) + "\n")
+        store = fgs.FearGreedStore(filepath, fake_fetch)
+        assert store.get_newest_date() == date.today() - timedelta(3), "Failed stale newest date in update test."
+        store.update()
+        assert requested == [0, 3], "Failed incremental fetch in update test."
+        assert store.get(date.today() - timedelta(2)) == 3, "Failed incremental lookup in update test."
+
+        # does not check the api again right away
+        store.index = {}
+        store.update()
+        assert requested == [0, 3], "Failed update interval in update test."
+
+
+
+def run_fear_greed_store_tests():
+    test_update()
+    print("test_update() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_fear_greed_store_tests()
@@ -0,0 +1,172 @@
+'''
+RUN $ python3 -m tests.test_fetch_engine
+'''
+import utils.model_generation_engine.fetch_engine as fe
+
+import asyncio
+import threading
+import time
+
+
+
+def test_token_bucket():
+    bucket = fe.TokenBucket(60)
+
+    # the bucket starts with a single token rather than a whole minute's worth
+    assert bucket.reserve() == 0.0, "Failed first token in token_bucket test."
+
+    # an empty bucket refills at one token per second for 60 calls/minute
+    wait = bucket.reserve()
+    assert 0.9 < wait <= 1.0, f"WRONG VALUE: 0.9 < {wait} <= 1.0 | Failed empty bucket in token_bucket test."
+    wait = bucket.reserve()
+    assert 1.9 < wait <= 2.0, f"WRONG VALUE: 1.9 < {wait} <= 2.0 | Failed debt in token_bucket test."
+
+    # a small burst, which idling never refills beyond
+    bucket = fe.TokenBucket(6000, burst=3)
+    waits = [bucket.reserve() for _ in range(3)]
+    assert waits == [0.0]*3, f"WRONG VALUE: {waits} | Failed burst in token_bucket test."
+    time.sleep(0.2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:3] == [0.0]*3 and waits[3] > 0.009, f"WRONG VALUE: {waits} | Failed refill after idling in token_bucket test."
+    assert bucket.get_calls_per_minute() == 6000, "Failed calls per minute in token_bucket test."
+
+
+
+def test_fetch_concurrently():
+    lock = threading.Lock()
+    in_flight = [0, 0] # current, max
+
+    def fake_fetch(coin, date):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[0], in_flight[1])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        if date == "bad":
+            raise Exception("Fake failure.")
+        return {"coin": coin, "date": date}
+
+    jobs = [(coin, str(day)) for coin in ["fakecoin", "othercoin"] for day in range(20)]
+    jobs.append(("fakecoin", "bad"))
+    # a burst as large as the jobs, so that only max_in_flight holds them back
+    results, failed = fe.fetch_concurrently(jobs, fake_fetch, fe.TokenBucket(600, burst=len(jobs)), max_in_flight=8)
+
+    assert len(results) == 40, "Failed number of results in fetch_concurrently test."
+    assert results[("othercoin", "7")] == {"coin": "othercoin", "date": "7"}, "Failed result mapping in fetch_concurrently test."
+    assert failed == [("fakecoin", "bad")], "Failed failed jobs in fetch_concurrently test."
+    assert 1 < in_flight[1] <= 8, f"WRONG VALUE: 1 < {in_flight[1]} <= 8 | Failed max in flight in fetch_concurrently test."
+
+    # nothing to fetch
+    assert fe.fetch_concurrently([], fake_fetch, fe.TokenBucket(600)) == ({}, []), "Failed no jobs in fetch_concurrently test."
+
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code, headers = {}):
+        super().__init__(f"{status_code} error")
+        self.response = FakeResponse(status_code, headers)
+
+
+
+def test_retries():
+    attempts = {}
+    def flaky_fetch(coin, date):
+        attempts[date] = attempts.get(date, 0) + 1
+        if date == "rate_limited" and attempts[date] == 1:
+            raise FakeHTTPError(429, {"Retry-After": "0"})
+        if date == "server_error" and attempts[date] < 3:
+            raise FakeHTTPError(503)
+        if date == "unknown_coin":
+            raise FakeHTTPError(404)
+        if date == "always_down":
+            raise ConnectionError("Connection refused.")
+        return {"date": date}
+
+    jobs = [("fakecoin", x) for x in ["ok", "rate_limited", "server_error", "unknown_coin", "always_down"]]
+    retry_policy = fe.RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01)
+    results, failed = fe.fetch_concurrently(jobs, flaky_fetch, fe.TokenBucket(600), retry_policy=retry_policy)
+
+    assert sorted(x[1] for x in results) == ["ok", "rate_limited", "server_error"], "Failed retried results in retries test."
+    assert failed == [("fakecoin", "unknown_coin"), ("fakecoin", "always_down")], "Failed dead jobs in retries test."
+    assert attempts == {"ok": 1, "rate_limited": 2, "server_error": 3, "unknown_coin": 1, "always_down": 4}, f"WRONG VALUE: {attempts} | Failed number of attempts in retries test."
+
+    # backoff stays within its exponential bounds
+    retry_policy = fe.RetryPolicy(base_delay=1.0, max_delay=5.0)
+    assert all(0 <= retry_policy.get_delay(2) <= 4.0 for _ in range(100)), "Failed exponential delay in retries test."
+    assert all(0 <= retry_policy.get_delay(10) <= 5.0 for _ in range(100)), "Failed max delay in retries test."
+
+    # Retry-After is either seconds or an http date
+    assert fe.get_retry_after(FakeHTTPError(429, {"Retry-After": "30"})) == 30.0, "Failed seconds Retry-After in retries test."
+    assert fe.get_retry_after(FakeHTTPError(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0, "Failed past date Retry-After in retries test."
+    assert fe.get_retry_after(FakeHTTPError(429)) is None, "Failed missing Retry-After in retries test."
+
+    # a 429 without Retry-After pauses the bucket for the very delay the job waits
+    delays = []
+    class RecordingRetryPolicy(fe.RetryPolicy):
+        def get_delay(self, attempt):
+            delays.append(super().get_delay(attempt))
+            return delays[-1]
+
+    attempts.clear()
+    def throttled_fetch(coin, date):
+        attempts[date] = attempts.get(date, 0) + 1
+        if attempts[date] == 1:
+            raise FakeHTTPError(429)
+        return {"date": date}
+
+    results, failed = fe.fetch_concurrently([("fakecoin", "throttled")], throttled_fetch, fe.TokenBucket(600), retry_policy=RecordingRetryPolicy(base_delay=0.001, max_delay=0.01))
+    assert len(results) == 1 and len(delays) == 1, f"WRONG VALUE: {delays} | Failed single delay per 429 in retries test."
+
+
+
+def test_pause():
+    bucket = fe.TokenBucket(60)
+    bucket.pause(5)
+    wait = bucket.reserve()
+    assert 5.9 < wait <= 6.0, f"WRONG VALUE: 5.9 < {wait} <= 6.0 | Failed pause in pause test."
+
+    # many jobs hitting the same 429 pause the bucket once rather than once each
+    bucket = fe.TokenBucket(60)
+    for _ in range(10):
+        bucket.pause(5)
+    wait = bucket.reserve()
+    assert 5.9 < wait <= 6.0, f"WRONG VALUE: 5.9 < {wait} <= 6.0 | Failed overlapping pauses in pause test."
+
+    # a pause that starts while a caller waits for its token also holds that caller back
+    bucket = fe.TokenBucket(600)
+    bucket.reserve()
+    async def acquire_during_pause():
+        start = time.monotonic()
+        task = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        bucket.pause(0.3)
+        await task
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(acquire_during_pause())
+    assert 0.29 < elapsed < 1.0, f"WRONG VALUE: 0.29 < {elapsed} < 1.0 | Failed pause while waiting in pause test."
+
+
+
+def run_fetch_engine_tests():
+    test_token_bucket()
+    print("test_token_bucket() tests all passed.")
+    test_fetch_concurrently()
+    print("test_fetch_concurrently() tests all passed.")
+    test_retries()
+    print("test_retries() tests all passed.")
+    test_pause()
+    print("test_pause() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_fetch_engine_tests()
@@ -0,0 +1,49 @@
+'''
+RUN $ python3 -m tests.test_fetch_planner
+'''
+import utils.model_generation_engine.dataset_storage as ds
+import utils.model_generation_engine.fetch_planner as fp
+
+import pandas as pd
+from datetime import date, timedelta
+
+
+
+def test_get_missing_dates():
+    end_date = date(2021, 6, 14)
+    stored_dates = {date(2021, 6, 8), date(2021, 6, 9), date(2021, 6, 11), date(2021, 6, 13)}
+    missing_dates = fp.get_missing_dates(stored_dates, end_date)
+
+    assert missing_dates == [date(2021, 6, 14), date(2021, 6, 12), date(2021, 6, 10)], "Failed gaps and new days in get_missing_dates test."
+    assert fp.get_missing_dates(stored_dates, date(2021, 6, 13)) == [date(2021, 6, 12), date(2021, 6, 10)], "Failed up to date in get_missing_dates test."
+    assert fp.get_missing_dates(set(), end_date) == [], "Failed no dataset in get_missing_dates test."
+
+
+
+def test_plan_missing_dates():
+    # raw datasets have the most recent date first; yesterday and 3 days ago are missing
+    today = date.today()
+    stored_dates = [today - timedelta(i) for i in [2, 4, 5, 6]]
+    data = pd.DataFrame([[str(x), 1, 1, 1, 50] for x in stored_dates], columns=["date", "price", "market_cap", "volume", "fear_greed"])
+    data.to_csv("datasets/raw/fakecoin_historical_data_raw.csv", index=False)
+
+    try:
+        plan = fp.plan_missing_dates(["fakecoin", "nonexistentcoin"], {"fakecoin": ["01-01-2019"]})
+    finally:
+        ds.remove_dataset("datasets/raw/fakecoin_historical_data_raw.csv")
+
+    expected = [(today - timedelta(i)).strftime("%d-%m-%Y") for i in [0, 1, 3]] + ["01-01-2019"]
+    assert plan == {"fakecoin": expected}, f"WRONG VALUE: {plan} | Failed plan in plan_missing_dates test."
+
+
+
+def run_fetch_planner_tests():
+    test_get_missing_dates()
+    print("test_get_missing_dates() tests all passed.")
+    test_plan_missing_dates()
+    print("test_plan_missing_dates() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_fetch_planner_tests()
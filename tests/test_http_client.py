@@ -0,0 +1,82 @@
+'''
+RUN $ python3 -m tests.test_http_client
+'''
+import utils.model_generation_engine.http_client as hc
+
+import concurrent.futures as cf
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    # keep-alive requires HTTP/1.1
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+
+    def do_GET(self):
+        FixtureHandler.client_ports.add(self.client_address[1])
+        body = json.dumps({"data": [{"value": "42"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+
+def test_get():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/fng/"
+    client = hc.HTTPClient(pool_size=4)
+
+    try:
+        # serial calls reuse a single connection
+        for _ in range(10):
+            assert client.get(url).json()["data"][0]["value"] == "42", "Failed response in get test."
+        assert len(FixtureHandler.client_ports) == 1, f"WRONG VALUE: {len(FixtureHandler.client_ports)} != 1 | Failed keep-alive in get test."
+
+        # threaded calls never open more connections than the pool holds
+        with cf.ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: client.get(url).status_code, range(40)))
+        assert results == [200] * 40, "Failed threaded responses in get test."
+        assert len(FixtureHandler.client_ports) <= 1 + 4, f"WRONG VALUE: {len(FixtureHandler.client_ports)} > 5 | Failed pool size in get test."
+
+        # every call is in the host's histogram
+        host = f"127.0.0.1:{server.server_address[1]}"
+        assert sum(client.get_latencies().get_counts(host)) == 50, "Failed latency histogram in get test."
+        assert host in client.get_latencies().report(), "Failed latency report in get test."
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+
+def test_latency_histogram():
+    histogram = hc.LatencyHistogram([10, 100])
+    histogram.record("fakehost", 0.005)
+    histogram.record("fakehost", 0.010)
+    histogram.record("fakehost", 0.050)
+    histogram.record("fakehost", 1.0)
+
+    assert histogram.get_counts("fakehost") == [2, 1, 1], "Failed buckets in latency_histogram test."
+    assert histogram.get_counts("otherhost") == [0, 0, 0], "Failed unknown host in latency_histogram test."
+
+
+
+def run_http_client_tests():
+    test_get()
+    print("test_get() tests all passed.")
+    test_latency_histogram()
+    print("test_latency_histogram() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_http_client_tests()
@@ -0,0 +1,76 @@
+'''
+RUN $ python3 -m tests.test_incremental_preprocessor
+'''
+import utils.model_generation_engine.data_preprocessor as dpp
+import utils.model_generation_engine.dataset_storage as ds
+import utils.model_generation_engine.incremental_preprocessor as ipp
+import tests.fake_data as fd
+
+import numpy as np
+import os
+
+
+
+def destroy_fake_coin(coin: str) -> None:
+    for filepath in [ipp.get_all_features_filepath(coin), ipp.get_clean_filepath(coin)]:
+        if os.path.exists(filepath):
+            ds.remove_dataset(filepath)
+    if os.path.exists(ipp.get_state_filepath(coin)):
+        os.remove(ipp.get_state_filepath(coin))
+
+
+
+def test_clean_data_incrementally():
+    coin = "fakecoin"
+    raw_data = fd.create_fake_raw_data()
+    start_date = str(raw_data["date"].iloc[-1].date())
+    end_date = str(raw_data["date"].iloc[0].date())
+
+    try:
+        # 1st run has no state, i.e., rebuilds; 2nd run only processes the 5 newest days
+        clean_data = ipp.clean_data_incrementally(coin, raw_data.iloc[5:].reset_index(drop=True), start_date, str(raw_data["date"].iloc[5].date()))
+        assert ipp.load_state(coin)["n_rows"] == len(raw_data) - 5, "Failed state after rebuild in clean_data_incrementally test."
+        # the caller (signal_generator) saves the clean dataset
+        ds.write_dataset(clean_data, ipp.get_clean_filepath(coin))
+        clean_data = ipp.clean_data_incrementally(coin, raw_data, start_date, end_date)
+        ds.write_dataset(clean_data, ipp.get_clean_filepath(coin))
+        all_features = ds.read_dataset(ipp.get_all_features_filepath(coin))
+        state = ipp.load_state(coin)
+
+        expected_clean_data = dpp.clean_data(coin, raw_data.copy(), start_date, end_date)
+        expected_all_features = ds.read_dataset(ipp.get_all_features_filepath(coin))
+
+        assert len(clean_data) == len(expected_clean_data), "Failed length in clean_data_incrementally test."
+        assert list(clean_data.columns) == list(expected_clean_data.columns), "Failed columns in clean_data_incrementally test."
+        assert clean_data["date"].equals(expected_clean_data["date"]), "Failed dates in clean_data_incrementally test."
+        # the signals (including the relabelled ones) are exact
+        assert np.array_equal(clean_data["signal"], expected_clean_data["signal"]), "Failed signals in clean_data_incrementally test."
+        assert np.array_equal(all_features["signal"], expected_all_features["signal"]), "Failed all_features signals in clean_data_incrementally test."
+        # the SMAs' running totals only differ by rounding
+        columns = clean_data.columns[1:-1]
+        assert np.allclose(clean_data[columns].to_numpy(dtype=np.float64), expected_clean_data[columns].to_numpy(dtype=np.float64), rtol=1e-9, atol=1e-12), "Failed clean values in clean_data_incrementally test."
+
+        # nothing new leaves the clean dataset as is
+        ds.write_dataset(all_features, ipp.get_all_features_filepath(coin))
+        assert ipp.is_state_valid(state, raw_data, clean_data), "Failed state after update in clean_data_incrementally test."
+        assert ipp.clean_data_incrementally(coin, raw_data, start_date, end_date).equals(clean_data), "Failed no new rows in clean_data_incrementally test."
+
+        # an already processed row that changed forces a rebuild
+        changed_raw_data = raw_data.copy()
+        changed_raw_data.loc[100, "price"] *= 2
+        assert not ipp.is_state_valid(ipp.load_state(coin), changed_raw_data, expected_clean_data), "Failed changed history in clean_data_incrementally test."
+        clean_data = ipp.clean_data_incrementally(coin, changed_raw_data, start_date, end_date)
+        assert ipp.load_state(coin)["raw_hash"] == ipp.get_raw_hash(changed_raw_data), "Failed rebuild after changed history in clean_data_incrementally test."
+    finally:
+        destroy_fake_coin(coin)
+
+
+
+def run_incremental_preprocessor_tests():
+    test_clean_data_incrementally()
+    print("test_clean_data_incrementally() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_incremental_preprocessor_tests()
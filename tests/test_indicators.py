@@ -0,0 +1,116 @@
+'''
+RUN $ python3 -m tests.test_indicators
+'''
+import utils.model_generation_engine.indicators as ind
+
+import numpy as np
+
+
+
+def calculate_SMA_by_loop(values, window):
+    # the original running total, used as the reference for calculate_SMAs
+    SMA = [0.0] * len(values)
+    total = 0
+    for i in range(len(values)):
+        total += values[i]
+        if window <= i:
+            total -= values[i-window]
+            SMA[i] = total / window
+
+    return SMA
+
+
+
+def test_calculate_SMAs():
+    values = np.arange(1, 41)
+    SMAs = ind.calculate_SMAs(values, [3, 5, 40])
+
+    assert SMAs.shape == (40, 3), "Failed shape in calculate_SMAs test."
+    # zeros before (and at the end of) the first full window
+    assert SMAs[:3, 0].tolist() == [0.0, 0.0, 0.0] and SMAs[3, 0] == (2 + 3 + 4) / 3, "Failed warmup in calculate_SMAs test."
+    assert SMAs[:, 2].tolist() == [0.0] * 40, "Failed window longer than data in calculate_SMAs test."
+    # whole numbers are exact
+    for j, window in enumerate([3, 5, 40]):
+        assert SMAs[:, j].tolist() == calculate_SMA_by_loop(values, window), f"Failed {window}-day SMA in calculate_SMAs test."
+
+    # otherwise equal up to rounding
+    rng = np.random.default_rng(42)
+    values = rng.uniform(1e3, 1e6, size=500)
+    for j, window in enumerate(ind.SMA_WINDOWS["price"]):
+        SMA = ind.calculate_SMAs(values, [window])[:, 0]
+        assert np.allclose(SMA, calculate_SMA_by_loop(values, window), rtol=1e-12, atol=0), f"Failed {window}-day SMA of floats in calculate_SMAs test."
+
+
+
+def test_get_SMA_column_names():
+    names = ind.get_SMA_column_names()
+    assert len(names) == 19, "Failed number of columns in get_SMA_column_names test."
+    assert names[0] == "price_5_SMA" and names[10] == "price_350_SMA" and names[-1] == "fear_greed_30_SMA", "Failed order in get_SMA_column_names test."
+    assert ind.get_SMA_column_names({"price": [20, 400]}) == ["price_20_SMA", "price_400_SMA"], "Failed custom windows in get_SMA_column_names test."
+
+
+
+def calculate_simple_RSI_by_loop(values, period):
+    # the original row-by-row RSI (including its wrap-around first window), used as the reference for calculate_RSI
+    RSI = [0.0] * (period - 1)
+    for end_index in range(period - 1, len(values)):
+        gain = 0
+        loss = 0
+        for i in range(end_index - period, end_index):
+            if values[i+1] > values[i]:
+                gain += values[i+1] - values[i]
+            elif values[i] > values[i+1]:
+                loss += values[i] - values[i+1]
+        rs_value = 0 if loss == 0 else (gain/period) / (loss/period)
+        RSI.append(100.0 - (100.0 / (1.0 + rs_value)))
+
+    return RSI
+
+
+
+def test_calculate_RSI():
+    rng = np.random.default_rng(42)
+    values = rng.normal(size=300).cumsum() + 100
+
+    # the default is bit-identical to the original
+    assert ind.calculate_RSI(values).tolist() == calculate_simple_RSI_by_loop(values, 14), "Failed default RSI in calculate_RSI test."
+    assert ind.calculate_RSI(values, 7).tolist() == calculate_simple_RSI_by_loop(values, 7), "Failed 7-day RSI in calculate_RSI test."
+    # NOTE: the first window wraps around to the last value, so it does have a loss
+    assert ind.calculate_RSI(np.arange(20.0))[14:].tolist() == [0.0] * 6, "Failed no losses in calculate_RSI test."
+
+    # wilder smoothing
+    period = 14
+    RSI = ind.calculate_RSI(values, period, "wilder")
+    changes = np.diff(values)
+    gains, losses = np.maximum(changes, 0), np.maximum(-changes, 0)
+    avg_gain, avg_loss = gains[:period].mean(), losses[:period].mean()
+    expected = [100.0 - 100.0 / (1.0 + avg_gain / avg_loss)]
+    for t in range(period, len(changes)):
+        avg_gain = (avg_gain * (period - 1) + gains[t]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[t]) / period
+        expected.append(100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+    assert RSI[:period].tolist() == [0.0] * period, "Failed wilder warmup in calculate_RSI test."
+    assert np.allclose(RSI[period:], expected, rtol=1e-12), "Failed wilder smoothing in calculate_RSI test."
+    assert ind.calculate_RSI(np.arange(20.0), mode="wilder")[-1] == 100.0, "Failed wilder no losses in calculate_RSI test."
+
+    try:
+        ind.calculate_RSI(values, mode="cutler")
+        assert False, "Failed unknown mode in calculate_RSI test."
+    except ValueError:
+        pass
+
+
+
+def run_indicators_tests():
+    test_calculate_SMAs()
+    print("test_calculate_SMAs() tests all passed.")
+    test_get_SMA_column_names()
+    print("test_get_SMA_column_names() tests all passed.")
+    test_calculate_RSI()
+    print("test_calculate_RSI() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_indicators_tests()
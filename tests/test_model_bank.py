@@ -0,0 +1,94 @@
+'''
+RUN $ python3 -m tests.test_model_bank
+'''
+import utils.model_generation_engine.model_bank as mb
+import utils.model_generation_engine.data_processor as dp
+import utils.model_generation_engine.neural_nets as nn
+import tests.fake_data as fd
+
+import numpy as np
+import os
+import tempfile
+import time
+import torch
+
+
+
+def test_same_as_single_models():
+    etas, eta_decays = [0.01, 0.003, 0.02], [0.999, 0.9999, 0.99]
+    data = fd.create_fake_dataset(400, 0)
+
+    torch.manual_seed(0)
+    bank = mb.ModelBank(8, etas, eta_decays, [0.0, 0.0, 0.0])
+    models = [bank.get_model(model_ind) for model_ind in range(len(bank))]
+
+    for _ in range(3):
+        for features, targets in dp.common.iter_batches(data, 50):
+            bank_losses = bank.take_one_batch(features, targets)
+            model_losses = [dp.take_one_batch(model, features, targets) for model in models]
+            assert np.allclose(bank_losses, model_losses, atol=1e-5), "Failed training losses in same_as_single_models test."
+
+    # each model of the bank trained exactly as it would have on its own
+    for model_ind, model in enumerate(models):
+        for name, weights in bank.get_state_dict(model_ind).items():
+            assert torch.allclose(weights, model.state_dict()[name], atol=1e-5), f"Failed {name} of model {model_ind} in same_as_single_models test."
+        assert np.isclose(bank.get_eta(model_ind), model.get_optimizer().param_groups[0]["lr"]), f"Failed eta of model {model_ind} in same_as_single_models test."
+
+    # and validates the same
+    valid_data = fd.create_fake_dataset(100, 1)
+    assert np.allclose(bank.validate(*dp.common.convert_dataset_to_tensors(bank, valid_data)), [dp.common.validate_model(model, valid_data, np.inf, "")[0] for model in models], atol=1e-5), "Failed validation losses in same_as_single_models test."
+
+
+
+def test_freeze():
+    torch.manual_seed(0)
+    bank = mb.ModelBank(8, [0.01, 0.01], [0.999, 0.999], [0.5, 0.2])
+    data = fd.create_fake_dataset(100, 0)
+    frozen_state = bank.get_state_dict(1)
+
+    bank.freeze(1)
+    bank.take_one_batch(data.features, data.labels)
+
+    for name, weights in bank.get_state_dict(1).items():
+        assert torch.equal(weights, frozen_state[name]), "Failed frozen weights in freeze test."
+    assert bank.get_eta(1) == 0.01 and bank.get_eta(0) < 0.01, "Failed frozen eta in freeze test."
+    assert not torch.equal(bank.get_state_dict(0)["layer_1.weight"], bank.get_state_dict(1)["layer_1.weight"]), "Failed active model in freeze test."
+
+    try:
+        mb.ModelBank(8, [0.01, 0.01], [0.999], [0.5, 0.2])
+        assert False, "Failed to raise on mismatched hyperparameters in freeze test."
+    except ValueError:
+        pass
+
+
+
+def test_fully_train_bank():
+    torch.manual_seed(0)
+    bank = mb.ModelBank(20, [0.01, 0.03], [0.9999, 0.9999], [0.0, 0.1])
+    train_data = fd.create_fake_dataset(500, 0)
+    valid_data = fd.create_fake_dataset(100, 1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepaths = [os.path.join(tmp_dir, f"model_{model_ind}.pt") for model_ind in range(len(bank))]
+        final_valid_losses = dp.fully_train_bank(bank, (train_data, valid_data), time.time(), filepaths, n_epochs=2, batch_size=50)
+
+        assert len(final_valid_losses) == 2 and np.all(np.isfinite(final_valid_losses)), "Failed final validation losses in fully_train_bank test."
+        for filepath in filepaths:
+            # an ordinary CryptoSoothsayer loads the lowest validation loss weights
+            model = nn.create_model(20, 0.0, 0.01, 0.9999)
+            model.load_state_dict(torch.load(filepath))
+
+
+
+def run_model_bank_tests():
+    test_same_as_single_models()
+    print("test_same_as_single_models() tests all passed.")
+    test_freeze()
+    print("test_freeze() tests all passed.")
+    test_fully_train_bank()
+    print("test_fully_train_bank() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_model_bank_tests()
@@ -0,0 +1,112 @@
+'''
+RUN $ python3 -m tests.test_model_methods
+'''
+import utils.model_generation_engine.model_methods as mm
+import utils.model_generation_engine.array_dataset as ad
+import utils.model_generation_engine.neural_nets as nn
+import utils.model_generation_engine.data_processor as dp
+import tests.fake_data as fd
+
+import numpy as np
+import os
+import tempfile
+import torch
+
+
+
+def evaluate_per_sample(model: nn.CryptoSoothsayer, test_data: ad.ArrayDataset) -> list:
+    '''
+    The four buckets as the original per-sample loop counted them.
+    '''
+    counts = [0, 0, 0, 0]
+    for features, target in test_data:
+        with torch.no_grad():
+            decision = torch.argmax(model(torch.tensor(np.array([features]))), dim=1).item()
+        if decision == target:
+            counts[0] += 1
+        elif (target > 1 and decision < 1) or (target < 1 and decision > 1):
+            counts[3] += 1
+        elif target == 1:
+            counts[2] += 1
+        else:
+            counts[1] += 1
+
+    return [count / len(test_data) for count in counts]
+
+
+
+def test_evaluate_model():
+    torch.manual_seed(0)
+    data = fd.create_fake_dataset(300, 2)
+
+    for hidden_layer_size in [5, 20]:
+        model = nn.create_model(hidden_layer_size, 0.0, 0.01, 0.999)
+        model_accuracy = mm.evaluate_model(model, data)
+
+        assert model_accuracy == evaluate_per_sample(model, data), "Failed same buckets as the per-sample loop in evaluate_model test."
+        assert np.isclose(sum(model_accuracy), 1.0), "Failed buckets summing to 1 in evaluate_model test."
+
+    # a list of (features, target) tuples gives the same numbers
+    assert mm.evaluate_model(model, list(data)) == model_accuracy, "Failed list dataset in evaluate_model test."
+
+
+
+def test_validate_model():
+    torch.manual_seed(0)
+    data = fd.create_fake_dataset(300, 2)
+    model = nn.create_model(20, 0.5, 0.01, 0.999)
+
+    expected_loss = 0.0
+    model.eval()
+    for features, target in data:
+        with torch.no_grad():
+            expected_loss += model.get_criterion()(model(torch.tensor(np.array([features]))), torch.tensor([target])).item()
+    expected_loss /= len(data)
+
+    valid_loss, lowest_valid_loss = mm.validate_model(model, data, 0.5, "")
+    assert np.isclose(valid_loss, expected_loss, rtol=1e-5) and lowest_valid_loss == 0.5, "Failed average loss in validate_model test."
+
+    # the tensors are built once per dataset
+    assert data.get_tensors(model.get_device()) is data.get_tensors(model.get_device()), "Failed cached tensors in validate_model test."
+    assert np.isclose(mm.validate_model(model, list(data), 0.5, "")[0], valid_loss), "Failed list dataset in validate_model test."
+
+
+
+def test_training_state():
+    torch.manual_seed(0)
+    data = fd.create_fake_dataset(300, 2)
+    model = nn.create_model(20, 0.0, 0.01, 0.999)
+    for features, targets in dp.common.iter_batches(data, 50):
+        dp.take_one_batch(model, features, targets)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = os.path.join(tmp_dir, "model_state.pt")
+        mm.save_training_state(model, 0.75, filepath)
+        resumed_model = nn.create_model(20, 0.0, 0.01, 0.999)
+        lowest_valid_loss = mm.load_training_state(resumed_model, filepath)
+
+    assert lowest_valid_loss == 0.75, "Failed lowest validation loss in training_state test."
+    # the decayed eta, not the initial one
+    assert np.isclose(resumed_model.get_optimizer().param_groups[0]["lr"], 0.01 * 0.999**len(data)), "Failed decayed eta in training_state test."
+
+    # training goes on exactly as if it had never stopped
+    for features, targets in dp.common.iter_batches(data, 50):
+        dp.take_one_batch(model, features, targets)
+        dp.take_one_batch(resumed_model, features, targets)
+    for name, weights in model.state_dict().items():
+        assert torch.allclose(weights, resumed_model.state_dict()[name]), f"Failed resumed {name} in training_state test."
+
+
+
+def run_model_methods_tests():
+    test_evaluate_model()
+    print("test_evaluate_model() tests all passed.")
+    test_validate_model()
+    print("test_validate_model() tests all passed.")
+    test_training_state()
+    print("test_training_state() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_model_methods_tests()
@@ -0,0 +1,62 @@
+'''
+RUN $ python3 -m tests.test_normalizer
+'''
+import utils.model_generation_engine.normalizer as nz
+
+import numpy as np
+
+
+
+def test_normalize_min_max():
+    values = np.array([[2.0, 5.0, 0.0], [4.0, 5.0, 0.0], [3.0, 5.0, -1.0], [1.0, 5.0, 0.0]])
+    normalized = nz.normalize_min_max(values)
+
+    # first row only has itself as history
+    assert normalized[0].tolist() == [1.0, 1.0, 1.0], "Failed first row in normalize_min_max test."
+    # running max and min, not the whole column's
+    assert normalized[:, 0].tolist() == [1.0, 1.0, 0.5, 0.0], "Failed causality in normalize_min_max test."
+    # constant non-zero column
+    assert normalized[:, 1].tolist() == [1.0, 1.0, 1.0, 1.0], "Failed constant column guard in normalize_min_max test."
+    # max of zero
+    assert normalized[:, 2].tolist() == [1.0, 0.0, 0.0, 0.5], "Failed zero max guard in normalize_min_max test."
+
+    # single row only has the guards
+    assert nz.normalize_min_max(np.array([[3.0, 0.0]])).tolist() == [[1.0, 0.0]], "Failed single row in normalize_min_max test."
+
+
+
+def test_transform_row():
+    rng = np.random.default_rng(42)
+    values = rng.normal(size=(50, 4)) * 100
+    values[10:20, 1] = 0
+    columns = ["price", "volume", "fear_greed", "fear_greed_3_SMA"]
+
+    normalized = nz.CausalNormalizer(columns).fit_transform(values)
+    assert np.array_equal(normalized[:, 2:], values[:, 2:] / 100), "Failed fear_greed scaling in transform_row test."
+
+    # row by row gives the same as the whole history, apart from the first row
+    normalizer = nz.CausalNormalizer(columns)
+    rows = np.array([normalizer.transform_row(row) for row in values])
+    assert np.array_equal(rows[1:], normalized[1:]), "Failed row by row in transform_row test."
+
+    # and can pick up where the whole history left off
+    normalizer = nz.CausalNormalizer(columns)
+    normalizer.fit_transform(values[:30])
+    state = normalizer.get_state()
+    normalizer = nz.CausalNormalizer(columns)
+    normalizer.set_state(state)
+    rows = np.array([normalizer.transform_row(row) for row in values[30:]])
+    assert np.array_equal(rows, normalized[30:]), "Failed restored state in transform_row test."
+
+
+
+def run_normalizer_tests():
+    test_normalize_min_max()
+    print("test_normalize_min_max() tests all passed.")
+    test_transform_row()
+    print("test_transform_row() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_normalizer_tests()
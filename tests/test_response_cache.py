@@ -0,0 +1,60 @@
+'''
+RUN $ python3 -m tests.test_response_cache
+'''
+import utils.model_generation_engine.response_cache as rc
+
+import os
+import tempfile
+
+
+
+def test_get_or_fetch():
+    calls = []
+    def fake_fetch():
+        calls.append(1)
+        return {"market_data": len(calls)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        filepath = os.path.join(directory, "cache", "api_responses.sqlite")
+        cache = rc.ResponseCache(filepath)
+
+        # past dates never expire
+        assert cache.get_or_fetch("history", "fakecoin", "14-06-2021", fake_fetch) == {"market_data": 1}, "Failed first fetch in get_or_fetch test."
+        assert cache.get_or_fetch("history", "fakecoin", "14-06-2021", fake_fetch) == {"market_data": 1}, "Failed cached response in get_or_fetch test."
+        assert cache.get_stats() == (1, 1), "Failed hit/miss counts in get_or_fetch test."
+
+        # the key includes the endpoint, coin, and date
+        cache.get_or_fetch("history", "othercoin", "14-06-2021", fake_fetch)
+        cache.get_or_fetch("history", "fakecoin", "15-06-2021", fake_fetch)
+        cache.get_or_fetch("market_chart", "fakecoin", "14-06-2021", fake_fetch)
+        assert len(calls) == 4, "Failed distinct keys in get_or_fetch test."
+
+        # expired responses are fetched again
+        cache.get_or_fetch("history", "fakecoin", "today", fake_fetch, ttl=-1)
+        cache.get_or_fetch("history", "fakecoin", "today", fake_fetch, ttl=-1)
+        assert len(calls) == 6, "Failed expired response in get_or_fetch test."
+
+        # failed fetches are not cached
+        def failing_fetch():
+            raise Exception("429 Too Many Requests")
+        try:
+            cache.get_or_fetch("history", "fakecoin", "16-06-2021", failing_fetch)
+        except Exception:
+            pass
+        assert cache.get("history", "fakecoin", "16-06-2021") is None, "Failed failing fetch in get_or_fetch test."
+
+        # persists across runs
+        new_cache = rc.ResponseCache(filepath)
+        assert new_cache.get_or_fetch("history", "fakecoin", "14-06-2021", fake_fetch) == {"market_data": 1}, "Failed persistence in get_or_fetch test."
+        assert new_cache.get_stats() == (1, 0), "Failed new hit/miss counts in get_or_fetch test."
+
+
+
+def run_response_cache_tests():
+    test_get_or_fetch()
+    print("test_get_or_fetch() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_response_cache_tests()
@@ -0,0 +1,99 @@
+'''
+RUN $ python3 -m tests.test_search_scheduler
+'''
+import utils.model_generation_engine.search_scheduler as ss
+
+import numpy as np
+
+
+
+def create_fake_grid(n_configs: int) -> list:
+    return [{"model_number": model_number, "eta": 0.001 * (model_number + 1)} for model_number in range(n_configs)]
+
+
+
+class FakeRungRunner:
+    '''
+    The validation loss of a config is its eta (i.e., the lower model_number the better), and every call is logged.
+    '''
+    def __init__(self):
+        self.calls = []
+
+
+    def __call__(self, configs: list, n_epochs: int, resume: bool, is_last_rung: bool) -> dict:
+        self.calls.append(([config["model_number"] for config in configs], n_epochs, resume, is_last_rung))
+
+        return {config["model_number"]: config["eta"] for config in configs}
+
+
+
+def test_get_rung_budgets():
+    assert ss.get_rung_budgets(1, 27, 3) == [1, 3, 9, 27], "Failed powers of the reduction factor in get_rung_budgets test."
+    assert ss.get_rung_budgets(1, 20, 3) == [1, 3, 9, 20], "Failed capped last rung in get_rung_budgets test."
+    assert ss.get_rung_budgets(5, 5, 3) == [5], "Failed single rung in get_rung_budgets test."
+
+
+
+def test_successive_halving():
+    grid = create_fake_grid(81)
+    np.random.default_rng(0).shuffle(grid)
+    run_rung = FakeRungRunner()
+    valid_losses = ss.successive_halving(grid, run_rung, 1, 27, 3)
+
+    # 81 configs for 1 epoch, the best 27 for 2 more, the best 9 for 6 more and the best 3 for the last 18
+    assert [len(model_numbers) for model_numbers, _, _, _ in run_rung.calls] == [81, 27, 9, 3], "Failed promotions in successive_halving test."
+    assert [n_epochs for _, n_epochs, _, _ in run_rung.calls] == [1, 2, 6, 18], "Failed epochs per rung in successive_halving test."
+    assert [resume for _, _, resume, _ in run_rung.calls] == [False, True, True, True], "Failed resuming in successive_halving test."
+    assert [is_last_rung for _, _, _, is_last_rung in run_rung.calls] == [False, False, False, True], "Failed last rung in successive_halving test."
+    assert sorted(valid_losses) == [0, 1, 2], "Failed best configs in successive_halving test."
+
+    # a ninth of the epochs of training every config for 27 epochs
+    total_epochs = sum(len(model_numbers) * n_epochs for model_numbers, n_epochs, _, _ in run_rung.calls)
+    assert total_epochs == 81 + 27*2 + 9*6 + 3*18 and total_epochs * 9 == 81 * 27, "Failed total budget in successive_halving test."
+
+    # diverged configs are never promoted
+    grid = create_fake_grid(3)
+    grid[0]["eta"] = np.nan
+    assert list(ss.successive_halving(grid, FakeRungRunner(), 1, 3, 3)) == [1], "Failed NaN loss in successive_halving test."
+
+
+
+def test_hyperband():
+    run_rung = FakeRungRunner()
+    valid_losses = ss.hyperband(ss.GridSampler(create_fake_grid(1000)), run_rung, 1, 9, 3)
+
+    # brackets starting 9 configs on 1 epoch, 5 on 3 epochs and 3 on 9 epochs, each with its own configs
+    first_rungs = [model_numbers for model_numbers, _, resume, _ in run_rung.calls if not resume]
+    assert [len(model_numbers) for model_numbers in first_rungs] == [9, 5, 3], "Failed configs per bracket in hyperband test."
+    assert len(set(sum(first_rungs, []))) == 17, "Failed new configs per bracket in hyperband test."
+    assert sorted(valid_losses) == [0, 9, 14, 15, 16], "Failed best configs of every bracket in hyperband test."
+
+
+
+def test_samplers():
+    sampler = ss.GridSampler(create_fake_grid(5))
+    assert [config["model_number"] for config in sampler.sample(3)] == [0, 1, 2] and len(sampler) == 2, "Failed grid order in samplers test."
+    assert len(sampler.sample(3)) == 2 and sampler.sample(3) == [], "Failed exhausted grid in samplers test."
+
+    sampler = ss.RandomSampler({"eta": (0.001, 0.01), "dropout": (0.1, 0.5)}, seed=0)
+    configs = sampler.sample(100) + sampler.sample(10)
+    assert [config["model_number"] for config in configs] == list(range(110)), "Failed numbering in samplers test."
+    assert all(0.001 <= config["eta"] <= 0.01 and 0.1 <= config["dropout"] <= 0.5 for config in configs), "Failed ranges in samplers test."
+    assert configs[:100] == ss.RandomSampler({"eta": (0.001, 0.01), "dropout": (0.1, 0.5)}, seed=0).sample(100), "Failed seeded draws in samplers test."
+
+
+
+def run_search_scheduler_tests():
+    test_get_rung_budgets()
+    print("test_get_rung_budgets() tests all passed.")
+    test_successive_halving()
+    print("test_successive_halving() tests all passed.")
+    test_hyperband()
+    print("test_hyperband() tests all passed.")
+    test_samplers()
+    print("test_samplers() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_search_scheduler_tests()
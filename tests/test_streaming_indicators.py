@@ -0,0 +1,129 @@
+'''
+RUN $ python3 -m tests.test_streaming_indicators
+'''
+import utils.model_generation_engine.data_preprocessor as dpp
+import utils.model_generation_engine.dataset_storage as ds
+import utils.model_generation_engine.neural_nets as nn
+import utils.model_generation_engine.streaming_indicators as si
+import tests.fake_data as fd
+
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+
+
+
+def test_update():
+    all_features = fd.create_fake_all_features()
+    clean_data = dpp.normalize_data(all_features)
+    feature_columns = si.get_feature_columns()
+    assert len(feature_columns) == nn.N_FEATURES, "Failed number of features in update test."
+    assert feature_columns == [c for c in all_features.columns[1:-1] if c != "RSI"], "Failed feature order in update test."
+
+    # seeded with the first 400 days, streamed the last 50
+    n_seeded = 400
+    streaming_indicators = si.StreamingIndicators.from_history(all_features.iloc[:n_seeded])
+    assert np.array_equal(streaming_indicators.features, clean_data[feature_columns].iloc[n_seeded-1].to_numpy(dtype=np.float64)), "Failed seeded features in update test."
+
+    raw_features = []
+    features = []
+    for row in all_features[si.BASIC_COLUMNS].iloc[n_seeded:].to_numpy():
+        features.append(streaming_indicators.update(*row))
+        raw_features.append(streaming_indicators.raw_features)
+    raw_features = np.array(raw_features)
+    features = np.array(features)
+
+    expected_raw_features = all_features[si.get_raw_feature_columns()].iloc[n_seeded:].to_numpy(dtype=np.float64)
+    # the RSI is exact; the SMAs' running sums only differ by rounding
+    assert np.array_equal(raw_features[:, -1], expected_raw_features[:, -1]), "Failed RSI in update test."
+    assert np.allclose(raw_features, expected_raw_features, rtol=1e-12), "Failed raw features in update test."
+    assert np.allclose(features, clean_data[feature_columns].iloc[n_seeded:].to_numpy(dtype=np.float64), rtol=1e-9, atol=1e-12), "Failed features in update test."
+
+    # streamed from the first day gives the same once the RSI's wrap-around first window is behind us
+    streaming_indicators = si.StreamingIndicators()
+    raw_features = []
+    for row in all_features[si.BASIC_COLUMNS].to_numpy():
+        streaming_indicators.update(*row)
+        raw_features.append(streaming_indicators.raw_features)
+    raw_features = np.array(raw_features)
+    expected_raw_features = all_features[si.get_raw_feature_columns()].to_numpy(dtype=np.float64)
+    assert np.allclose(raw_features[14:], expected_raw_features[14:], rtol=1e-12), "Failed streaming from scratch in update test."
+
+
+
+def test_fill_observation():
+    streaming_indicators = si.StreamingIndicators()
+    streaming_indicators.update(10.0, 20.0, 30.0, 40.0)
+    streaming_indicators.update(0, np.nan, 35.0, 0)
+
+    assert streaming_indicators.raw_features[:4].tolist() == [10.0, 20.0, 35.0, 40.0], "Failed carrying forward missing values in fill_observation test."
+    assert streaming_indicators.n_rows == 2, "Failed row count in fill_observation test."
+
+
+
+def test_get_streaming_indicators():
+    all_features = fd.create_fake_all_features()
+    clean_data = dpp.normalize_data(all_features)
+    feature_columns = si.get_feature_columns()
+    days = all_features["date"]
+    state_directory = si.STATE_DIRECTORY
+    get_all_features_filepath = si.get_all_features_filepath
+    from_history = si.StreamingIndicators.from_history
+    n_seeded = []
+    def counting_from_history(cls, data):
+        n_seeded.append(len(data))
+        return from_history(data)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        si.STATE_DIRECTORY = tmp_dir
+        si.get_all_features_filepath = lambda coin: os.path.join(tmp_dir, f"{coin}_all_features.csv")
+        si.StreamingIndicators.from_history = classmethod(counting_from_history)
+        try:
+            # the first run seeds from the whole history
+            ds.write_dataset(all_features.iloc[:400], si.get_all_features_filepath("fakecoin"))
+            streaming_indicators = si.get_streaming_indicators("fakecoin", days.iloc[399])
+            assert n_seeded == [400], "Failed first seeding in get_streaming_indicators test."
+            assert np.array_equal(streaming_indicators.features, clean_data[feature_columns].iloc[399].to_numpy(dtype=np.float64)), "Failed seeded features in get_streaming_indicators test."
+
+            # the next run only updates the persisted indicators with the new days
+            ds.write_dataset(all_features, si.get_all_features_filepath("fakecoin"))
+            streaming_indicators = si.get_streaming_indicators("fakecoin", days.iloc[449])
+            assert n_seeded == [400], "Failed reseeding for new days in get_streaming_indicators test."
+            assert streaming_indicators.n_rows == 450, "Failed number of rows in get_streaming_indicators test."
+            assert np.allclose(streaming_indicators.features, clean_data[feature_columns].iloc[449].to_numpy(dtype=np.float64), rtol=1e-9, atol=1e-12), "Failed updated features in get_streaming_indicators test."
+            assert si.get_streaming_indicators("fakecoin", days.iloc[449]).n_rows == 450 and n_seeded == [400], "Failed rerun in get_streaming_indicators test."
+
+            # an earlier day or a changed history are seeded again
+            streaming_indicators = si.get_streaming_indicators("fakecoin", days.iloc[420])
+            assert n_seeded == [400, 421], "Failed earlier day in get_streaming_indicators test."
+            changed_features = all_features.copy()
+            changed_features.loc[420, "price"] *= 2
+            ds.write_dataset(changed_features, si.get_all_features_filepath("fakecoin"))
+            si.get_streaming_indicators("fakecoin", days.iloc[449])
+            assert n_seeded == [400, 421, 450], "Failed changed history in get_streaming_indicators test."
+
+            try:
+                si.get_streaming_indicators("fakecoin", days.iloc[449] + pd.Timedelta(days=1))
+                assert False, "Failed to raise for a missing day in get_streaming_indicators test."
+            except ValueError:
+                pass
+        finally:
+            si.STATE_DIRECTORY = state_directory
+            si.get_all_features_filepath = get_all_features_filepath
+            si.StreamingIndicators.from_history = classmethod(from_history.__func__)
+
+
+
+def run_streaming_indicators_tests():
+    test_update()
+    print("test_update() tests all passed.")
+    test_fill_observation()
+    print("test_fill_observation() tests all passed.")
+    test_get_streaming_indicators()
+    print("test_get_streaming_indicators() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_streaming_indicators_tests()
@@ -0,0 +1,82 @@
+'''
+RUN $ python3 -m tests.test_sweep_executor
+'''
+import utils.model_generation_engine.sweep_executor as se
+import utils.model_generation_engine.array_dataset as ad
+import utils.model_generation_engine.augmented_dataset as aud
+
+import numpy as np
+import torch
+
+
+
+def sum_trial(datasets: dict, trial: dict) -> tuple:
+    '''
+    A trial that only reads the datasets.
+    '''
+    row_sums = datasets["valid"].features.sum(axis=1) * trial["factor"]
+
+    return float(row_sums.sum()), len(datasets["train"]), torch.get_num_threads()
+
+
+
+def create_fake_datasets() -> dict:
+    rng = np.random.default_rng(3)
+    valid_data = ad.ArrayDataset(rng.uniform(0, 1, (50, 4)), rng.choice(3, 50))
+    train_data = aud.AugmentedDataset(rng.uniform(0, 1, (20, 4)), rng.choice(3, 20), np.full(20, 3))
+
+    return {"train": train_data, "valid": valid_data}
+
+
+
+def test_run_sweep():
+    datasets = create_fake_datasets()
+    trials = [{"factor": factor} for factor in range(6)]
+
+    serial_results = {trial["factor"]: result for trial, result in se.run_sweep(sum_trial, trials, datasets, n_workers=1)}
+    parallel_results = {trial["factor"]: result for trial, result in se.run_sweep(sum_trial, trials, datasets, n_workers=2)}
+
+    assert sorted(parallel_results) == list(range(6)), "Failed every trial run once in run_sweep test."
+    for factor in range(6):
+        # the workers see the same datasets (the augmented one with the same number of samples per epoch)
+        assert np.isclose(parallel_results[factor][0], serial_results[factor][0]) and parallel_results[factor][1] == 60, "Failed shared datasets in run_sweep test."
+        assert parallel_results[factor][2] == 1, "Failed single intra-op thread in run_sweep test."
+
+    # the caller's datasets are untouched
+    assert np.isclose(sum_trial(datasets, {"factor": 1})[0], serial_results[1][0]), "Failed read-only datasets in run_sweep test."
+
+
+
+def test_share_dataset():
+    datasets = create_fake_datasets()
+    blocks = []
+    try:
+        for dataset in datasets.values():
+            attached = se.attach_dataset(se.share_dataset(dataset, blocks))
+            assert type(attached) == type(dataset), "Failed dataset class in share_dataset test."
+            assert np.array_equal(attached.features, dataset.features) and np.array_equal(attached.labels, dataset.labels), "Failed dataset rows in share_dataset test."
+            assert len(attached) == len(dataset), "Failed dataset length in share_dataset test."
+
+        # a list of (features, target) tuples is shared as an ArrayDataset
+        attached = se.attach_dataset(se.share_dataset(list(datasets["valid"]), blocks))
+        assert np.array_equal(attached.features, datasets["valid"].features), "Failed list dataset in share_dataset test."
+    finally:
+        for block in se.worker_blocks:
+            block.close()
+        se.worker_blocks.clear()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+
+def run_sweep_executor_tests():
+    test_run_sweep()
+    print("test_run_sweep() tests all passed.")
+    test_share_dataset()
+    print("test_share_dataset() tests all passed.")
+
+
+
+if __name__ == "__main__":
+    run_sweep_executor_tests()
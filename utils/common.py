@@ -6,12 +6,16 @@ from .model_generation_engine import data_aggregator as dt_agg
 from .model_generation_engine import data_preprocessor as dt_pp
 from .model_generation_engine import data_processor as dt_p
 from .model_generation_engine import dataset_methods as dt_m
+from .model_generation_engine import dataset_storage as dt_s
+from .model_generation_engine import incremental_preprocessor as dt_ipp
+from .model_generation_engine import streaming_indicators as dt_si
 from .model_generation_engine import model_methods as mm
 from .model_generation_engine import neural_nets as nn
 from . import risk_adjusted_return_calculator as rarc
+import numpy as np
 import pandas as pd
 import torch
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 #
 # ------------- CONSTANTS ------------
@@ -32,16 +36,36 @@ possible_coins = ["algorand", "avalanche-2", "chainlink", "elrond-erd-2", "enjin
 # ------------- INTERFACES ------------
 #
 # DATA AGGREGATOR
-def aggregate_data_for_new_coins(coins: List[str], interval: int = 600) -> None:
-    dt_agg.aggregate_data_for_new_coins(coins, interval)
+def aggregate_data_for_new_coins(coins: List[str], interval: int = 600, bulk: bool = False) -> None:
+    dt_agg.aggregate_data_for_new_coins(coins, interval, bulk)
 
 
-def aggregate_new_data(coin: str, n_days: int) -> str:
-    return dt_agg.fetch_missing_data_by_range(coin, n_days)
+def aggregate_new_data(coin: str, n_days: int, bulk: bool = False) -> str:
+    return dt_agg.fetch_missing_data_by_range(coin, n_days, bulk=bulk)
 
 
 def fetch_missing_data_by_dates(coin: str, dates: List[str], verbose: bool = False) -> pd.DataFrame:
-    return dt_agg.fetch_missing_data_by_dates(coin, dates)
+    return dt_agg.fetch_missing_data_by_dates(coin, dates, verbose)
+
+
+def aggregate_missing_data(coins: List[str]) -> Dict[str, str]:
+    return dt_agg.fetch_missing_data_by_plan(coins)
+
+
+def fill_missing_fear_greed(data: pd.DataFrame, update: bool = True) -> pd.DataFrame:
+    return dt_agg.fill_missing_fear_greed(data, update)
+
+
+def update_fear_greed_index() -> None:
+    dt_agg.update_fear_greed_index()
+
+
+def retry_dead_letters(coin: str) -> str:
+    return dt_agg.retry_dead_letters(coin)
+
+
+def get_api_usage_report() -> str:
+    return dt_agg.get_api_usage_report()
 
 
 
@@ -50,11 +74,31 @@ def clean_coin_data(coin: str, data: pd.DataFrame, start_date: str, end_date: st
     return dt_pp.clean_data(coin, data, start_date, end_date)
 
 
+def clean_coin_data_incrementally(coin: str, data: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+    return dt_ipp.clean_data_incrementally(coin, data, start_date, end_date)
+
+
 def handle_missing_data(coin: str, data: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
     return dt_pp.handle_missing_data(coin, data, start_date, end_date)
 
 
 
+# STREAMING INDICATORS
+def get_streaming_indicators(coin: str, day: pd.Timestamp) -> dt_si.StreamingIndicators:
+    return dt_si.get_streaming_indicators(coin, day)
+
+
+
+# DATASET STORAGE
+def read_dataset(filepath: str) -> pd.DataFrame:
+    return dt_s.read_dataset(filepath)
+
+
+def write_dataset(data: pd.DataFrame, filepath: str) -> None:
+    dt_s.write_dataset(data, filepath)
+
+
+
 # DATASET METHODS
 def merge_newly_aggregated_data(coin: str, by_range: bool = True) -> str:
     return dt_m.merge_new_dataset_with_old(coin, by_range)
@@ -68,8 +112,8 @@ def shuffle_data(data: List[Tuple[List[float],float]]) -> List[Tuple[List[float]
     return dt_m.shuffle_data(data)
 
 
-def get_datasets(coin: str, data_aug_factor: int) -> Tuple[List[Tuple[List[float], float]], List[Tuple[List[float], float]], List[Tuple[List[float], float]]]:
-    return dt_m.get_datasets(coin, data_aug_factor)
+def get_datasets(coin: str, data_aug_factor: int, seed: int = None, lazy: bool = False) -> Tuple[dt_m.ArrayDataset, dt_m.ArrayDataset, dt_m.ArrayDataset]:
+    return dt_m.get_datasets(coin, data_aug_factor, seed, lazy)
 
 
 def load_data(coin: str) -> pd.DataFrame:
@@ -83,7 +127,7 @@ def check_if_data_is_clean(data: pd.DataFrame) -> None:
         raise
 
 
-def prepare_model_pruning_datasets(coin: str) -> Tuple[List[Tuple[List[float], float]], List[Tuple[List[float], float]], List[Tuple[List[float], float]]]:
+def prepare_model_pruning_datasets(coin: str) -> Tuple[dt_m.ArrayDataset, dt_m.ArrayDataset, dt_m.ArrayDataset]:
     return dt_m.prepare_model_pruning_datasets(coin)
 
 
@@ -91,6 +135,18 @@ def convert_to_tensor(model: nn.CryptoSoothsayer, features: List[float], target:
     return dt_m.convert_to_tensor(model, features, target)
 
 
+def convert_batch_to_tensors(model: nn.CryptoSoothsayer, features: np.ndarray, targets: np.ndarray) -> Tuple[torch.tensor, torch.tensor]:
+    return dt_m.convert_batch_to_tensors(model, features, targets)
+
+
+def iter_batches(data: List[Tuple[List[float],float]], batch_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    return dt_m.iter_batches(data, batch_size)
+
+
+def convert_dataset_to_tensors(model: nn.CryptoSoothsayer, data: List[Tuple[List[float],float]]) -> Tuple[torch.tensor, torch.tensor]:
+    return dt_m.convert_dataset_to_tensors(model, data)
+
+
 
 # MODEL METHODS
 def save_model(model: nn.CryptoSoothsayer, filepath: str) -> None:
@@ -101,6 +157,14 @@ def load_model(model: nn.CryptoSoothsayer, filepath: str) -> nn.CryptoSoothsayer
     return mm.load_model(model, filepath)
 
 
+def save_training_state(model: nn.CryptoSoothsayer, lowest_valid_loss: float, filepath: str) -> None:
+    mm.save_training_state(model, lowest_valid_loss, filepath)
+
+
+def load_training_state(model: nn.CryptoSoothsayer, filepath: str) -> float:
+    return mm.load_training_state(model, filepath)
+
+
 def load_pretrained_model(filepath: str) -> nn.CryptoSoothsayer:
     return mm.load_pretrained_model(filepath)
 
@@ -0,0 +1,63 @@
+'''
+USED BY THE DATASET METHODS TO HOLD THE TRAINING, VALIDATION AND TESTING DATASETS.
+
+FUNCTION: KEEPS A DATASET AS ONE CONTIGUOUS float32 FEATURE MATRIX AND ONE int64 LABEL VECTOR INSTEAD OF A LIST OF (FEATURES, TARGET) TUPLES OF PYTHON FLOATS, WHILE STILL BEHAVING LIKE THAT LIST (len, INDEXING, ITERATING OVER (FEATURES, TARGET) PAIRS AND + TO CONCATENATE) FOR THE CODE THAT TRAINS AND EVALUATES THE MODELS.
+'''
+import numpy as np
+import torch
+from typing import Iterator, Tuple
+
+
+
+class ArrayDataset:
+    def __init__(self, features: np.ndarray, labels: np.ndarray):
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.labels = np.ascontiguousarray(labels, dtype=np.int64)
+        if self.features.ndim != 2 or len(self.features) != len(self.labels):
+            raise ValueError(f"Expected a 2D feature matrix with one row per label, but got features of shape {self.features.shape} and {len(self.labels)} labels.")
+        # the (feature, label) tensors per device (see get_tensors)
+        self.tensors = {}
+
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+    def __getitem__(self, ind):
+        '''
+        Returns the (features, target) pair of a row or, for a slice, the dataset of those rows.
+        '''
+        if isinstance(ind, slice):
+            return ArrayDataset(self.features[ind], self.labels[ind])
+
+        return self.features[ind], self.labels[ind]
+
+
+    def get_tensors(self, device: torch.device) -> Tuple[torch.tensor, torch.tensor]:
+        '''
+        Returns the feature matrix and label vector as tensors on param device, built only on the first call per device.
+        NOTE: on the CPU the tensors share their memory with the arrays, which are therefore never modified in place.
+        '''
+        if device not in self.tensors:
+            self.tensors[device] = (torch.from_numpy(self.features).to(device), torch.from_numpy(self.labels).to(device))
+
+        return self.tensors[device]
+
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.int64]]:
+        return zip(self.features, self.labels)
+
+
+    def __add__(self, other: "ArrayDataset") -> "ArrayDataset":
+        return ArrayDataset(np.concatenate([self.features, other.features]), np.concatenate([self.labels, other.labels]))
+
+
+    def shuffled(self, rng: np.random.Generator = None) -> "ArrayDataset":
+        '''
+        Returns the rows in a random order; param rng makes the order reproducible.
+        '''
+        if rng is None:
+            rng = np.random.default_rng()
+        permutation = rng.permutation(len(self))
+
+        return ArrayDataset(self.features[permutation], self.labels[permutation])
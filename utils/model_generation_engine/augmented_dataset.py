@@ -0,0 +1,118 @@
+'''
+USED BY THE DATASET METHODS TO AUGMENT THE TRAINING DATASET WITHOUT MATERIALIZING THE AUGMENTED COPIES.
+
+FUNCTION: A PYTORCH Dataset THAT ONLY STORES THE BASE ROWS AND HOW MANY COPIES OF EACH ROW AN EPOCH HAS (I.E., THE CLASS UPSAMPLING OF dataset_methods.generate_dataset), AND JITTERS A COPY ONLY WHEN IT IS ASKED FOR. ITS SAMPLER DRAWS THE SAMPLES OF AN EPOCH IN CHUNKS, SO MEMORY STAYS THE SAME NO MATTER HOW LARGE THE AUGMENTATION FACTOR IS.
+
+NOTE: A SAMPLE IS IDENTIFIED BY row + n_rows * copy, WHERE COPY 0 IS THE ORIGINAL ROW AND EVERY OTHER COPY HAS EACH FEATURE MULTIPLIED BY ITS OWN RANDOM FACTOR IN [1-1e-6, 1+1e-6).
+'''
+import numpy as np
+import torch
+from typing import Iterator, Tuple
+
+# the number of samples drawn at once by the sampler (and thus held in memory while iterating)
+CHUNK_SIZE = 1 << 14
+
+
+
+class UpsamplingSampler(torch.utils.data.Sampler):
+    '''
+    Draws the sample ids of an epoch: each row with a probability proportional to its number of copies and then one of its copies uniformly, so that every row (and thus every signal) is expected to appear as often per epoch as in the materialized dataset.
+    NOTE: draws with replacement, which is what keeps its memory independent of the number of samples.
+    '''
+    def __init__(self, n_copies: np.ndarray, seed: int = None):
+        self.n_copies = np.asarray(n_copies, dtype=np.int64)
+        self.probabilities = self.n_copies / self.n_copies.sum()
+        self.rng = np.random.default_rng(seed)
+
+
+    def __len__(self) -> int:
+        return int(self.n_copies.sum())
+
+
+    def draw(self, n_samples: int) -> np.ndarray:
+        rows = self.rng.choice(len(self.n_copies), size=n_samples, p=self.probabilities)
+        copies = (self.rng.random(n_samples) * self.n_copies[rows]).astype(np.int64)
+
+        return rows + len(self.n_copies) * copies
+
+
+    def iter_chunks(self) -> Iterator[np.ndarray]:
+        n_samples = len(self)
+        for start in range(0, n_samples, CHUNK_SIZE):
+            yield self.draw(min(CHUNK_SIZE, n_samples - start))
+
+
+    def __iter__(self) -> Iterator[int]:
+        for sample_ids in self.iter_chunks():
+            yield from sample_ids.tolist()
+
+
+
+class AugmentedDataset(torch.utils.data.Dataset):
+    '''
+    Param n_copies is the number of samples per epoch of each row (1 + the augmented copies; see dataset_methods.get_n_copies).
+    Param seed makes both the sampling and the jitter reproducible.
+    '''
+    def __init__(self, features: np.ndarray, labels: np.ndarray, n_copies: np.ndarray, seed: int = None):
+        self.features = np.ascontiguousarray(features, dtype=np.float32)
+        self.labels = np.ascontiguousarray(labels, dtype=np.int64)
+        self.n_rows = len(self.labels)
+        sampler_seed, jitter_seed = np.random.SeedSequence(seed).spawn(2)
+        self.sampler = UpsamplingSampler(n_copies, sampler_seed)
+        self.rng = np.random.default_rng(jitter_seed)
+
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of samples per epoch.
+        '''
+        return len(self.sampler)
+
+
+    def get_batch(self, sample_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        '''
+        Returns the feature matrix and label vector of the given samples, jittering all but the original rows at once.
+        '''
+        sample_ids = np.asarray(sample_ids, dtype=np.int64)
+        rows = sample_ids % self.n_rows
+        features = self.features[rows].astype(np.float64)
+        is_augmented = sample_ids >= self.n_rows
+        features[is_augmented] *= 1 + self.rng.uniform(-0.000001, 0.000001, (is_augmented.sum(), features.shape[1]))
+
+        return features.astype(np.float32), self.labels[rows]
+
+
+    def __getitem__(self, sample_id: int) -> Tuple[np.ndarray, np.int64]:
+        features, labels = self.get_batch([sample_id])
+
+        return features[0], labels[0]
+
+
+    def get_sampler(self) -> UpsamplingSampler:
+        '''
+        For a torch DataLoader, i.e., DataLoader(dataset, batch_size, sampler=dataset.get_sampler()).
+        '''
+        return self.sampler
+
+
+    def iter_batches(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        '''
+        Yields one epoch in chunks of (feature matrix, label vector).
+        '''
+        for sample_ids in self.sampler.iter_chunks():
+            yield self.get_batch(sample_ids)
+
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.int64]]:
+        '''
+        Yields the (features, target) pairs of a new random epoch, like iterating over a shuffled materialized dataset.
+        '''
+        for features, labels in self.iter_batches():
+            yield from zip(features, labels)
+
+
+    def shuffled(self) -> "AugmentedDataset":
+        '''
+        Every iteration is already a new random epoch.
+        '''
+        return self
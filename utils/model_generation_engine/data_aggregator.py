@@ -6,16 +6,41 @@ FUNCTION: TO PULL DATA FROM COINGECKO DATABASE AND STORE AS A CSV.
 NOTE: THE 'SIGNAL' COLUMN IS FILLED IN BY A HUMAN IN HINDSIGHT WITH THE CORRECT ACTION GIVEN THE STATE OF THE MARKET AT THE TIME.
 '''
 import os
-import requests
 import json
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 import time
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import Callable, Dict, List, Tuple
+from . import dataset_storage as ds
+from . import dead_letter_store
+from . import fear_greed_store
+from . import fetch_engine
+from . import fetch_planner
+from . import http_client
+from . import response_cache
 from .. import common
 
 
+# There is a limit of 100 api calls per minute
+# But regularly returns a 434 even with much lower calls/minute
+COINGECKO_CALLS_PER_MINUTE = 50
+# shared by every coin (and every thread) so that the total call rate stays within the limit
+coingecko_rate_limiter = fetch_engine.TokenBucket(COINGECKO_CALLS_PER_MINUTE)
+# one keep-alive connection per request in flight
+api_client = http_client.HTTPClient(pool_size=COINGECKO_CALLS_PER_MINUTE, timeout=(5.0, 30.0), compression=True)
+COINGECKO_RETRY_POLICY = fetch_engine.RetryPolicy(max_retries=5, base_delay=2.0, max_delay=120.0)
+# number of days requested per market_chart/range call in bulk mode
+MARKET_CHART_MAX_DAYS = 365
+# every historic api response goes through this cache so that reruns only hit the network for new dates
+api_response_cache = response_cache.ResponseCache("datasets/cache/api_responses.sqlite")
+# the whole fear & greed history; only the days after its newest date are ever fetched
+fear_greed_index = fear_greed_store.FearGreedStore("datasets/raw/fear_and_greed_index.csv", lambda n_days: get_fear_greed_by_range(n_days))
+# dates that still failed after retrying, to be retried by the next run
+dead_letters = dead_letter_store.DeadLetterStore("datasets/cache/dead_letters.json")
+BASIC_DATA_COLUMNS = ["date", "price", "market_cap", "volume"]
+
+
 
 #
 # ---------- API CALLS ----------
@@ -24,10 +49,10 @@ def fetch_and_save_sentiment() -> None:
     '''
     Fetches all historical fear & greed indices.
     '''
-    data = requests.get("https://api.alternative.me/fng/?limit=0&date_format=cn").json()["data"]
+    data = get_json("https://api.alternative.me/fng/?limit=0&date_format=cn")["data"]
     data = pd.DataFrame(data)
     data = data.drop(columns=["value_classification", "time_until_update"])
-    data.to_csv("datasets/raw/fear_and_greed_index.csv", index=False)
+    ds.write_dataset(data, "datasets/raw/fear_and_greed_index.csv")
 
 
 
@@ -36,15 +61,18 @@ def get_fear_greed() -> int:
     Pulls the data for the fear and greed index at the time it's called.
     Returns an int.
     '''
-    return int(requests.get("https://api.alternative.me/fng/?date_format=cn").json()["data"][0]["value"])
+    return int(get_json("https://api.alternative.me/fng/?date_format=cn")["data"][0]["value"])
 
 
 
 def get_fear_greed_by_range(n_days: int) -> dict:
     '''
     Pulls the data for the fear and greed index for a given interval, i.e., since n_days ago
+    NOTE: cached for the current day only, as it includes today's (still changing) index.
     '''
-    return requests.get(f"https://api.alternative.me/fng/?limit={n_days}&date_format=cn").json()["data"]
+    fetch = lambda: get_json(f"https://api.alternative.me/fng/?limit={n_days}&date_format=cn")
+
+    return api_response_cache.get_or_fetch(f"fng/limit={n_days}", "", str(date.today()), fetch, response_cache.CURRENT_DAY_TTL)["data"]
 
 
 
@@ -52,8 +80,46 @@ def get_historic_data(coin: str, date: str) -> dict:
     '''
     Pulls all data from coingecko for specified coin on specified date.
     Returns a dictionary.
+    NOTE: Param date must be in the coingecko format, i.e., dd-mm-yyyy.
+    '''
+    fetch = lambda: get_json(f"https://api.coingecko.com/api/v3/coins/{coin}/history?date={date}")
+    ttl = get_cache_ttl(datetime.strptime(date, "%d-%m-%Y").date())
+
+    return api_response_cache.get_or_fetch(*get_historic_data_cache_key(coin, date), fetch, ttl)
+
+
+
+def get_historic_data_cache_key(coin: str, date: str) -> Tuple[str, str, str]:
+    return "history", coin, date
+
+
+
+def get_market_chart_by_range(coin: str, from_timestamp: int, to_timestamp: int) -> dict:
+    '''
+    Pulls the price, market cap, and volume series from coingecko for specified coin between two unix timestamps (in seconds).
+    Returns a dictionary of [timestamp_ms, value] lists under "prices", "market_caps", and "total_volumes".
+    NOTE: coingecko returns daily datapoints (at 00:00 UTC) for ranges longer than 90 days and hourly datapoints otherwise.
+    '''
+    fetch = lambda: get_json(f"https://api.coingecko.com/api/v3/coins/{coin}/market_chart/range?vs_currency=twd&from={from_timestamp}&to={to_timestamp}")
+    ttl = None if to_timestamp < get_unix_timestamp(date.today()) else response_cache.CURRENT_DAY_TTL
+
+    return api_response_cache.get_or_fetch(*get_market_chart_cache_key(coin, from_timestamp, to_timestamp), fetch, ttl)
+
+
+
+def get_market_chart_cache_key(coin: str, from_timestamp: int, to_timestamp: int) -> Tuple[str, str, str]:
+    return "market_chart/range", coin, f"{from_timestamp}-{to_timestamp}"
+
+
+
+def get_json(url: str) -> dict:
     '''
-    return requests.get(f"https://api.coingecko.com/api/v3/coins/{coin}/history?date={date}").json()
+    Raises an exception for error responses (e.g., 429 too many requests) so that they are neither cached nor mistaken for data.
+    '''
+    response = api_client.get(url)
+    response.raise_for_status()
+
+    return response.json()
 
 
 
@@ -103,6 +169,58 @@ def extract_basic_data(data: dict, date: str) -> dict:
 
 
 
+def extract_market_chart_data(data: dict, dates: List[str]) -> List[dict]:
+    '''
+    Resamples the market chart series to one row per date with the same keys as extract_basic_data.
+    Takes the first datapoint of each (UTC) day, i.e., the one closest to the 00:00 snapshot the history endpoint returns.
+    Dates without any datapoints are set to 0 so that handle_missing_data fills them in.
+    '''
+    daily_values = {}
+    for key, column in [("prices", "price"), ("market_caps", "market_cap"), ("total_volumes", "volume")]:
+        series = pd.DataFrame(data.get(key, []), columns=["timestamp", column])
+        series = series.sort_values(by=["timestamp"])
+        series["date"] = pd.to_datetime(series["timestamp"], unit="ms").dt.strftime("%d-%m-%Y")
+        daily_values[column] = series.groupby("date")[column].first().to_dict()
+
+    historical_data = []
+    for date in dates:
+        data_dict = {"date": date}
+        for column in ["price", "market_cap", "volume"]:
+            data_dict[column] = daily_values[column].get(date, 0)
+        historical_data.append(data_dict)
+
+    return historical_data
+
+
+
+def get_unix_timestamp(day: date) -> int:
+    '''
+    Returns the unix timestamp (in seconds) of 00:00 UTC on the given day.
+    '''
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+
+
+
+def get_cache_ttl(day: date) -> float:
+    '''
+    Returns how long (in seconds) a response for the given day may be cached.
+    NOTE: data for past days never change, so they never expire (i.e., None).
+    '''
+    if day < date.today():
+        return None
+
+    return response_cache.CURRENT_DAY_TTL
+
+
+
+def get_api_usage_report() -> str:
+    '''
+    Reports how many network calls the response cache saved and how long the ones that were made took per host.
+    '''
+    return api_response_cache.report() + "\n" + api_client.get_latencies().report()
+
+
+
 def get_time() -> int:
     '''
     Returns current time rounded to milliseconds.
@@ -115,165 +233,278 @@ def get_time() -> int:
 #
 # --------- CONTROLLER METHODS ---------
 #
-def fetch_missing_data_by_dates(coin: str, dates: List[str], verbose: bool = False) -> pd.DataFrame:
+def fetch_uncached(jobs: List[Tuple], fetch: Callable[..., dict], get_cache_key: Callable[..., Tuple[str, str, str]], verbose: bool = False) -> Tuple[Dict[Tuple, dict], List[Tuple]]:
     '''
-    WARNING: Cannot automatically fetch Fear/Greed index <- This is partially alleviated by the data_preprocessors handle_missing_data method.
+    Same as fetch_engine.fetch_concurrently with the coingecko rate limiter, but the jobs whose responses are cached (param get_cache_key maps a job to its cache key) are answered from the cache first, so that only the misses take a token.
     '''
-    historical_data = []
-    missing_dates = []
+    results = {}
+    misses = []
+    for job in jobs:
+        response = api_response_cache.lookup(*get_cache_key(*job))
+        if response is None:
+            misses.append(job)
+        else:
+            results[job] = response
 
-    for date in dates:
-        try:
-            data = get_historic_data(coin, date)
-        except:
-            print(f"Error on {date}")
-            missing_dates.append(date)
-            continue
+    fetched, failed = fetch_engine.fetch_concurrently(misses, fetch, coingecko_rate_limiter, retry_policy=COINGECKO_RETRY_POLICY, verbose=verbose)
+    results.update(fetched)
 
-        historical_data.append(extract_basic_data(data, date))
+    return results, failed
 
-        # To help regulate the speed with which calls are being made
-        # to assuage 434 return codes
-        time.sleep(1)
 
-    if len(missing_dates) > 0:
-        ans = input("Try again? [y/n] ")
-        if (ans.lower())[0] == 'y':
-            more_data = fetch_missing_data_by_dates(coin, missing_dates)
-            # merge the data
-            historical_data = pd.DataFrame(historical_data)
-            historical_data = pd.concat([historical_data, more_data])
 
-    # save as CSV
-    coin_data = pd.DataFrame(historical_data)
-    coin_data.to_csv(f"datasets/raw/{coin}_historical_data_by_date.csv", index=False, float_format="%f")
+def fetch_historic_data_for_dates(coin_dates: Dict[str, List[str]], verbose: bool = False) -> Tuple[Dict[str, List[dict]], Dict[str, List[str]]]:
+    '''
+    Fetches the basic data for every coin on each of its dates through the fetch engine, i.e., all coins share the same rate budget.
+    Returns the extracted daily data per coin (in the same order as its dates) and the dates that failed per coin.
+    NOTE: dates that still fail after retrying are dead-lettered; dates that succeed are removed from the dead letters.
+    '''
+    jobs = [(coin, date) for coin, dates in coin_dates.items() for date in dates]
+    results, _ = fetch_uncached(jobs, get_historic_data, get_historic_data_cache_key, verbose)
+
+    historical_data = {}
+    missing_dates = {}
+    for coin, dates in coin_dates.items():
+        historical_data[coin] = []
+        missing_dates[coin] = []
+        for date in dates:
+            if (coin, date) in results:
+                historical_data[coin].append(extract_basic_data(results[(coin, date)], date))
+            else:
+                missing_dates[coin].append(date)
+        dead_letters.update(coin, missing_dates[coin], [x["date"] for x in historical_data[coin]])
+
+    return historical_data, missing_dates
+
+
+
+def fetch_historic_data_for_range(coins: List[str], n_days: int, start_delta: int = 0, verbose: bool = False) -> Tuple[Dict[str, List[dict]], Dict[str, List[str]]]:
+    '''
+    Bulk mode of fetch_historic_data_for_dates: fetches the n_days counting backwards from start_delta days ago with one market_chart/range call per MARKET_CHART_MAX_DAYS days instead of one call per day.
+    Returns the extracted daily data per coin (most recent first) and the dates of any chunks that failed per coin.
+    NOTE: dates of chunks that still fail after retrying are dead-lettered.
+    '''
+    dates = get_dates_by_range(n_days, start_delta)
+    last_day = date.today() - timedelta(start_delta)
+
+    # each chunk is a (first_offset, last_offset) pair of days before last_day
+    chunks = [(offset, min(offset + MARKET_CHART_MAX_DAYS, n_days) - 1) for offset in range(0, n_days, MARKET_CHART_MAX_DAYS)]
+    jobs = []
+    for coin in coins:
+        for first_offset, last_offset in chunks:
+            from_timestamp = get_unix_timestamp(last_day - timedelta(last_offset))
+            # an hour past midnight so that the last day's 00:00 datapoint is included
+            to_timestamp = get_unix_timestamp(last_day - timedelta(first_offset)) + 3600
+            jobs.append((coin, from_timestamp, to_timestamp))
+
+    results, _ = fetch_uncached(jobs, get_market_chart_by_range, get_market_chart_cache_key, verbose)
+
+    historical_data = {}
+    missing_dates = {}
+    for coin in coins:
+        historical_data[coin] = []
+        missing_dates[coin] = []
+        for job, (first_offset, last_offset) in zip([job for job in jobs if job[0] == coin], chunks):
+            chunk_dates = dates[first_offset : last_offset + 1]
+            if job in results:
+                historical_data[coin] += extract_market_chart_data(results[job], chunk_dates)
+            else:
+                missing_dates[coin] += chunk_dates
+        dead_letters.update(coin, missing_dates[coin], [x["date"] for x in historical_data[coin]])
+
+    return historical_data, missing_dates
+
+
+
+def get_dates_by_range(n_days: int, start_delta: int = 0) -> List[str]:
+    '''
+    Returns the n_days dates counting backwards from start_delta days ago (most recent first) in the coingecko format.
+    '''
+    today = date.today() - timedelta(start_delta)
+
+    return [get_correct_date_format(today - timedelta(i)) for i in range(n_days)]
+
+
+
+def add_fear_greed(historical_data: List[dict]) -> None:
+    '''
+    Adds the fear/greed index to each day of the historical data from the fear & greed store.
+    Days without an index are set to 0 so that handle_missing_data fills them in.
+    '''
+    update_fear_greed_index()
+    for daily_data in historical_data:
+        fear_greed = fear_greed_index.get(datetime.strptime(daily_data["date"], "%d-%m-%Y").date())
+        daily_data["fear_greed"] = 0 if fear_greed is None else fear_greed
+
+
+
+def fill_missing_fear_greed(data: pd.DataFrame, update: bool = True) -> pd.DataFrame:
+    '''
+    Fills in the missing (NaN or 0) fear/greed indices of a dataset from the fear & greed store, e.g., for rows that were merged from fetch_missing_data_by_dates in the past.
+    Param update first fetches the days missing from the store; otherwise the lookup never touches the network (e.g., in the workers of data_preprocessor.preprocess_coins).
+    NOTE: Param data must have datetime-like values in its date column.
+    '''
+    missing = data["fear_greed"].isna() | (data["fear_greed"] == 0)
+    if missing.any():
+        if update:
+            update_fear_greed_index()
+        stored = [fear_greed_index.get(pd.Timestamp(day).date()) for day in data.loc[missing, "date"]]
+        data["fear_greed"] = data["fear_greed"].astype(float)
+        data.loc[missing, "fear_greed"] = [np.nan if x is None else x for x in stored]
+
+    return data
+
+
+
+def update_fear_greed_index() -> None:
+    '''
+    NOTE: a failed update is not fatal; whatever is already stored is used instead.
+    '''
+    try:
+        fear_greed_index.update()
+    except Exception as e:
+        print(f"Error when updating the fear and greed index: {e}\nUsing the stored index up until {fear_greed_index.get_newest_date()}.")
+
+
+
+def fetch_missing_data_by_dates(coin: str, dates: List[str], verbose: bool = False) -> pd.DataFrame:
+    '''
+    NOTE: dates that still fail after retrying are dead-lettered for retry_dead_letters rather than waiting on a human.
+    '''
+    fetched_data, missing_dates = fetch_historic_data_for_dates({coin: dates})
+    historical_data = fetched_data[coin]
+    add_fear_greed(historical_data)
+    report_dead_letters(coin, missing_dates[coin])
+
+    # save as CSV (and binary)
+    coin_data = pd.DataFrame(historical_data, columns=BASIC_DATA_COLUMNS + ["fear_greed"])
+    ds.write_dataset(coin_data, f"datasets/raw/{coin}_historical_data_by_date.csv")
 
     if verbose:
+        print(get_api_usage_report())
         print(f"{coin} data successfully pulled and stored.")
 
     return coin_data
 
 
 
-def fetch_missing_data_by_range(coin: str, n_days: int, start_delta: int = 0, verbose: bool = False) -> str:
-    today = date.today() - timedelta(start_delta)
-    historical_data = []
-    missing_dates = []
-    fear_greed = get_fear_greed_by_range(n_days)
-    fear_greed_ind = 0
-
-    for i in range(n_days):
-        next_date = get_correct_date_format(today - timedelta(i))
-        try:
-            data = get_historic_data(coin, next_date)
-        except:
-            print(f"Error on {next_date}")
-            missing_dates.append(next_date)
-            continue
-
-        daily_data = extract_basic_data(data, next_date)
-        daily_data["fear_greed"] = fear_greed[fear_greed_ind]["value"]
-        fear_greed_ind += 1
-        historical_data.append(daily_data)
-
-        # To help regulate the speed with which calls are being made
-        # to assuage 434 return codes
-        time.sleep(1)
-
-    # if there's still missing data
-    if len(missing_dates) > 0:
-        ans = input("Try again? [y/n] ")
-        if (ans.lower())[0] == 'y':
-            more_data = fetch_missing_data_by_dates(coin, missing_dates)
-            # merge the data
-            historical_data = pd.DataFrame(historical_data)
-            historical_data = pd.concat([historical_data, more_data])
+def fetch_missing_data_by_range(coin: str, n_days: int, start_delta: int = 0, verbose: bool = False, bulk: bool = False) -> str:
+    '''
+    Param bulk fetches the whole range with the market_chart/range endpoint instead of one history call per day.
+    NOTE: dates that still fail after retrying are dead-lettered for retry_dead_letters rather than waiting on a human.
+    '''
+    if bulk:
+        fetched_data, missing_dates = fetch_historic_data_for_range([coin], n_days, start_delta)
+    else:
+        fetched_data, missing_dates = fetch_historic_data_for_dates({coin: get_dates_by_range(n_days, start_delta)})
+    historical_data = fetched_data[coin]
+    add_fear_greed(historical_data)
+    report_dead_letters(coin, missing_dates[coin])
 
-    # save as CSV
-    coin_data = pd.DataFrame(historical_data)
-    coin_data.to_csv(f"datasets/raw/{coin}_historical_data_by_range.csv", index=False, float_format="%f")
+    # save as CSV (and binary)
+    coin_data = pd.DataFrame(historical_data, columns=BASIC_DATA_COLUMNS + ["fear_greed"])
+    ds.write_dataset(coin_data, f"datasets/raw/{coin}_historical_data_by_range.csv")
 
     message = f"{coin} data successfully pulled and stored."
     if verbose:
+        print(get_api_usage_report())
         print(message)
 
     return message
 
 
 
-def aggregate_data_for_new_coins(coins: List[str], how_far_back: int = 600) -> None:
+def fetch_missing_data_by_plan(coins: List[str], verbose: bool = False) -> Dict[str, str]:
+    '''
+    Fetches exactly the dates missing from each coin's raw dataset (see fetch_planner), including its dead-lettered dates, in one batch shared by all coins and merges them into the raw datasets.
+    Returns a message per coin.
+    NOTE: a daily run makes about one request per coin.
+    '''
+    plan = fetch_planner.plan_missing_dates(coins, dead_letters.get_all())
+    print(f"Fetch plan: {sum([len(dates) for dates in plan.values()])} missing dates for {len(plan)} coins.")
+    fetched_data, missing_dates = fetch_historic_data_for_dates(plan, verbose)
+
+    messages = {}
+    for coin, dates in plan.items():
+        historical_data = fetched_data[coin]
+        add_fear_greed(historical_data)
+        report_dead_letters(coin, missing_dates[coin])
+
+        if len(historical_data) > 0:
+            coin_data = pd.DataFrame(historical_data, columns=BASIC_DATA_COLUMNS + ["fear_greed"])
+            ds.write_dataset(coin_data, f"datasets/raw/{coin}_historical_data_by_date.csv")
+            common.merge_newly_aggregated_data(coin, by_range=False)
+
+        messages[coin] = f"Fetched {len(historical_data)} of {len(dates)} missing dates for {coin}."
+
+    print(get_api_usage_report())
+
+    return messages
+
+
+
+def retry_dead_letters(coin: str, verbose: bool = False) -> str:
+    '''
+    Retries only the dates previous runs failed to fetch for the given coin and merges whatever is fetched into the raw dataset.
+    '''
+    dates = dead_letters.get(coin)
+    if len(dates) == 0:
+        return f"No dead-lettered dates for {coin}."
+
+    coin_data = fetch_missing_data_by_dates(coin, dates, verbose)
+    common.merge_newly_aggregated_data(coin, by_range=False)
+
+    return f"Fetched {len(coin_data)} of {len(dates)} dead-lettered dates for {coin}."
+
+
+
+def report_dead_letters(coin: str, missing_dates: List[str]) -> None:
+    for missing_date in missing_dates:
+        print(f"Error on {missing_date}")
+
+    if len(missing_dates) > 0:
+        print(f"{len(missing_dates)} dates for {coin} failed after retrying and were dead-lettered; they will be retried by retry_dead_letters.")
+
+
+
+def aggregate_data_for_new_coins(coins: List[str], how_far_back: int = 600, bulk: bool = False) -> None:
     '''
     Param coins is a list of all the coins to aggregate data for.
     Param how_far_back indicates how many days counting backwards from today to collect data for.
+    Param bulk fetches each coin's history with a handful of market_chart/range calls instead of one history call per day.
+    NOTE: all coins are fetched at once so that the rate budget is shared among them rather than spent coin by coin.
     '''
-    today = date.today()
-    api_calls = 0
-    api_call_cycle_start = get_time()
-    print("Fetching Fear and Greed Index...")
-    fear_greed = get_fear_greed_by_range(how_far_back)
-    print(f"Finished collecting Fear and Greed Index for past {how_far_back} days.")
+    dates = get_dates_by_range(how_far_back)
+    print("Updating Fear and Greed Index...")
+    update_fear_greed_index()
+    print(f"Fear and Greed Index is up to date until {fear_greed_index.get_newest_date()}.")
+
+    print(f"Fetching data for {coins}...")
+    if bulk:
+        fetched_data, missing_dates = fetch_historic_data_for_range(coins, how_far_back, verbose=True)
+    else:
+        fetched_data, missing_dates = fetch_historic_data_for_dates({coin: dates for coin in coins}, verbose=True)
 
     for coin in coins:
-        print(f"Fetching data for {coin}...")
-        date_delta = -1
-        fear_greed_ind = 0
-        has_next = True
-        missing_dates = []
-
-        # Extract basic data
-        historical_data = []
-        while has_next:
-            # There is a limit of 100 api calls per minute
-            # But regularly returns a 434 even with much lower calls/minute
-            api_calls += 1
-            if api_calls > 50:
-                time_to_wait = 60 - ((get_time() - api_call_cycle_start) / 1000)
-                if time_to_wait > 0:
-                    time.sleep(time_to_wait)
-                    print(f"Slept for {time_to_wait} seconds.")
-
-                    api_call_cycle_start = get_time()
-                    api_calls = 1
-
-            # Request data
-            date_delta += 1
-            if date_delta >= how_far_back:
-                has_next = False
-                continue
-
-            next_date = get_correct_date_format(today - timedelta(date_delta))
-
-            try:
-                data = get_historic_data(coin, next_date)
-                print(f"Fetched data for {next_date}")
-            except Exception as e:
-                print(f"Error: {e}")
-                print(f"Coin: {coin}")
-                print(f"Date that failed: {next_date}")
-                print(f"Days from today: {date_delta}")
-                missing_dates.append(next_date)
-                continue
-
-            daily_data = extract_basic_data(data, next_date)
-            daily_data["fear_greed"] = fear_greed[fear_greed_ind]["value"]
-            fear_greed_ind += 1
-
-            historical_data.append(daily_data)
-
-        # save as CSV
+        historical_data = fetched_data[coin]
+        add_fear_greed(historical_data)
+
+        # save as CSV (and binary)
         print(f"Saving {coin} data to CSV...")
-        coin_data = pd.DataFrame(historical_data)
-        coin_data.to_csv(f"datasets/raw/{coin}_historical_data_raw.csv", index=False, float_format="%f")
+        coin_data = pd.DataFrame(historical_data, columns=BASIC_DATA_COLUMNS + ["fear_greed"])
+        ds.write_dataset(coin_data, f"datasets/raw/{coin}_historical_data_raw.csv")
 
         # if missing dates
-        if len(missing_dates) > 0:
+        if len(missing_dates[coin]) > 0:
             print(f"Fetching missing data for {coin}...")
-            fetch_missing_data_by_dates(coin, missing_dates, verbose=True)
+            fetch_missing_data_by_dates(coin, missing_dates[coin], verbose=True)
             common.merge_newly_aggregated_data(coin, by_range=False)
             print(f"Finished collecting/merging missing data for {coin}.")
 
         print(f"{coin} data successfully pulled and stored.")
 
+    print(get_api_usage_report())
+
 
 
 if __name__ == "__main__":
@@ -1,130 +1,160 @@
+import argparse
+import concurrent.futures as cf
+import numpy as np
 import pandas as pd
+import time
 from datetime import date, datetime, timedelta
+from . import dataset_storage as ds
+from . import indicators
+from .normalizer import CausalNormalizer
 from .. import common
 from typing import Dict, List, Tuple
 
+# weighted percent price deltas (see calculate_signals) beyond which the signal is BUY or SELL rather than HODL
+BUY_THRESHOLD = 0.15
+SELL_THRESHOLD = -0.175
+# the first day preprocessed for each coin (see preprocess_coins); coins with shorter histories start later
+DEFAULT_START_DATE = "2019-10-20"
+START_DATES = {
+    "enjincoin": "2020-10-26",
+    "polkadot": "2020-08-23",
+    "solana": "2020-04-11",
+}
 
 
-def handle_missing_data(coin: str, data: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+
+def handle_missing_data(coin: str, data: pd.DataFrame, start_date: str, end_date: str, fetch: bool = True) -> pd.DataFrame:
     '''
     Checks for missing days
     Fills all NaN values with 0.
     Takes average of prior day and next day to calculate missing value or previous or next day if data point is at the beginning or end of the dataset, respectively.
+    Param fetch = False never touches the network: missing dates are not fetched and fear/greed gaps are only looked up in the stored index.
     '''
     # check for missing dates
-    data["date"] = pd.to_datetime(data["date"])
-    missing_dates = pd.date_range(start = start_date, end = end_date ).difference(data["date"])
+    missing_dates = get_missing_dates(data, start_date, end_date)
+    if len(missing_dates) > 0 and not fetch:
+        print(f"There were {len(missing_dates)} missing dates in the dataset, which were not fetched.")
+        return None
     if len(missing_dates) > 0:
         print("There were missing dates in the dataset. Fetching missing data.")
-        common.fetch_missing_data_by_dates(coin, missing_dates, verbose=True)
+        # coingecko (and the response cache) expect dd-mm-yyyy
+        common.fetch_missing_data_by_dates(coin, missing_dates.strftime("%d-%m-%Y").tolist(), verbose=True)
         common.merge_newly_aggregated_data(coin, by_range=False)
         print("Missing dates successfuly fetched.")
         return None
 
+    # fill in fear/greed gaps from the stored index before falling back on averaging
+    if "fear_greed" in data.columns:
+        data = common.fill_missing_fear_greed(data, update=fetch)
+
     data = data.fillna(0)
 
-    for i, row in data.iterrows():
-        for column in data.columns[1:]:
-            if row[column] == 0:
-                next_non_zero = 0
-                start_ind = i + 1
-                while next_non_zero == 0 and start_ind < data.shape[0]:
-                    next_non_zero += data.loc[start_ind, column]
-                    start_ind += 1
-
-                # leading zero
-                if i == 0:
-                    data.loc[i, column] = next_non_zero
-                # Take average of two closest data points
-                elif next_non_zero > 0:
-                    data.loc[i, column] = (data.loc[i-1, column] + next_non_zero) / 2
-                # Otherwise, just make same as one before it
-                elif i > 0:
-                    data.loc[i, column] = data.loc[i-1, column]
+    columns = data.columns[1:]
+    values = data[columns].to_numpy(dtype=np.float64)
+    filled = fill_gaps(values)
+    for j in np.flatnonzero((values == 0).any(axis=0)):
+        set_column(data, columns[j], filled[:, j])
 
     return data
 
 
 
-def normalize_data(data: pd.DataFrame) -> pd.DataFrame:
+def get_missing_dates(data: pd.DataFrame, start_date: str, end_date: str) -> pd.DatetimeIndex:
+    data["date"] = pd.to_datetime(data["date"])
+
+    return pd.date_range(start = start_date, end = end_date).difference(data["date"])
+
+
+
+def set_column(data: pd.DataFrame, column: str, values: np.ndarray) -> None:
     '''
-    Normalizes data using min-max normalization but only up until the given point in history, e.g., datapoint for 2021/02/28 does not have any knowledge of data from 01/03/2021 and onwards.
-    NOTE: only uses 2nd until 2nd to last column, because 1st column is the date and the last column is the signal (i.e., what the appropriate action to take should be).
+    Replaces the values of a column in place.
+    NOTE: like assigning cell by cell, integer columns stay integer as long as every new value is whole.
     '''
-    data_cp = data.copy(deep=True)
+    if pd.api.types.is_integer_dtype(data[column]) and np.all(values % 1 == 0):
+        data[column] = values.astype(data[column].dtype)
+    else:
+        data[column] = values
 
-    # 1st row items only have themselves as history
-    for column in range(1, data.shape[1]-1):
-        data_cp.iloc[0, column] = 1.0
-
-    for i in range(1, data.shape[0]):
-        for column in range(1, data.shape[1]-1):
-            col_max = data.iloc[:i+1, column].max()
-            col_min = data.iloc[:i+1, column].min()
-            # to avoid division by zero
-            if col_max == col_min and col_max != 0:
-                col_min -= 1
-            elif col_max == 0:
-                col_max += 1
-            data_cp.iloc[i, column] = (data.iloc[i, column] - col_min) / (col_max - col_min)
-
-    # last row
-    for column in range(1, data.shape[1]-1):
-        col_max = data.iloc[:, column].max()
-        col_min = data.iloc[:, column].min()
-        if col_max == col_min and col_max != 0:
-            col_min -= 1
-        elif col_max == 0:
-            col_max += 1
-        data_cp.iloc[-1, column] = (data.iloc[-1, column] - col_min) / (col_max - col_min)
-
-    # fear and greed index is out of 100
-    for column in data.columns:
-        if "fear_greed" in str(column):
-            data_cp[column] = data[column] / 100
 
-    # in case there were division by zero errors leading to NaN
-    data_cp = data_cp.fillna(0)
 
-    return data_cp
+def fill_gaps(values: np.ndarray) -> np.ndarray:
+    '''
+    Replaces the zeros in each column of the 2D array values:
+        leading zeros take the first non-zero value (backfill),
+        zeros followed by a positive value take the average of the value before them (itself possibly filled) and that next non-zero value,
+        trailing zeros (or zeros followed by a negative value) take the value before them (forward fill).
+    NOTE: zeros are detected on the original values, so a run of k zeros is filled by k vectorized steps over only the zeros at that offset in their run.
+    '''
+    filled = values.astype(np.float64)
+    n_rows, n_cols = filled.shape
+    zeros = filled == 0
+    if n_rows == 0 or not zeros.any():
+        return filled
 
+    rows = np.arange(n_rows)[:, None]
+    # index of the last non-zero at or before each row (-1 if none) and of the first one at or after it (n_rows if none)
+    prev_ind = np.maximum.accumulate(np.where(zeros, -1, rows), axis=0)
+    next_ind = np.minimum.accumulate(np.where(zeros, n_rows, rows)[::-1], axis=0)[::-1]
+    # value of the first non-zero strictly after each row (0 if none)
+    next_ind = np.vstack([next_ind[1:], np.full((1, n_cols), n_rows)])
+    next_non_zero = np.take_along_axis(np.vstack([filled, np.zeros((1, n_cols))]), next_ind, axis=0)
 
+    leading = zeros & (prev_ind == -1)
+    averaged = zeros & ~leading & (next_non_zero > 0)
+    carried = zeros & ~leading & ~averaged
 
-def perform_SMA_calculation(data: pd.DataFrame, totals: Dict[int, float], SMAs: Dict[int, List[float]], column_name: str) -> pd.DataFrame:
-    for i, row in data.iterrows():
-        for key in totals.keys():
-            totals[key] += data.loc[i, column_name]
-            # can't do i+1 because (i+1)-key would leave only 4 days in the total for the 5-day MA, 9 for the 10-day, etc. and would make the calculation inaccurate
-            if key <= i:
-                totals[key] -= data.loc[i-key, column_name]
-                SMAs[key][i] = totals[key] / key
+    filled[leading] = next_non_zero[leading]
+    col_inds = np.broadcast_to(np.arange(n_cols), filled.shape)
+    filled[carried] = filled[prev_ind[carried], col_inds[carried]]
 
-    for key in SMAs.keys():
-        data[f"{column_name}_{key}_SMA"] = SMAs[key]
+    # the k-th zero of a run depends on the (k-1)-th, so go offset by offset
+    r, c = np.nonzero(averaged)
+    offsets = (rows - prev_ind)[r, c]
+    order = np.argsort(offsets, kind="stable")
+    r, c, offsets = r[order], c[order], offsets[order]
+    bounds = np.flatnonzero(np.diff(offsets)) + 1
+    for r_k, c_k in zip(np.split(r, bounds), np.split(c, bounds)):
+        filled[r_k, c_k] = (filled[r_k - 1, c_k] + next_non_zero[r_k, c_k]) / 2
 
-    return data
+    return filled
 
 
 
-def generate_price_SMA_lists_dict(list_size: int) -> Dict[int, List[float]]:
-    SMAs = {5: [], 10:[], 25: [], 50: [], 75: [], 100: [], 150: [], 200: [], 250: [], 300: [], 350: []}
+def normalize_data(data: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Normalizes data using min-max normalization but only up until the given point in history, e.g., datapoint for 2021/02/28 does not have any knowledge of data from 01/03/2021 and onwards.
+    NOTE: only uses 2nd until 2nd to last column, because 1st column is the date and the last column is the signal (i.e., what the appropriate action to take should be).
+    '''
+    data_cp = data.copy(deep=True)
 
-    for i in range(list_size):
-        for key in SMAs.keys():
-            SMAs[key].append(0.0)
+    columns = data.columns[1:-1]
+    normalizer = CausalNormalizer(columns)
+    normalized = normalizer.fit_transform(data[columns].to_numpy(dtype=np.float64))
+    for j, column in enumerate(columns):
+        if normalizer.is_fear_greed[j]:
+            # fear and greed index is out of 100
+            data_cp[column] = normalized[:, j]
+        else:
+            set_column(data_cp, column, normalized[:, j])
 
-    return SMAs
+    # in case there were division by zero errors leading to NaN
+    data_cp = data_cp.fillna(0)
 
+    return data_cp
 
 
-def generate_fear_greed_SMA_lists_dict(list_size: int) -> Dict[int, List[float]]:
-    SMAs = {3: [], 5:[], 7: [], 9: [], 11: [], 13: [], 15: [], 30: []}
 
-    for i in range(list_size):
-        for key in SMAs.keys():
-            SMAs[key].append(0.0)
+def add_SMAs(data: pd.DataFrame, column_name: str, windows: List[int]) -> pd.DataFrame:
+    '''
+    Adds a {column_name}_{window}_SMA column for each window.
+    NOTE: assumes data is in chronological order (see calculate_SMAs).
+    '''
+    SMAs = indicators.calculate_SMAs(data[column_name].to_numpy(dtype=np.float64), windows)
+    for j, window in enumerate(windows):
+        data[f"{column_name}_{window}_SMA"] = SMAs[:, j]
 
-    return SMAs
+    return data
 
 
 
@@ -132,13 +162,7 @@ def calculate_price_SMAs(data: pd.DataFrame) -> pd.DataFrame:
     '''
     Calculates Simple Moving Averages to the maximum extent allowed by the data
     '''
-    n_datapoints = data.shape[0]
-    totals = {5:0, 10:0, 25:0, 50:0, 75:0, 100:0, 150:0, 200:0, 250:0, 300:0, 350:0}
-    SMAs = generate_price_SMA_lists_dict(n_datapoints)
-
-    data = perform_SMA_calculation(data, totals, SMAs, "price")
-
-    return data
+    return add_SMAs(data, "price", indicators.SMA_WINDOWS["price"])
 
 
 
@@ -146,61 +170,31 @@ def calculate_fear_greed_SMAs(data: pd.DataFrame) -> pd.DataFrame:
     '''
     Calculates Simple Moving Averages for Fear/Greed index over several discrete intervals for the past fortnight
     '''
-    n_datapoints = data.shape[0]
-    totals = {3:0, 5:0, 7:0, 9:0, 11:0, 13:0, 15:0, 30:0}
-    SMAs = generate_fear_greed_SMA_lists_dict(n_datapoints)
-
-    data = perform_SMA_calculation(data, totals, SMAs, "fear_greed")
-
-    return data
+    return add_SMAs(data, "fear_greed", indicators.SMA_WINDOWS["fear_greed"])
 
 
 
 def calculate_SMAs(data: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Calculates every SMA configured in indicators.SMA_WINDOWS.
+    '''
     # reverse the dataframe for easier calculation logic
     data = data.reindex(index=data.index[::-1]).reset_index()
     data = data.drop(columns=["index"])
 
-    # price
-    data = calculate_price_SMAs(data)
-    # fear/greed index
-    data = calculate_fear_greed_SMAs(data)
+    for column_name, windows in indicators.SMA_WINDOWS.items():
+        data = add_SMAs(data, column_name, windows)
 
     return data
 
 
 
-def calculate_relative_strength(data: pd.DataFrame, end_index: int, interval: int = 14) -> float:
+def calculate_RSIs(data: pd.DataFrame, period: int = indicators.RSI_PERIOD, mode: str = "simple") -> pd.DataFrame:
     '''
-    Calculate total percent gains and losses over period of time.
-    Interval is 14 days by default.
+    Param mode is one of indicators.RSI_MODES.
+    NOTE: the RSI is calculated over the 3rd column (i.e., market_cap) as it always has been, so that the RSI feature stays the same.
     '''
-    gain = 0
-    loss = 0
-    for i in range(end_index - interval, end_index):
-        price_today = data.iloc[i+1,2]
-        price_yesterday = data.iloc[i,2]
-
-        if price_today > price_yesterday:
-            gain += (price_today - price_yesterday) #/ price_yesterday
-        elif price_yesterday > price_today:
-            loss += (price_yesterday - price_today) #/ price_yesterday
-
-    if loss == 0:
-        return 0
-
-    return (gain/interval) / (loss/interval)
-
-
-
-def calculate_RSIs(data: pd.DataFrame) -> pd.DataFrame:
-    RSI = [0,0,0,0,0,0,0,0,0,0,0,0,0]
-    for i in range(13,len(data)):
-        # calculate avg gain/loss
-        rs_value = calculate_relative_strength(data, i)
-        rsi = 100.0 - (100.0 / (1.0 + rs_value))
-        RSI.append(rsi)
-
+    RSI = indicators.calculate_RSI(data.iloc[:, 2].to_numpy(dtype=np.float64), period, mode)
     data["RSI"] = RSI
 
     return data
@@ -214,16 +208,24 @@ def get_signal_value(percent_delta: float) -> int:
     signal = 1 # HODL by default
 
     # SELL - lower is stronger
-    if percent_delta < -0.175:
+    if percent_delta < SELL_THRESHOLD:
         signal = 2
     # BUY - higher is stronger
-    elif percent_delta > 0.15:
+    elif percent_delta > BUY_THRESHOLD:
         signal = 0
 
     return signal
 
 
 
+def get_signal_values(percent_deltas: np.ndarray, buy_threshold: float = BUY_THRESHOLD, sell_threshold: float = SELL_THRESHOLD) -> np.ndarray:
+    '''
+    Vectorized get_signal_value, with the thresholds as params so that they can be swept.
+    '''
+    return np.select([percent_deltas < sell_threshold, percent_deltas > buy_threshold], [2, 0], default=1)
+
+
+
 def get_weighting_constant(n: int = 28) -> float:
     '''
     Calculates weighting constant required for the given period such that:
@@ -239,6 +241,29 @@ def get_weighting_constant(n: int = 28) -> float:
 
 
 
+def calculate_weighted_price_deltas(prices: np.ndarray, interval: int = 28) -> np.ndarray:
+    '''
+    Returns, for every day that has interval days after it, the weighted average of the percent price deltas from that day to each of the next interval days (see get_weighting_constant).
+    NOTE: the deltas are a strided window over prices, accumulated day by day in the same order as the original row-by-row loop so that the averages (and thus the signals) are bit-identical.
+    '''
+    prices = np.asarray(prices, dtype=np.float64)
+    n_days = len(prices) - interval
+    if n_days <= 0:
+        return np.zeros(0)
+
+    weighting_constant = get_weighting_constant(interval)
+    current_prices = prices[:n_days]
+    later_prices = np.lib.stride_tricks.sliding_window_view(prices[1:], interval)[:n_days]
+
+    price_delta_avgs = np.zeros(n_days)
+    for days_from_now in range(1, interval+1):
+        percent_deltas = (later_prices[:, days_from_now-1] - current_prices) / current_prices
+        price_delta_avgs += percent_deltas * weighting_constant * days_from_now
+
+    return price_delta_avgs
+
+
+
 def calculate_signals(data: pd.DataFrame, interval: int = 28, verbose: bool = False) -> pd.DataFrame:
     '''
     Calculates the signal on a scale from 0-3 (BUY, HODL, & SELL) based on weighted average of the price future (days_out) price movement deltas.
@@ -246,18 +271,8 @@ def calculate_signals(data: pd.DataFrame, interval: int = 28, verbose: bool = Fa
     If percentage increase/decrease does not exceed minimum thresholds, then HODL.
     NOTE: The calculation weights days in the more distant future more heavily, as they are closer to what the actual value will be at the end of the specified time interval.
     '''
-    signals = []
-    weighting_constant = get_weighting_constant(interval)
-    for ind in range(len(data) - interval):
-        current_price = data["price"][ind]
-        price_delta_avg = 0.0
-
-        for days_from_now in range(1, interval+1):
-            later_price = data["price"][ind+days_from_now]
-            percent_delta = (later_price - current_price) / current_price
-            price_delta_avg += percent_delta * weighting_constant * days_from_now
-
-        signals.append(get_signal_value(price_delta_avg))
+    price_delta_avgs = calculate_weighted_price_deltas(data["price"].to_numpy(), interval)
+    signals = get_signal_values(price_delta_avgs)
 
     data["signal"] = pd.Series(signals)
 
@@ -270,7 +285,19 @@ def calculate_signals(data: pd.DataFrame, interval: int = 28, verbose: bool = Fa
 
 
 
-def clean_data(coin: str, data: pd.DataFrame, start_date: str, end_date: str, verbose=False) -> pd.DataFrame:
+def record_timing(timings: Dict[str, float], stage: str, stage_start: float) -> float:
+    '''
+    Records how long the stage took (in seconds) if timings are kept and returns the start of the next stage.
+    '''
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = now - stage_start
+
+    return now
+
+
+
+def clean_data(coin: str, data: pd.DataFrame, start_date: str, end_date: str, verbose=False, timings: Dict[str, float] = None, fetch: bool = True) -> pd.DataFrame:
     '''
     Preprocesses the basic data provided by coingecko in the following ways:
 
@@ -280,53 +307,158 @@ def clean_data(coin: str, data: pd.DataFrame, start_date: str, end_date: str, ve
             - Prescient looking forward x-days and averaging the price_deltas
         - Normalizes all values by dividing by the max value in each category
             - Normalizes neither date nor signal columns
+
+    Param timings, if given, is filled with the duration of each stage.
+    Param fetch = False never touches the network (see handle_missing_data).
     '''
+    stage_start = time.perf_counter()
     # Fill in missing values
-    data = handle_missing_data(coin, data, start_date, end_date)
+    data = handle_missing_data(coin, data, start_date, end_date, fetch)
     if data is None:
         return None
+    stage_start = record_timing(timings, "missing_data", stage_start)
     if verbose:
         print(f"Missing data handling complete for {coin}.")
     # Calculate SMAs
     data = calculate_SMAs(data)
+    stage_start = record_timing(timings, "SMAs", stage_start)
     if verbose:
         print(f"SMA calculation complete for {coin}.")
     # Calculate RSIs
     data = calculate_RSIs(data)
+    stage_start = record_timing(timings, "RSIs", stage_start)
     if verbose:
         print(f"RSI calculation complete for {coin}.")
     # Calculate signals
     data = calculate_signals(data, common.SIGNAL_FOR_N_DAYS_FROM_NOW)
+    stage_start = record_timing(timings, "signals", stage_start)
     if verbose:
         print(f"Signal calculation for {common.SIGNAL_FOR_N_DAYS_FROM_NOW} days from now complete for {coin}.")
     # save all features raw file for use in signal_generator
-    data.to_csv(f"datasets/raw/{coin}_historical_data_raw_all_features.csv", index=False, float_format="%f")
+    ds.write_dataset(data, f"datasets/raw/{coin}_historical_data_raw_all_features.csv")
+    stage_start = record_timing(timings, "write_all_features", stage_start)
     # Normalize, must happen after SMA calculation or will skew results
     data = normalize_data(data)
+    record_timing(timings, "normalization", stage_start)
     if verbose:
         print(f"Data normalization complete for {coin}.")
-    print()
+        print()
 
     return data
 
 
 
-if __name__ == "__main__":
-    # The following two coins have shorter histories and require a different start date {polkadot = 2020-08-23; solana = 2020-04-11}
-    #  coins = common.coins
-    coins = ["enjincoin"]
-    start_date = "2020-10-26"#"2020-08-23"#"2019-10-20"
-    yesterday = date.today() - timedelta(1)
-    end_date = yesterday
+#
+# ---------- BATCH PREPROCESSING ----------
+#
+def get_start_date(coin: str, start_dates: Dict[str, str] = START_DATES) -> str:
+    return start_dates.get(coin, DEFAULT_START_DATE)
+
+
+
+def fetch_missing_dates(coin: str, start_date: str, end_date: str) -> int:
+    '''
+    Fetches the dates missing from the coin's raw dataset between start_date and end_date and merges them into it.
+    Returns the number of dates that were missing.
+    NOTE: only reads the date column.
+    '''
+    data = ds.read_dataset(f"datasets/raw/{coin}_historical_data_raw.csv", columns=["date"])
+    missing_dates = get_missing_dates(data, start_date, end_date)
+    if len(missing_dates) > 0:
+        # coingecko (and the response cache) expect dd-mm-yyyy
+        common.fetch_missing_data_by_dates(coin, missing_dates.strftime("%d-%m-%Y").tolist())
+        common.merge_newly_aggregated_data(coin, by_range=False)
+
+    return len(missing_dates)
+
+
 
+def preprocess_coin(coin: str, start_date: str, end_date: str) -> Tuple[str, Dict[str, float]]:
+    '''
+    Preprocesses the coin's raw dataset and writes the clean dataset without touching the network, i.e., dates that are still missing (e.g., dead-lettered ones) are reported rather than fetched.
+    Returns a message and the duration of each stage.
+    '''
+    timings = {}
+    stage_start = time.perf_counter()
+    data = ds.read_dataset(f"datasets/raw/{coin}_historical_data_raw.csv")
+    stage_start = record_timing(timings, "read", stage_start)
+
+    missing_dates = get_missing_dates(data, start_date, end_date)
+    if len(missing_dates) > 0:
+        return f"{coin} is still missing {len(missing_dates)} dates (e.g., {missing_dates[0].date()}); skipped.", timings
+
+    data = clean_data(coin, data, start_date, end_date, timings=timings, fetch=False)
+    stage_start = time.perf_counter()
+    ds.write_dataset(data, f"datasets/clean/{coin}_historical_data_clean.csv")
+    record_timing(timings, "write_clean", stage_start)
+
+    return f"{coin} preprocessed from {start_date} until {end_date}.", timings
+
+
+
+def format_timings(coin: str, timings: Dict[str, float]) -> str:
+    stages = " | ".join([f"{stage}: {duration:.3f}s" for stage, duration in timings.items()])
+
+    return f"{coin:<15} total: {sum(timings.values()):>7.3f}s | {stages}"
+
+
+
+def preprocess_coins(coins: List[str], start_dates: Dict[str, str] = START_DATES, end_date: str = None, fetch: bool = True, n_workers: int = None) -> Dict[str, Dict[str, float]]:
+    '''
+    Preprocesses the coins in parallel (one process per coin, up to n_workers) from their start dates (see get_start_date) until end_date (yesterday by default).
+    Param fetch first fetches every coin's missing dates and refreshes the fear & greed index in this process; the workers never touch the network either way (see preprocess_coin).
+    Returns the duration of each stage per coin.
+    '''
+    if end_date is None:
+        end_date = str(date.today() - timedelta(1))
+
+    all_timings = {coin: {} for coin in coins}
+    if fetch:
+        for coin in coins:
+            stage_start = time.perf_counter()
+            n_missing_dates = fetch_missing_dates(coin, get_start_date(coin, start_dates), end_date)
+            record_timing(all_timings[coin], "fetch", stage_start)
+            if n_missing_dates > 0:
+                print(f"Fetched the {n_missing_dates} dates missing from {coin}.")
+        # once for every coin, before the workers look up their fear/greed gaps in the stored index
+        common.update_fear_greed_index()
+
+    with cf.ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = {executor.submit(preprocess_coin, coin, get_start_date(coin, start_dates), end_date): coin for coin in coins}
+        for future in cf.as_completed(futures):
+            coin = futures[future]
+            message, timings = future.result()
+            all_timings[coin].update(timings)
+            print(message)
+
+    print("\nTimings per coin:")
     for coin in coins:
-        complete = False
-        while not complete:
-            print(coin)
-            data = pd.read_csv(f"datasets/raw/{coin}_historical_data_raw.csv")
-            data = clean_data(coin, data, start_date, end_date, verbose=True)
-            if data is None:
-                print(f"The dataset was missing dates. Used utils/data_aggregator.py to collect the missing dates. Beginning preprocessing again.")
-            else:
-                data.to_csv(f"datasets/clean/{coin}_historical_data_clean.csv", index=False, float_format="%f")
-                complete = True
+        print(format_timings(coin, all_timings[coin]))
+
+    return all_timings
+
+
+
+def parse_start_dates(start_dates: List[str]) -> Dict[str, str]:
+    '''
+    Parses coin=yyyy-mm-dd pairs on top of the default START_DATES.
+    '''
+    parsed = dict(START_DATES)
+    for start_date in start_dates:
+        coin, _, day = start_date.partition("=")
+        parsed[coin] = str(datetime.strptime(day, "%Y-%m-%d").date())
+
+    return parsed
+
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preprocesses the raw datasets of several coins in parallel.")
+    parser.add_argument("coins", nargs="*", default=common.coins, help="coins to preprocess (default: common.coins)")
+    parser.add_argument("--start-date", action="append", default=[], metavar="COIN=YYYY-MM-DD", help=f"overrides a coin's first day (default: {DEFAULT_START_DATE} or START_DATES)")
+    parser.add_argument("--end-date", default=None, help="last day to preprocess (default: yesterday)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--no-fetch", action="store_true", help="do not fetch missing dates first")
+    args = parser.parse_args()
+
+    preprocess_coins(args.coins, parse_start_dates(args.start_date), args.end_date, not args.no_fetch, args.workers)
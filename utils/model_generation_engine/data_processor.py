@@ -3,15 +3,26 @@ This file is used to train neural nets.
 RUN: $ python3 -m utils.model_generation_engine.data_processor
 '''
 import os
+import functools
 import glob
 import pandas as pd
 import torch
 import time
 import numpy as np
 from datetime import datetime
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Tuple
 from .. import common
+from . import model_bank as mb
 from . import neural_nets as nn
+from . import search_scheduler as ss
+from . import sweep_executor as se
+
+# the columns of the parameter tuning results table (see record_tuning_trial)
+TUNING_RESULT_COLUMNS = ["model_number", "eta", "decay", "dropout", "final_valid_loss", "perfect", "safe_fail", "nasty_fail", "catastrophic_fail"]
+# the columns of the search results table, one row per config and rung (see record_search_trial)
+SEARCH_RESULT_COLUMNS = ["model_number", "eta", "decay", "dropout", "n_epochs", "final_valid_loss", "lowest_valid_loss"]
+# the ranges of get_parameter_grid, for a search_scheduler.RandomSampler
+PARAMETER_RANGES = {"eta": (0.00025, 0.01), "decay": (0.9999, 0.99998), "dropout": (0.05, 0.8)}
 
 #
 # ------------ DELETING FUNCTIONS -----------
@@ -112,13 +123,55 @@ def take_one_step(model: nn.CryptoSoothsayer, features: List[float], target: flo
     loss.backward()
     model.get_optimizer().step()
     # adjust learning rate
-    model.get_scheduler().step()
+    model.step_scheduler()
+    train_loss = loss.item()
+
+    return train_loss
+
+
+
+def take_one_batch(model: nn.CryptoSoothsayer, features: np.ndarray, targets: np.ndarray) -> float:
+    '''
+    Forward propogates a mini-batch of feature vectors (one row per sample) through the network, then back propogates based on their mean loss.
+    Returns the mean training loss of the batch.
+    '''
+    # set to train mode here to activate components like dropout
+    model.train()
+    # make data pytorch compatible
+    feature_tensor, target_tensor = common.convert_batch_to_tensors(model, features, targets)
+    # Forward
+    model_output = model(feature_tensor)
+    loss = model.get_criterion()(model_output, target_tensor)
+    # Backward
+    model.get_optimizer().zero_grad()
+    loss.backward()
+    model.get_optimizer().step()
+    # adjust learning rate as much as len(targets) single steps would have
+    model.step_scheduler(len(targets))
     train_loss = loss.item()
 
     return train_loss
 
 
 
+def train_per_sample(model: nn.CryptoSoothsayer, train_data: List[Tuple[List[float], float]]) -> Iterator[Tuple[int, float]]:
+    '''
+    Yields the number of samples trained on and their summed training loss after every step.
+    '''
+    for features, target in train_data:
+        yield 1, take_one_step(model, features, target)
+
+
+
+def train_by_batch(model: nn.CryptoSoothsayer, train_data: List[Tuple[List[float], float]], batch_size: int) -> Iterator[Tuple[int, float]]:
+    '''
+    Same as train_per_sample, but each step trains on a mini-batch of batch_size samples.
+    '''
+    for features, targets in common.iter_batches(train_data, batch_size):
+        yield len(targets), take_one_batch(model, features, targets) * len(targets)
+
+
+
 def terminate_early(prev_valid_losses: List[float]) -> bool:
     '''
     Sends signal to terminate early if the validation loss is increasing over a 10-batch interval.
@@ -141,12 +194,17 @@ def terminate_early(prev_valid_losses: List[float]) -> bool:
 
 
 
-def fully_train(model: nn.CryptoSoothsayer, data: Tuple[List[float], float], start_time: float, filepath: str, n_epochs: int = 20, batch_size: int = 256) -> float:
+def fully_train(model: nn.CryptoSoothsayer, data: Tuple[List[float], float], start_time: float, filepath: str, n_epochs: int = 20, batch_size: int = 256, per_sample: bool = False, lowest_valid_loss: float = np.inf) -> float:
+    '''
+    Trains on mini-batches of batch_size samples and validates after every batch (and at the end of the dataset).
+    Param per_sample trains on one sample at a time instead, still validating every batch_size samples, as the models were originally trained.
+    Param lowest_valid_loss is that of the weights already saved to filepath (e.g., when resuming training), so that they are only overwritten by better ones.
+    NOTE: eta decays by eta_decay per sample in both modes (see CryptoSoothsayer.step_scheduler).
+    '''
     # unpack training and validation datasets
     train_data, valid_data = data
 
     epoch = 0
-    lowest_valid_loss = np.inf
     last_valid_loss = 0.0
     prev_valid_losses = []
 
@@ -156,13 +214,18 @@ def fully_train(model: nn.CryptoSoothsayer, data: Tuple[List[float], float], sta
         steps = 0
         total_train_loss = 0.0
         total_valid_loss = 0.0
+        epoch_start_time = time.time()
+
+        if per_sample:
+            training_steps = train_per_sample(model, train_data)
+        else:
+            training_steps = train_by_batch(model, train_data, batch_size)
 
-        for features, target in train_data:
-            steps += 1
-            # train model on features
-            total_train_loss += take_one_step(model, features, target)
+        for n_samples, train_loss in training_steps:
+            steps += n_samples
+            total_train_loss += train_loss
             # if end of batch or end of dataset, validate model
-            if steps % batch_size == 0 or steps == len(train_data)-1:
+            if steps % batch_size == 0 or steps - n_samples < len(train_data)-1 <= steps:
                 valid_loss, lowest_valid_loss = common.validate_model(model, valid_data, lowest_valid_loss, filepath)
 
                 if valid_loss < lowest_valid_loss:
@@ -183,70 +246,202 @@ def fully_train(model: nn.CryptoSoothsayer, data: Tuple[List[float], float], sta
         last_valid_loss = prev_valid_losses[-1]
         epoch += 1
 
-        report = f"Time elapsed by epoch {epoch+1}: {round((time.time() - start_time)) / 60} mins."
+        report = f"Time elapsed by epoch {epoch+1}: {round((time.time() - start_time)) / 60} mins. | Throughput: {steps / (time.time() - epoch_start_time):.0f} samples/sec"
         print(report)
 
     return last_valid_loss
 
 
 
+def fully_train_bank(bank: mb.ModelBank, data: Tuple[List[float], float], start_time: float, filepaths: List[str], n_epochs: int = 20, batch_size: int = 256) -> List[float]:
+    '''
+    Same as fully_train, but trains every model of the bank at once, each one saving its lowest validation loss weights to its own filepath.
+    NOTE: a model whose validation loss stagnates is frozen until the end of the epoch, as fully_train would have ended the epoch of that model.
+    Returns every model's last validation loss.
+    '''
+    # unpack training and validation datasets
+    train_data, valid_data = data
+
+    epoch = 0
+    lowest_valid_losses = np.full(len(bank), np.inf)
+    prev_valid_losses = [[] for _ in range(len(bank))]
+
+    while epoch < n_epochs:
+        # setup
+        train_data = common.shuffle_data(train_data)
+        bank.unfreeze_all()
+        steps = 0
+        total_train_losses = np.zeros(len(bank))
+        total_valid_losses = np.zeros(len(bank))
+        epoch_start_time = time.time()
+
+        for features, targets in common.iter_batches(train_data, batch_size):
+            steps += len(targets)
+            total_train_losses += bank.take_one_batch(features, targets) * len(targets)
+            # if end of batch or end of dataset, validate the models still training
+            if steps % batch_size == 0 or steps - len(targets) < len(train_data)-1 <= steps:
+                valid_losses = bank.validate(*common.convert_dataset_to_tensors(bank, valid_data))
+
+                for model_ind in np.flatnonzero(bank.active.cpu().numpy()):
+                    if valid_losses[model_ind] < lowest_valid_losses[model_ind]:
+                        lowest_valid_losses[model_ind] = valid_losses[model_ind]
+                        common.save_model(bank.get_model(model_ind), filepaths[model_ind])
+
+                    total_valid_losses[model_ind] += valid_losses[model_ind]
+                    prev_valid_losses[model_ind].append(round(total_valid_losses[model_ind] / (steps / batch_size), 4))
+
+                    if terminate_early(prev_valid_losses[model_ind]):
+                        bank.freeze(model_ind)
+
+                now = datetime.now().strftime("%H:%M:%S")
+                print(f"System Time: {now} | Time Elapsed: {(time.time() - start_time) / 60:.1f} mins. | Models Training: {int(bank.active.sum())}/{len(bank)} | Best Avg. Training Loss: {np.min(total_train_losses / steps):.4f} | Best Avg. Validation Loss: {np.min([losses[-1] for losses in prev_valid_losses]):.4f}")
+
+                if not bank.active.any():
+                    print("\nTerminated epoch early due to stagnating or increasing validation loss of every model.\n\n")
+                    break
+
+        epoch += 1
+
+        report = f"Time elapsed by epoch {epoch+1}: {round((time.time() - start_time)) / 60} mins. | Throughput: {steps * len(bank) / (time.time() - epoch_start_time):.0f} samples/sec (over all {len(bank)} models)"
+        print(report)
+
+    return [losses[-1] for losses in prev_valid_losses]
+
+
+
 #
 # ------------- Find the Most Promising Models -----------------
 #
-def parameter_tuner(coin: str, hidden_layer_size: int, data_aug_factor: int = 16) -> None:
-    batch_size = 256
-    n_epochs = 5
-
-    # ------------ DATA GENERATION ----------
-    print("Creating datasets...")
-    try:
-        train_data, valid_data, test_data = common.get_datasets(coin, data_aug_factor)
-    except:
-        raise
-
-    # ------------ MODEL TRAINING -----------
-    model_number = 0
+def get_parameter_grid() -> List[dict]:
+    '''
+    Returns the eta x decay x dropout grid searched by parameter_tuner, each trial numbered in search order.
+    '''
+    grid = []
     for eta in np.arange(0.00025, 0.01025, 0.00025):
         for decay in np.arange(0.9999, 0.99999, 0.00001):
             for dropout in np.arange(0.05, 0.85, 0.05):
-                print("Start of new Experiment\n__________________________")
-                print(f"Model #{model_number}")
-                print(f"Eta: {eta} | Decay: {decay} | Dropout: {dropout}")
-                report = ""
+                grid.append({"model_number": len(grid), "eta": eta, "decay": decay, "dropout": dropout})
 
-                model = common.create_nn_model(hidden_layer_size, dropout, eta, decay)
+    return grid
 
-                # train model
-                start_time = time.time()
-                final_valid_loss = fully_train(model, (train_data, valid_data), start_time, f"models/{coin}_{model.get_model_name()}_{model_number}_param_tuning.pt", n_epochs=n_epochs)
 
-                # ------------ MODEL TESTING -----------
-                # evaluate model
-                model_acc = common.evaluate_model(model, test_data)
-                model_acc_report = f"MODEL: {model_number}\nFinal Validation Loss: {final_valid_loss}\nPARAMETERS:\n\t{model.get_model_name()}\n\teta: {model.get_eta()} | decay: {model.get_eta_decay()} | dropout: {model.get_dropout().p}\nDECISIONS:\n\tPerfect Decision: {model_acc[0]}\n\tTold to Hodl, though Should Have Bought/Sold: {model_acc[1]}\n\tSignal Should Have Been Hodl: {model_acc[2]}\n\tSignal and Answer Exact Opposite: {model_acc[3]}"
-                report += model_acc_report
-                print(model_acc_report)
 
-                # ------------ RESULT HANDLING -----------
-                # automatically save the best models to best as is
-                if model_acc[0] > common.OUTSTANDING_ACCURACY_THRESHOLD and model_acc[3] < common.INACCURACY_THRESHOLD:
-                    save_filepath = f"models/best/{coin}_{model.get_model_name()}_{model_number}_{int(round(model_acc[0], 2) * 100)}-{int(round(model_acc[3], 2))}_{data_aug_factor}xaug.pt"
-                    common.save_model(model, save_filepath)
-                    with open(f"reports/{coin}_best_performers.txt", 'a') as f:
-                        f.write(save_filepath + '\n')
+def run_tuning_trial(coin: str, hidden_layer_size: int, n_epochs: int, data_aug_factor: int, datasets: Dict[str, List[Tuple[List[float], float]]], trial: dict) -> dict:
+    '''
+    Trains and evaluates the model of one grid point of parameter_tuner (see finish_tuning_trial).
+    '''
+    model_number = trial["model_number"]
+    print("Start of new Experiment\n__________________________")
+    print(f"Model #{model_number}")
+    print(f"Eta: {trial['eta']} | Decay: {trial['decay']} | Dropout: {trial['dropout']}")
 
-                # save the model to the promising models folder
-                if model_acc[0] > common.PROMISING_ACCURACY_THRESHOLD and model_acc[3] < common.INACCURACY_THRESHOLD:
-                    save_filepath = f"models/promising/{coin}_{model.get_model_name()}_{model_number}_param_tuning.pt"
-                    common.save_model(model, save_filepath)
+    model = common.create_nn_model(hidden_layer_size, trial["dropout"], trial["eta"], trial["decay"])
 
-                # write the report independent of performance
-                with open(f"reports/{coin}_Parameter_Tuning_Report_{model.get_model_name()}.txt", "a") as f:
-                    f.write(report + "\n\n")
+    # train model
+    start_time = time.time()
+    final_valid_loss = fully_train(model, (datasets["train"], datasets["valid"]), start_time, f"models/{coin}_{model.get_model_name()}_{model_number}_param_tuning.pt", n_epochs=n_epochs)
+
+    return finish_tuning_trial(coin, data_aug_factor, model, trial, final_valid_loss, datasets["test"])
 
-                    print("Report written")
 
-                model_number += 1
+
+def run_tuning_bank(coin: str, hidden_layer_size: int, n_epochs: int, data_aug_factor: int, datasets: Dict[str, List[Tuple[List[float], float]]], bank_trial: dict) -> List[dict]:
+    '''
+    Same as run_tuning_trial, but trains the models of all the grid points in bank_trial["trials"] at once in a ModelBank.
+    Returns the output of every grid point.
+    '''
+    trials = bank_trial["trials"]
+    print("Start of new Experiment\n__________________________")
+    print(f"Models #{trials[0]['model_number']} to #{trials[-1]['model_number']}")
+
+    bank = mb.ModelBank(hidden_layer_size, [trial["eta"] for trial in trials], [trial["decay"] for trial in trials], [trial["dropout"] for trial in trials])
+    filepaths = [f"models/{coin}_Hidden_{hidden_layer_size}_{trial['model_number']}_param_tuning.pt" for trial in trials]
+
+    # train models
+    start_time = time.time()
+    final_valid_losses = fully_train_bank(bank, (datasets["train"], datasets["valid"]), start_time, filepaths, n_epochs=n_epochs)
+
+    return [finish_tuning_trial(coin, data_aug_factor, bank.get_model(model_ind), trial, final_valid_losses[model_ind], datasets["test"]) for model_ind, trial in enumerate(trials)]
+
+
+
+def finish_tuning_trial(coin: str, data_aug_factor: int, model: nn.CryptoSoothsayer, trial: dict, final_valid_loss: float, test_data: List[Tuple[List[float], float]]) -> dict:
+    '''
+    Evaluates the trained model of a grid point, saving it to models/best and/or models/promising if it performs well enough.
+    Returns the trial's report, its results (see TUNING_RESULT_COLUMNS) and the filepath it was saved to in models/best (if any) for the caller to record.
+    '''
+    model_number = trial["model_number"]
+
+    # ------------ MODEL TESTING -----------
+    # evaluate model
+    model_acc = common.evaluate_model(model, test_data)
+    report = f"MODEL: {model_number}\nFinal Validation Loss: {final_valid_loss}\nPARAMETERS:\n\t{model.get_model_name()}\n\teta: {model.get_eta()} | decay: {model.get_eta_decay()} | dropout: {model.get_dropout().p}\nDECISIONS:\n\tPerfect Decision: {model_acc[0]}\n\tTold to Hodl, though Should Have Bought/Sold: {model_acc[1]}\n\tSignal Should Have Been Hodl: {model_acc[2]}\n\tSignal and Answer Exact Opposite: {model_acc[3]}"
+    print(report)
+
+    # ------------ RESULT HANDLING -----------
+    # automatically save the best models to best as is
+    best_filepath = None
+    if model_acc[0] > common.OUTSTANDING_ACCURACY_THRESHOLD and model_acc[3] < common.INACCURACY_THRESHOLD:
+        best_filepath = f"models/best/{coin}_{model.get_model_name()}_{model_number}_{int(round(model_acc[0], 2) * 100)}-{int(round(model_acc[3], 2))}_{data_aug_factor}xaug.pt"
+        common.save_model(model, best_filepath)
+
+    # save the model to the promising models folder
+    if model_acc[0] > common.PROMISING_ACCURACY_THRESHOLD and model_acc[3] < common.INACCURACY_THRESHOLD:
+        common.save_model(model, f"models/promising/{coin}_{model.get_model_name()}_{model_number}_param_tuning.pt")
+
+    results = [model_number, trial["eta"], trial["decay"], trial["dropout"], final_valid_loss] + model_acc
+
+    return {"report": report, "results": results, "best_filepath": best_filepath}
+
+
+
+def record_tuning_trial(coin: str, hidden_layer_size: int, trial_output: dict) -> None:
+    '''
+    Appends the output of a run_tuning_trial to the parameter tuning report, the results table and (if saved to models/best) the list of best performers.
+    '''
+    if trial_output["best_filepath"] is not None:
+        with open(f"reports/{coin}_best_performers.txt", 'a') as f:
+            f.write(trial_output["best_filepath"] + '\n')
+
+    results_filepath = f"reports/{coin}_Parameter_Tuning_Results_Hidden_{hidden_layer_size}.csv"
+    pd.DataFrame([trial_output["results"]], columns=TUNING_RESULT_COLUMNS).to_csv(results_filepath, mode='a', header=not os.path.exists(results_filepath), index=False)
+
+    # write the report independent of performance
+    with open(f"reports/{coin}_Parameter_Tuning_Report_Hidden_{hidden_layer_size}.txt", "a") as f:
+        f.write(trial_output["report"] + "\n\n")
+
+        print("Report written")
+
+
+
+def parameter_tuner(coin: str, hidden_layer_size: int, data_aug_factor: int = 16, n_workers: int = None, bank_size: int = None) -> None:
+    '''
+    Trains and evaluates a model for every grid point of get_parameter_grid, spread over n_workers processes (one per core by default; see sweep_executor.run_sweep).
+    Param bank_size trains that many grid points at once in a ModelBank per process (see run_tuning_bank) rather than one model at a time.
+    NOTE: the trials only save their own model files, while this process records every result as the trials finish.
+    '''
+    n_epochs = 5
+
+    # ------------ DATA GENERATION ----------
+    print("Creating datasets...")
+    try:
+        train_data, valid_data, test_data = common.get_datasets(coin, data_aug_factor, lazy=True)
+    except:
+        raise
+
+    # ------------ MODEL TRAINING -----------
+    datasets = {"train": train_data, "valid": valid_data, "test": test_data}
+    grid = get_parameter_grid()
+    if bank_size is None:
+        trial_fn = functools.partial(run_tuning_trial, coin, hidden_layer_size, n_epochs, data_aug_factor)
+        for _, trial_output in se.run_sweep(trial_fn, grid, datasets, n_workers):
+            record_tuning_trial(coin, hidden_layer_size, trial_output)
+    else:
+        trial_fn = functools.partial(run_tuning_bank, coin, hidden_layer_size, n_epochs, data_aug_factor)
+        bank_trials = [{"trials": grid[start:start+bank_size]} for start in range(0, len(grid), bank_size)]
+        for _, trial_outputs in se.run_sweep(trial_fn, bank_trials, datasets, n_workers):
+            for trial_output in trial_outputs:
+                record_tuning_trial(coin, hidden_layer_size, trial_output)
 
 
 
@@ -261,7 +456,7 @@ def continue_training(coin: str, model_architecture: str, data_aug_factor: int =
     start_time = time.time()
     print("Creating datasets...")
     try:
-        train_data, valid_data, test_data = common.get_datasets(coin, data_aug_factor)
+        train_data, valid_data, test_data = common.get_datasets(coin, data_aug_factor, lazy=True)
     except:
         raise
 
@@ -351,25 +546,115 @@ def transfer_learner(coin: str, data_aug_factor: int = 16) -> None:
 
 
 
+#
+# ------------- Adaptive Search: Parameter Tuning and Continued Training in One Run -----------------
+#
+def run_search_trial(coin: str, hidden_layer_size: int, data_aug_factor: int, datasets: Dict[str, List[Tuple[List[float], float]]], trial: dict) -> dict:
+    '''
+    Trains the model of a config for trial["n_epochs"] more epochs. If trial["resume"], training picks up exactly where the previous rung stopped (latest weights, optimizer state and decayed eta; see save_training_state), and the lowest validation loss weights of the previous rung are only overwritten by better ones.
+    If trial["evaluate"] (i.e., in the last rung), also evaluates the lowest validation loss weights like continue_training does (see finish_tuning_trial).
+    Returns the running average validation loss at the end of training and the lowest validation loss so far (on which the search ranks the configs).
+    '''
+    model_number = trial["model_number"]
+    print(f"Model #{model_number} | Eta: {trial['eta']} | Decay: {trial['decay']} | Dropout: {trial['dropout']} | Epochs: {trial['n_epochs']}")
+
+    model = common.create_nn_model(hidden_layer_size, trial["dropout"], trial["eta"], trial["decay"])
+    filepath = f"models/{coin}_{model.get_model_name()}_{model_number}_param_tuning.pt"
+    state_filepath = f"models/{coin}_{model.get_model_name()}_{model_number}_param_tuning_state.pt"
+    lowest_valid_loss = np.inf
+    if trial["resume"]:
+        lowest_valid_loss = common.load_training_state(model, state_filepath)
+
+    start_time = time.time()
+    final_valid_loss = fully_train(model, (datasets["train"], datasets["valid"]), start_time, filepath, n_epochs=trial["n_epochs"], lowest_valid_loss=lowest_valid_loss)
+
+    # the weights at filepath are the lowest validation loss ones, of this or an earlier rung
+    best_model = common.load_model(common.create_nn_model(hidden_layer_size, trial["dropout"], trial["eta"], trial["decay"]), filepath)
+    lowest_valid_loss, _ = common.validate_model(best_model, datasets["valid"], lowest_valid_loss, filepath)
+    common.save_training_state(model, lowest_valid_loss, state_filepath)
+
+    trial_output = None
+    if trial["evaluate"]:
+        trial_output = finish_tuning_trial(coin, data_aug_factor, best_model, trial, final_valid_loss, datasets["test"])
+
+    return {"final_valid_loss": final_valid_loss, "lowest_valid_loss": lowest_valid_loss, "trial_output": trial_output}
+
+
+
+def record_search_trial(coin: str, hidden_layer_size: int, trial: dict, n_epochs: int, search_output: dict) -> None:
+    '''
+    Appends the validation losses of a config after n_epochs (in total) to the search results table, and its evaluation (if any) like record_tuning_trial.
+    '''
+    results_filepath = f"reports/{coin}_Search_Results_Hidden_{hidden_layer_size}.csv"
+    results = [trial["model_number"], trial["eta"], trial["decay"], trial["dropout"], n_epochs, search_output["final_valid_loss"], search_output["lowest_valid_loss"]]
+    pd.DataFrame([results], columns=SEARCH_RESULT_COLUMNS).to_csv(results_filepath, mode='a', header=not os.path.exists(results_filepath), index=False)
+
+    if search_output["trial_output"] is not None:
+        record_tuning_trial(coin, hidden_layer_size, search_output["trial_output"])
+
+
+
+def search_parameters(coin: str, hidden_layer_size: int, data_aug_factor: int = 32, sampler = None, n_configs: int = 729, min_epochs: int = 1, max_epochs: int = 27, reduction_factor: int = 3, use_hyperband: bool = False, n_workers: int = None) -> Dict[int, float]:
+    '''
+    Replaces parameter_tuner followed by continue_training with one adaptive search: successive halving (or Hyperband, see search_scheduler) over the configs of param sampler, every rung spread over n_workers processes.
+    Param sampler is a search_scheduler.RandomSampler over PARAMETER_RANGES by default; pass search_scheduler.GridSampler(get_parameter_grid()) (and n_configs = None for all of it) to search the grid of parameter_tuner.
+    Param n_configs is the number of configs started by successive halving (Hyperband decides on its own).
+    NOTE: only the configs that make it through the last rung are evaluated, saved and reported like in parameter_tuner; every rung's validation losses go to the search results table.
+    Returns the lowest validation loss (by which every rung ranks the configs) per model_number of those configs.
+    '''
+    # ------------ DATA GENERATION ----------
+    print("Creating datasets...")
+    try:
+        train_data, valid_data, test_data = common.get_datasets(coin, data_aug_factor, lazy=True)
+    except:
+        raise
+
+    # ------------ MODEL TRAINING -----------
+    datasets = {"train": train_data, "valid": valid_data, "test": test_data}
+    trial_fn = functools.partial(run_search_trial, coin, hidden_layer_size, data_aug_factor)
+    trained_epochs = {}
+
+    def run_rung(configs: List[dict], n_epochs: int, resume: bool, is_last_rung: bool) -> Dict[int, float]:
+        trials = [dict(config, n_epochs=n_epochs, resume=resume, evaluate=is_last_rung) for config in configs]
+        valid_losses = {}
+        for trial, search_output in se.run_sweep(trial_fn, trials, datasets, n_workers):
+            model_number = trial["model_number"]
+            trained_epochs[model_number] = trained_epochs.get(model_number, 0) + n_epochs
+            valid_losses[model_number] = search_output["lowest_valid_loss"]
+            record_search_trial(coin, hidden_layer_size, trial, trained_epochs[model_number], search_output)
+
+        return valid_losses
+
+    if sampler is None:
+        sampler = ss.RandomSampler(PARAMETER_RANGES)
+
+    if use_hyperband:
+        return ss.hyperband(sampler, run_rung, min_epochs, max_epochs, reduction_factor)
+
+    if n_configs is None:
+        n_configs = len(sampler)
+
+    return ss.successive_halving(sampler.sample(n_configs), run_rung, min_epochs, max_epochs, reduction_factor)
+
+
+
 #
 # ------------ CONTROLLER METHOD ---------------
 #
 def fully_automated_training_pipeline() -> None:
     '''
-    Pipeline involves five steps:
+    Pipeline involves four steps:
 
-        1.) Parameter tune:     find the most promising learning rates, decay rates, and dropout rates for the given architecture
-        2.) Continue training:  take all the promising models found in the first step and give them more time to train
-        3.) Cleanup:            delete all extraneous files created in the first two phases
-        4.) Pruning models:     hold all models to more rigorous standards and keep only those that match
-        5.) Make a list:        list all the best performers (for use in the signal_generator script)
+        1.) Search parameters:  find the most promising learning rates, decay rates, and dropout rates for the given architecture, giving only the most promising models more time to train (replaces parameter_tuner followed by continue_training)
+        2.) Cleanup:            delete all extraneous files created in the first phase
+        3.) Pruning models:     hold all models to more rigorous standards and keep only those that match
+        4.) Make a list:        list all the best performers (for use in the signal_generator script)
     '''
     coin = "ethereum"
     layer_sizes = [25] #[x for x in range(nn.N_SIGNALS+2, nn.N_FEATURES)]
 
     for hidden_layer_size in layer_sizes:
-        parameter_tuner(coin, hidden_layer_size, data_aug_factor=32)
-        continue_training(coin, "Hidden_" + str(hidden_layer_size), data_aug_factor=64)
+        search_parameters(coin, hidden_layer_size, data_aug_factor=32)
         cleanup(coin)
         common.prune_models_by_accuracy(coin)
         make_and_save_list_of_best_performers(coin)
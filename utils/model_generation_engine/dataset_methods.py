@@ -1,10 +1,20 @@
+import numpy as np
 import os
 import pandas as pd
 import random
 import time
 import torch
+from . import dataset_storage as ds
+from . import dataset_validator as dv
+from .array_dataset import ArrayDataset
+from .augmented_dataset import AugmentedDataset
 from . import neural_nets as nn
-from typing import List, Tuple
+from .. import common
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+# the columns of an artifact audit log (see remove_greater_than_one_artifacts)
+ARTIFACT_AUDIT_COLUMNS = ["timestamp", "coin", "date", "column", "old_value", "new_value", "factor"]
 
 #
 # ---------- HELPER METHODS ----------
@@ -13,7 +23,7 @@ def convert_to_tensor(model: nn.CryptoSoothsayer, features: List[float], target:
     '''
     Converts the feature vector and target into pytorch-compatible tensors.
     '''
-    feature_tensor = torch.tensor([features], dtype=torch.float32)
+    feature_tensor = torch.tensor(np.asarray([features], dtype=np.float32))
     feature_tensor = feature_tensor.to(model.get_device())
     target_tensor = torch.tensor([target], dtype=torch.int64)
     target_tensor = target_tensor.to(model.get_device())
@@ -22,11 +32,66 @@ def convert_to_tensor(model: nn.CryptoSoothsayer, features: List[float], target:
 
 
 
+def convert_batch_to_tensors(model: nn.CryptoSoothsayer, features: np.ndarray, targets: np.ndarray) -> Tuple[torch.tensor, torch.tensor]:
+    '''
+    Converts a feature matrix and target vector (one row/target per sample) into pytorch-compatible tensors.
+    '''
+    feature_tensor = torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32)).to(model.get_device())
+    target_tensor = torch.from_numpy(np.ascontiguousarray(targets, dtype=np.int64)).to(model.get_device())
+
+    return feature_tensor, target_tensor
+
+
+
+def stack_rows(data: List[Tuple[List[float], float]]) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Stacks a list of (features, target) tuples into a feature matrix and a target vector.
+    '''
+    features = np.array([features for features, _ in data], dtype=np.float32).reshape(len(data), -1)
+    targets = np.array([target for _, target in data], dtype=np.int64)
+
+    return features, targets
+
+
+
+def convert_dataset_to_tensors(model: nn.CryptoSoothsayer, data: List[Tuple[List[float], float]]) -> Tuple[torch.tensor, torch.tensor]:
+    '''
+    Converts a whole dataset into a feature tensor (one row per sample) and a target tensor on the model's device.
+    NOTE: the tensors of an ArrayDataset are built once and cached (see ArrayDataset.get_tensors), whereas a Python list is converted on every call.
+    '''
+    if isinstance(data, ArrayDataset):
+        return data.get_tensors(model.get_device())
+
+    return convert_batch_to_tensors(model, *stack_rows(data))
+
+
+
+def iter_batches(data: List[Tuple[List[float], float]], batch_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    '''
+    Yields the (feature matrix, target vector) batches of param data in its current order, the last batch holding the remaining samples.
+    NOTE: Param data is a Python list, an ArrayDataset or an AugmentedDataset (whose epoch is drawn chunk by chunk).
+    '''
+    if isinstance(data, AugmentedDataset):
+        chunks = data.iter_batches()
+    elif isinstance(data, ArrayDataset):
+        chunks = [(data.features, data.labels)]
+    else:
+        chunks = [stack_rows(data)]
+
+    for features, targets in chunks:
+        for start in range(0, len(targets), batch_size):
+            yield features[start:start+batch_size], targets[start:start+batch_size]
+
+
+
 def shuffle_data(data: List[Tuple[List[float], float]]) -> List[Tuple[List[float], float]]:
     '''
     Used for shuffling the data during the training/validation phases.
-    NOTE: Param data is a Python list.
+    NOTE: Param data is a Python list, an ArrayDataset (whose rows are permuted all at once) or an AugmentedDataset (which draws a new random epoch every time anyway).
     '''
+    if isinstance(data, (ArrayDataset, AugmentedDataset)):
+        return data.shuffled()
+
     size = len(data)
     for row_ind in range(size):
         swap_row_ind = random.randrange(size)
@@ -40,20 +105,27 @@ def shuffle_data(data: List[Tuple[List[float], float]]) -> List[Tuple[List[float
 
 def check_if_data_is_clean(data: pd.DataFrame) -> None:
     '''
-    Checks for any anomalous, unnormalized data in all columns except the signal column.
+    Checks for any anomalous, unnormalized data in all columns except the signal column, as well as NaN/inf values and dates that are not strictly increasing.
+    NOTE: raises a ValueError reporting every violation (see dataset_validator).
     '''
-    for c in range(len(data.columns)-1):
-        for r in range(len(data)):
-            if (data.iloc[r, c] > 1):
-                raise Exception(f"Data unfit for processing! Unnormalized data still present in the dataset in column = {data.columns[c]}, row = {r}.")
+    dv.check_data(data)
+
 
 
+def get_complete_filepath(coin: str) -> str:
+    return f"datasets/complete/{coin}_historical_data_complete.csv"
 
-def load_data(coin: str) -> pd.DataFrame:
+
+
+def load_data(coin: str, check: bool = False) -> pd.DataFrame:
     '''
     Loads relevant data for given coin.
+    Param check validates the dataset (dates included) first, unless the same file already passed (see dataset_validator.check_dataset).
     '''
-    data = pd.read_csv(f"datasets/complete/{coin}_historical_data_complete.csv")
+    data = ds.read_dataset(get_complete_filepath(coin))
+    if check:
+        # the mega dataset of all coins is newest first with one row per coin and date (see merge_datasets)
+        dv.check_dataset(get_complete_filepath(coin), data, newest_first=coin == "all")
     data = data.drop(columns=["date"])
     data["signal"] = data["signal"].astype("int64")
 
@@ -64,53 +136,78 @@ def load_data(coin: str) -> pd.DataFrame:
 #
 # ---------- DATASET CREATION ----------
 #
-def generate_dataset(data: pd.DataFrame, limit: int, offset: int, data_aug_per_sample: int = 0) -> List[Tuple[List[float], float]]:
+def get_signal_ratios(labels: np.ndarray) -> np.ndarray:
+    '''
+    Returns, per signal (i.e., indexed by the signal itself), how many times rarer it is than the most frequent signal; signals that do not occur get 0.
+    '''
+    counts = np.bincount(labels)
+    signal_ratios = np.zeros(len(counts))
+    signal_ratios[counts > 0] = counts.max() / counts[counts > 0]
+
+    return signal_ratios
+
+
+
+def get_n_copies(labels: np.ndarray, signal_ratios: np.ndarray, data_aug_per_sample: int) -> np.ndarray:
+    '''
+    Returns the number of datapoints per row: the original one plus data_aug_per_sample * its signal's (rounded) ratio augmented ones.
     '''
-    Returns a list of tuples, of which the first element of the tuple is the list of values for the features and the second is the target value
+    return 1 + data_aug_per_sample * np.round(signal_ratios[labels]).astype(np.int64)
+
+
+
+def generate_dataset(data: pd.DataFrame, limit: int, offset: int, data_aug_per_sample: int = 0, seed: int = None) -> ArrayDataset:
+    '''
+    Returns the rows from offset until limit as an ArrayDataset, i.e., a float32 feature matrix (every column but the signal) and an int64 label vector (the signal).
     NOTES:
     - data_aug_per_sample param determines how many extra datapoints to generate per each original datapoint * its frequency metric (i.e., signal_ratios)
     - signal_ratios variable is used to upsample underrepresented categories more than their counterparts when augmenting the data
+    - each augmented datapoint follows its original one and has every feature multiplied by its own random factor in [1-1e-6, 1+1e-6)
+    - param seed makes the augmentation reproducible
     '''
+    values = data.to_numpy()
+    features = values[offset:limit, :-1].astype(np.float64)
+    labels = values[offset:limit, -1].astype(np.int64)
+    if data_aug_per_sample == 0 or len(labels) == 0:
+        return ArrayDataset(features, labels)
+
     # to determine relative frequency of signals
-    new_data = data.iloc[:limit,:]
-    vals = new_data["signal"].value_counts().sort_index()
-    signal_ratios = [vals.max()/x for x in vals]
+    signal_ratios = get_signal_ratios(values[:limit, -1].astype(np.int64))
 
-    dataset = []
-    for row in range(offset, limit):
-        target = data.iloc[row, -1]
-        row_features = []
+    # this evens out the datapoints per category
+    n_copies = get_n_copies(labels, signal_ratios, data_aug_per_sample)
+    features = np.repeat(features, n_copies, axis=0)
+    labels = np.repeat(labels, n_copies)
 
-        # -1 excludes the signal column
-        for feature in range(data.shape[1] - 1):
-            row_features.append(data.iloc[row, feature])
-        datapoint_tuple = (row_features, target)
-        dataset.append(datapoint_tuple)
+    # the first copy of each row is the original datapoint
+    is_augmented = np.ones(len(labels), dtype=bool)
+    is_augmented[np.cumsum(n_copies) - n_copies] = False
+    rng = np.random.default_rng(seed)
+    features[is_augmented] *= 1 + rng.uniform(-0.000001, 0.000001, (is_augmented.sum(), features.shape[1]))
 
-        # this evens out the datapoints per category
-        for i in range(data_aug_per_sample * round(signal_ratios[target])):
-            row_features_aug = []
-            # -1 excludes the signal column
-            for feature in range(data.shape[1] - 1):
-                rand_factor = 1 + random.uniform(-0.000001, 0.000001)
-                row_features_aug.append(data.iloc[row, feature] * rand_factor)
-            datapoint_tuple_aug = (row_features_aug, target)
-            dataset.append(datapoint_tuple_aug)
+    return ArrayDataset(features, labels)
+
+
+
+def generate_lazy_dataset(data: pd.DataFrame, limit: int, offset: int, data_aug_per_sample: int = 0, seed: int = None) -> AugmentedDataset:
+    '''
+    Same datapoints per epoch as generate_dataset, but the augmented ones are only generated when they are drawn (see augmented_dataset), so memory does not grow with data_aug_per_sample.
+    '''
+    values = data.to_numpy()
+    labels = values[offset:limit, -1].astype(np.int64)
+    signal_ratios = get_signal_ratios(values[:limit, -1].astype(np.int64))
 
-    return dataset
+    return AugmentedDataset(values[offset:limit, :-1], labels, get_n_copies(labels, signal_ratios, data_aug_per_sample), seed)
 
 
 
-def get_datasets(coin: str, data_aug_factor: int = 0) -> Tuple[List[Tuple[List[float], float]], List[Tuple[List[float], float]], List[Tuple[List[float], float]]]:
+def get_datasets(coin: str, data_aug_factor: int = 0, seed: int = None, lazy: bool = False) -> Tuple[ArrayDataset, ArrayDataset, ArrayDataset]:
     '''
     Splits dataset into training, validation, and testing datasets.
-    NOTE: uses no data augmentation by default and will only apply data_aug_factor to the training dataset.
+    NOTE: uses no data augmentation by default and will only apply data_aug_factor to the training dataset; param seed makes the augmentation reproducible.
+    Param lazy returns the training dataset as an AugmentedDataset instead, i.e., without materializing its augmented datapoints.
     '''
-    data = load_data(coin)
-    try:
-        check_if_data_is_clean(data)
-    except:
-        raise
+    data = load_data(coin, check=True)
 
     # Split into training, validation, testing
     # 70-15-15 split
@@ -118,7 +215,10 @@ def get_datasets(coin: str, data_aug_factor: int = 0) -> Tuple[List[Tuple[List[f
     train_end = int(round(n_datapoints*0.7))
     valid_end = train_end + int(round(n_datapoints*0.15))
 
-    train_data = generate_dataset(data, train_end, 0, data_aug_factor)
+    if lazy:
+        train_data = generate_lazy_dataset(data, train_end, 0, data_aug_factor, seed)
+    else:
+        train_data = generate_dataset(data, train_end, 0, data_aug_factor, seed)
     print("Training dataset created.")
 
     valid_data = generate_dataset(data, valid_end, train_end)
@@ -131,7 +231,7 @@ def get_datasets(coin: str, data_aug_factor: int = 0) -> Tuple[List[Tuple[List[f
 
 
 
-def prepare_model_pruning_datasets(coin: str) -> Tuple[List[Tuple[List[float], float]], List[Tuple[List[float], float]], List[Tuple[List[float], float]]]:
+def prepare_model_pruning_datasets(coin: str) -> Tuple[ArrayDataset, ArrayDataset, ArrayDataset]:
     start_time = time.time()
     data_aug_factor = 0
     print("Creating datasets...")
@@ -175,9 +275,9 @@ def merge_datasets(coin: str, list_of_datasets: List[pd.DataFrame], all_data: bo
     merged_data = merged_data.drop(columns=["index"])
 
     if all_data:
-        merged_data.to_csv(f"datasets/complete/all_historical_data_complete.csv", index=False, float_format="%f")
+        ds.write_dataset(merged_data, get_complete_filepath("all"))
     else:
-        merged_data.to_csv(f"datasets/raw/{coin}_historical_data_raw.csv", index=False, float_format="%f")
+        ds.write_dataset(merged_data, f"datasets/raw/{coin}_historical_data_raw.csv")
 
 
 
@@ -186,14 +286,14 @@ def merge_new_dataset_with_old(coin: str, by_range: bool = True) -> str:
     Merges all previous datasets with the newly fetched data.
     NOTE: Assumes fetch_missing_data_by_range or fetch_missing_data_by_date have been called first.
     '''
-    data_to_merge = [pd.read_csv(f"datasets/raw/{coin}_historical_data_raw.csv")]
+    data_to_merge = [ds.read_dataset(f"datasets/raw/{coin}_historical_data_raw.csv")]
 
     if by_range:
-        data_to_merge.append(pd.read_csv(f"datasets/raw/{coin}_historical_data_by_range.csv"))
-        os.remove(f"datasets/raw/{coin}_historical_data_by_range.csv")
+        data_to_merge.append(ds.read_dataset(f"datasets/raw/{coin}_historical_data_by_range.csv"))
+        ds.remove_dataset(f"datasets/raw/{coin}_historical_data_by_range.csv")
     else:
-        data_to_merge.append(pd.read_csv(f"datasets/raw/{coin}_historical_data_by_date.csv"))
-        os.remove(f"datasets/raw/{coin}_historical_data_by_date.csv")
+        data_to_merge.append(ds.read_dataset(f"datasets/raw/{coin}_historical_data_by_date.csv"))
+        ds.remove_dataset(f"datasets/raw/{coin}_historical_data_by_date.csv")
 
     merge_datasets(coin, data_to_merge)
 
@@ -210,7 +310,7 @@ def combine_all_datasets(coins: List[str]) -> None:
         # Currently polkadot has fewer than 350 days worth of datasets
         # In the future, I can delete this line
         if coin != "polkadot":
-            datasets_to_merge.append(pd.read_csv(f"datasets/complete/{coin}_historical_data_complete.csv"))
+            datasets_to_merge.append(ds.read_dataset(get_complete_filepath(coin)))
 
     merge_datasets("all", datasets_to_merge, all_data=True)
 
@@ -219,33 +319,100 @@ def combine_all_datasets(coins: List[str]) -> None:
 #
 # ---------- DATASET CLEANER ----------
 #
-def remove_greater_than_one_artifacts(data_type: str) -> None:
+def detect_greater_than_one_artifacts(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    '''
+    Flags every cell (except in the first and last rows) that is more than 10x either of its neighbours in the same column and divides it by 1000 if it is at least 100x the smaller neighbour or by 100 if at least 10x.
+    Returns the corrected values, the flagged cells and their factors (i.e., the cell // the smaller neighbour).
+    NOTE: like the original cell-by-cell loop, each cell is compared with the already corrected cell before it (and the uncorrected one after it), so the comparisons are repeated over shifted arrays until no correction changes the next one, i.e., once per run of consecutive artifacts.
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    corrected = values.copy()
+    flagged = np.zeros(values.shape, dtype=bool)
+    factors = np.zeros(values.shape)
+    if len(values) < 3:
+        return corrected, flagged, factors
+
+    curr_cells = values[1:-1]
+    latter_cells = values[2:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        while True:
+            former_cells = corrected[:-2]
+            is_flagged = ((curr_cells / 10) > former_cells) | ((curr_cells / 10) > latter_cells)
+            factor = curr_cells // np.minimum(former_cells, latter_cells)
+            new_cells = np.where(is_flagged & (factor >= 100), curr_cells / 1000, np.where(is_flagged & (factor >= 10), curr_cells / 100, curr_cells))
+            if np.array_equal(new_cells, corrected[1:-1], equal_nan=True):
+                break
+            corrected[1:-1] = new_cells
+
+    flagged[1:-1] = is_flagged
+    factors[1:-1] = np.where(is_flagged, factor, 0)
+
+    return corrected, flagged, factors
+
+
+
+def remove_artifacts(coin: str, data: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    '''
+    Repairs the artifacts in every column but the first (i.e., the date) of the dataset.
+    Returns the repaired dataset and the audit log of every flagged cell (see ARTIFACT_AUDIT_COLUMNS); a flagged cell under 10x its smaller neighbour is logged but left as is.
+    '''
+    data = data.copy()
+    columns = data.columns[1:]
+    values = data[columns].to_numpy(dtype=np.float64)
+    corrected, flagged, factors = detect_greater_than_one_artifacts(values)
+    for j in np.flatnonzero((corrected != values).any(axis=0)):
+        data[columns[j]] = corrected[:, j]
+
+    rows, cols = np.nonzero(flagged)
+    audit_log = pd.DataFrame({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "coin": coin,
+        "date": data.iloc[rows, 0].to_numpy(),
+        "column": columns[cols],
+        "old_value": values[rows, cols],
+        "new_value": corrected[rows, cols],
+        "factor": factors[rows, cols],
+    }, columns=ARTIFACT_AUDIT_COLUMNS)
+
+    return data, audit_log
+
+
+
+def write_audit_log(audit_log: pd.DataFrame, filepath: str) -> None:
+    '''
+    Appends to the audit log so that every run's repairs can be traced back.
+    '''
+    directory = os.path.dirname(filepath)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+    audit_log.to_csv(filepath, mode='a', header=not os.path.exists(filepath), index=False)
+
+
+
+def remove_greater_than_one_artifacts(data_type: str, coins: List[str] = None) -> int:
     '''
     The purpose of this method is to clean up some strange artifacts that found their way into the datasets where numbers that are supposed to be less than 1 are somehow larger by several orders of magnitude.
 
     The source of this error remains unknown.
+
+    Param coins defaults to common.coins.
+    Returns the number of flagged cells, each of which is appended to reports/{data_type}_artifact_audit_log.csv.
     '''
-    for coin in common.coins:
-        data = pd.read_csv(f"datasets/{data_type}/{coin}_historical_data_{data_type}.csv")
+    if coins is None:
+        coins = common.coins
 
-        count = 0
-        for c in range(1, len(data.columns)):
-            for r in range(1, len(data)-1):
-                former_cell = data.iloc[r-1, c]
-                curr_cell = data.iloc[r, c]
-                latter_cell = data.iloc[r+1, c]
-                if (curr_cell / 10) > former_cell or (curr_cell / 10) > latter_cell:
-                    factor = curr_cell // min(former_cell, latter_cell)
-                    print(c,r, factor)
-                    if factor >= 100:
-                        data.iloc[r, c] = data.iloc[r, c] / 1000
-                    elif factor >= 10:
-                        data.iloc[r, c] = data.iloc[r, c] / 100
-                    count += 1
+    count = 0
+    for coin in coins:
+        filepath = f"datasets/{data_type}/{coin}_historical_data_{data_type}.csv"
+        data, audit_log = remove_artifacts(coin, ds.read_dataset(filepath))
+        print(f"{coin}: {len(audit_log)} artifacts flagged, {int((audit_log['old_value'] != audit_log['new_value']).sum())} repaired.")
+        count += len(audit_log)
 
-        print(count)
+        if len(audit_log) > 0:
+            write_audit_log(audit_log, f"reports/{data_type}_artifact_audit_log.csv")
+            ds.write_dataset(data, filepath)
 
-        data.to_csv(f"datasets/{data_type}/{coin}_historical_data_{data_type}.csv", index=False, float_format="%f")
+    return count
 
 
 
@@ -254,7 +421,7 @@ def clean_for_training() -> None:
     Takes a clean dataset and prunes it so that it's suitable for training.
     '''
     for coin in common.coins:
-        data = pd.read_csv(f"datasets/clean/{coin}_historical_data_clean.csv")
+        data = ds.read_dataset(f"datasets/clean/{coin}_historical_data_clean.csv")
 
         # find first instance of real SMA_350 value
         data = data.iloc[1: , :] # drop first row as it will always be normalized to 1
@@ -264,6 +431,6 @@ def clean_for_training() -> None:
 
             # find last instance of signal value and trim dataset
             data = data.iloc[:len(data)-common.SIGNAL_FOR_N_DAYS_FROM_NOW, :]
-            data.to_csv(f"datasets/complete/{coin}_historical_data_complete.csv", index=False, float_format="%f")
+            ds.write_dataset(data, f"datasets/complete/{coin}_historical_data_complete.csv")
         else:
             print(f"{coin} does not have enough data.")
@@ -0,0 +1,117 @@
+'''
+USED BY EVERY STAGE THAT READS OR WRITES A DATASET (RAW, RAW_ALL_FEATURES, CLEAN, COMPLETE, THE FEAR & GREED INDEX).
+
+FUNCTION: STORES EACH DATASET AS A COLUMNAR BINARY (FEATHER) FILE NEXT TO ITS CSV SO THAT LOADS DO NOT HAVE TO PARSE TEXT. FLOATS ARE STORED LOSSLESSLY AND THE DATE COLUMN IS TYPED. THE CSV IS STILL WRITTEN FOR HUMANS (AND GIT) AND REMAINS THE SOURCE OF TRUTH WHENEVER IT IS NEWER THAN ITS BINARY COPY, E.G., AFTER BEING EDITED BY HAND.
+
+NOTE: DATASETS ARE ALWAYS ADDRESSED BY THEIR CSV FILEPATH. IF pyarrow IS NOT INSTALLED, ONLY THE (LOSSLESS) CSV IS USED.
+'''
+import os
+import pandas as pd
+from typing import Callable, List
+
+try:
+    import pyarrow
+    BINARY_FORMAT_AVAILABLE = True
+except ImportError:
+    BINARY_FORMAT_AVAILABLE = False
+
+BINARY_EXTENSION = ".feather"
+# raw datasets use the former; data fetched by date (coingecko's format) the latter
+DATE_FORMATS = ["%Y-%m-%d", "%d-%m-%Y"]
+
+
+
+def get_binary_filepath(filepath: str) -> str:
+    return os.path.splitext(filepath)[0] + BINARY_EXTENSION
+
+
+
+def is_binary_fresh(filepath: str) -> bool:
+    '''
+    Returns whether the binary copy exists and is at least as recent as the CSV.
+    '''
+    binary_filepath = get_binary_filepath(filepath)
+    if not BINARY_FORMAT_AVAILABLE or not os.path.exists(binary_filepath):
+        return False
+    if not os.path.exists(filepath):
+        return True
+
+    return os.stat(binary_filepath).st_mtime_ns >= os.stat(filepath).st_mtime_ns
+
+
+
+def parse_dates(data: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Converts a text date column to datetime64; any other date column (e.g., an already normalized one) is left untouched.
+    '''
+    if "date" in data.columns and data["date"].dtype == object:
+        for date_format in DATE_FORMATS:
+            try:
+                data["date"] = pd.to_datetime(data["date"], format=date_format)
+                break
+            except (ValueError, TypeError):
+                continue
+
+    return data
+
+
+
+def replace_atomically(filepath: str, write: Callable[[str], None]) -> None:
+    '''
+    Writes to a temporary file first so that concurrent readers (e.g., other worker processes) never see a half-written file.
+    '''
+    directory = os.path.dirname(filepath)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+    write(tmp_filepath)
+    os.replace(tmp_filepath, filepath)
+
+
+
+def write_binary(data: pd.DataFrame, filepath: str) -> None:
+    # feather only stores string column names
+    if not BINARY_FORMAT_AVAILABLE or not all(isinstance(c, str) for c in data.columns):
+        return
+
+    data = data.reset_index(drop=True)
+    replace_atomically(get_binary_filepath(filepath), lambda tmp_filepath: data.to_feather(tmp_filepath))
+
+
+
+def read_dataset(filepath: str, columns: List[str] = None) -> pd.DataFrame:
+    '''
+    Param columns restricts the load to the given columns.
+    NOTE: a CSV without a fresh binary copy is parsed once and its binary copy written for the next load.
+    '''
+    if is_binary_fresh(filepath):
+        return pd.read_feather(get_binary_filepath(filepath), columns=columns)
+
+    data = pd.read_csv(filepath, usecols=columns, float_precision="round_trip")
+    data = parse_dates(data)
+    if columns is None:
+        write_binary(data, filepath)
+
+    return data
+
+
+
+def write_dataset(data: pd.DataFrame, filepath: str) -> None:
+    '''
+    Writes the CSV export first and the binary copy second so that the binary copy is never older than the CSV.
+    NOTE: floats are written in full, i.e., without a float_format, so that even the CSV is lossless.
+    '''
+    data = parse_dates(data.copy())
+    replace_atomically(filepath, lambda tmp_filepath: data.to_csv(tmp_filepath, index=False))
+    write_binary(data, filepath)
+
+
+
+def remove_dataset(filepath: str) -> None:
+    '''
+    Removes the CSV along with its binary copy.
+    '''
+    os.remove(filepath)
+    if os.path.exists(get_binary_filepath(filepath)):
+        os.remove(get_binary_filepath(filepath))
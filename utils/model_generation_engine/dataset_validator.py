@@ -0,0 +1,129 @@
+'''
+USED BY THE DATASET METHODS TO MAKE SURE A DATASET IS FIT FOR TRAINING BEFORE ANY MODEL IS TRAINED ON IT.
+
+FUNCTION: CHECKS EVERY CELL OF A DATASET IN ONE ARRAY PASS FOR UNNORMALIZED VALUES (> 1, EXCEPT IN THE SIGNAL COLUMN), NaN AND INF VALUES, AND DATES THAT ARE NOT STRICTLY INCREASING (OR NON-INCREASING, FOR THE NEWEST-FIRST DATASET OF ALL COINS, WHOSE COINS SHARE DATES), AND REPORTS EVERY VIOLATING ROW AND COLUMN RATHER THAN ONLY THE FIRST. A DATASET FILE THAT PASSED IS REMEMBERED BY THE HASH OF ITS CONTENT SO THAT IT IS NOT VALIDATED AGAIN UNTIL IT CHANGES.
+'''
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from . import dataset_storage as ds
+
+VERDICT_CACHE_FILEPATH = "datasets/cache/validation/verdicts.json"
+VIOLATION_COLUMNS = ["row", "column", "value", "violation"]
+# the rows listed per column and violation in a report
+MAX_REPORTED_ROWS = 20
+
+
+
+def find_violations(data: pd.DataFrame, newest_first: bool = False) -> pd.DataFrame:
+    '''
+    Returns one row per violating cell (see VIOLATION_COLUMNS), where violation is one of: greater_than_one, nan, inf, date_not_increasing, date_not_decreasing.
+    Param newest_first requires the dates to be non-increasing (date_not_decreasing) rather than strictly increasing (date_not_increasing), i.e., the order of the mega dataset of all coins (see dataset_methods.combine_all_datasets).
+    NOTE: like the original check, the last column (i.e., the signal) is allowed to be > 1.
+    '''
+    violations = []
+    value_columns = [column for column in data.columns if column != "date"]
+    values = data[value_columns].to_numpy(dtype=np.float64)
+    checks = {
+        "nan": np.isnan(values),
+        "inf": np.isinf(values),
+        "greater_than_one": np.isfinite(values) & (values > 1),
+    }
+    if data.columns[-1] in value_columns:
+        checks["greater_than_one"][:, value_columns.index(data.columns[-1])] = False
+
+    for violation, mask in checks.items():
+        rows, cols = np.nonzero(mask)
+        violations.append(pd.DataFrame({
+            "row": rows,
+            "column": np.array(value_columns, dtype=object)[cols],
+            "value": values[rows, cols],
+            "violation": violation,
+        }, columns=VIOLATION_COLUMNS))
+
+    if "date" in data.columns:
+        dates = pd.to_datetime(data["date"]).to_numpy()
+        if newest_first:
+            rows = np.flatnonzero(~(dates[1:] <= dates[:-1])) + 1
+            violation = "date_not_decreasing"
+        else:
+            rows = np.flatnonzero(~(dates[1:] > dates[:-1])) + 1
+            violation = "date_not_increasing"
+        violations.append(pd.DataFrame({"row": rows, "column": "date", "value": np.nan, "violation": violation}, columns=VIOLATION_COLUMNS))
+
+    return pd.concat(violations).sort_values(by=["row"], kind="stable").reset_index(drop=True)
+
+
+
+def format_report(violations: pd.DataFrame) -> str:
+    '''
+    Summarizes the violations per violation and column, listing (up to MAX_REPORTED_ROWS of) the violating rows.
+    '''
+    lines = [f"Data unfit for processing! {len(violations)} violations found:"]
+    for (violation, column), group in violations.groupby(["violation", "column"], sort=True):
+        rows = group["row"].tolist()
+        more = f" and {len(rows) - MAX_REPORTED_ROWS} more" if len(rows) > MAX_REPORTED_ROWS else ""
+        lines.append(f"\t{violation} in column = {column}: {len(rows)} rows = {rows[:MAX_REPORTED_ROWS]}{more}")
+
+    return "\n".join(lines)
+
+
+
+def check_data(data: pd.DataFrame, newest_first: bool = False) -> None:
+    '''
+    Raises a ValueError with the report of every violation, if any (see find_violations).
+    '''
+    violations = find_violations(data, newest_first)
+    if len(violations) > 0:
+        raise ValueError(format_report(violations))
+
+
+
+#
+# ---------- VERDICT CACHE ----------
+#
+def get_file_hash(filepath: str) -> str:
+    hasher = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+
+def load_verdicts() -> dict:
+    try:
+        with open(VERDICT_CACHE_FILEPATH, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+
+def save_verdict(filepath: str, file_hash: str) -> None:
+    def write(tmp_filepath: str) -> None:
+        with open(tmp_filepath, 'w') as f:
+            json.dump(verdicts, f, indent=4, sort_keys=True)
+
+    verdicts = load_verdicts()
+    verdicts[filepath] = file_hash
+    ds.replace_atomically(VERDICT_CACHE_FILEPATH, write)
+
+
+
+def check_dataset(filepath: str, data: pd.DataFrame, newest_first: bool = False) -> bool:
+    '''
+    Same as check_data, but skipped if the dataset file (whose loaded data is param data) already passed with the same content.
+    Returns whether the validation was skipped.
+    NOTE: only passing verdicts are cached so that a failing dataset always gets its full report.
+    '''
+    file_hash = get_file_hash(filepath)
+    if load_verdicts().get(filepath) == file_hash:
+        return True
+
+    check_data(data, newest_first)
+    save_verdict(filepath, file_hash)
+
+    return False
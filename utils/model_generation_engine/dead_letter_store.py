@@ -0,0 +1,68 @@
+'''
+USED BY THE DATA AGGREGATOR TO REMEMBER WHICH DATES COULD NOT BE FETCHED EVEN AFTER RETRYING.
+
+FUNCTION: KEEPS A JSON FILE MAPPING EACH COIN TO ITS DEAD-LETTERED DATES SO THAT A LATER RUN CAN RETRY ONLY THOSE DATES WITHOUT ANYONE HAVING TO BE PRESENT.
+'''
+import json
+import os
+import threading
+from typing import Dict, List
+
+
+
+class DeadLetterStore:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.lock = threading.Lock()
+
+
+    def load(self) -> Dict[str, List[str]]:
+        try:
+            with open(self.filepath, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+
+    def save(self, dead_letters: Dict[str, List[str]]) -> None:
+        '''
+        Writes to a temporary file first so that an interrupted run never leaves a half-written file behind.
+        '''
+        directory = os.path.dirname(self.filepath)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_filepath = f"{self.filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, 'w') as f:
+            json.dump(dead_letters, f, indent=4, sort_keys=True)
+        os.replace(tmp_filepath, self.filepath)
+
+
+    def update(self, coin: str, failed_dates: List[str], fetched_dates: List[str]) -> None:
+        '''
+        Adds the dates that failed and removes the dates that have since been fetched.
+        '''
+        with self.lock:
+            dead_letters = self.load()
+            dates = [d for d in dead_letters.get(coin, []) if d not in fetched_dates]
+            dates += [d for d in failed_dates if d not in dates]
+
+            if len(dates) > 0:
+                dead_letters[coin] = dates
+            elif coin in dead_letters:
+                del dead_letters[coin]
+            else:
+                # nothing to add or remove
+                return
+
+            self.save(dead_letters)
+
+
+    def get(self, coin: str) -> List[str]:
+        with self.lock:
+            return self.load().get(coin, [])
+
+
+    def get_all(self) -> Dict[str, List[str]]:
+        with self.lock:
+            return self.load()
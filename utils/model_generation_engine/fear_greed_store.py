@@ -0,0 +1,85 @@
+'''
+USED BY THE DATA AGGREGATOR AND DATA PREPROCESSOR AS THE SINGLE SOURCE OF THE FEAR & GREED INDEX.
+
+FUNCTION: KEEPS THE WHOLE HISTORY OF THE INDEX IN datasets/raw/fear_and_greed_index.csv, INDEXED BY DATE IN MEMORY. EACH UPDATE ONLY FETCHES THE DAYS AFTER THE NEWEST STORED DATE, SO THE INDEX IS DOWNLOADED ONCE PER RUN RATHER THAN ONCE PER COIN.
+'''
+import threading
+import time
+import pandas as pd
+from datetime import date, datetime
+from . import dataset_storage as ds
+from typing import Callable, Dict, List
+
+# seconds before checking the api for a newer index again
+UPDATE_INTERVAL = 15 * 60
+
+
+
+class FearGreedStore:
+    '''
+    Param fetch takes a number of days and returns the index for that many days counting backwards from today (most recent first) as a list of {"value", "timestamp"} dicts, e.g., data_aggregator.get_fear_greed_by_range. 0 days means the whole history.
+    '''
+    def __init__(self, filepath: str, fetch: Callable[[int], List[dict]]):
+        self.filepath = filepath
+        self.fetch = fetch
+        self.index = None
+        self.last_update = 0.0
+        self.lock = threading.Lock()
+
+
+    def load(self) -> Dict[date, int]:
+        if self.index is None:
+            try:
+                data = ds.read_dataset(self.filepath)
+                self.index = {datetime.strptime(str(timestamp), "%Y-%m-%d").date(): int(value) for value, timestamp in zip(data["value"], data["timestamp"])}
+            except FileNotFoundError:
+                self.index = {}
+
+        return self.index
+
+
+    def save(self) -> None:
+        '''
+        Writes most recent first (the same layout as fetch_and_save_sentiment); dataset_storage writes atomically so that concurrent readers never see a half-written file.
+        '''
+        data = pd.DataFrame([(value, str(day)) for day, value in sorted(self.index.items(), reverse=True)], columns=["value", "timestamp"])
+        ds.write_dataset(data, self.filepath)
+
+
+    def update(self) -> None:
+        '''
+        Fetches only the days after the newest stored date (or the whole history if nothing is stored yet).
+        '''
+        with self.lock:
+            index = self.load()
+            if time.time() - self.last_update < UPDATE_INTERVAL:
+                return
+
+            if len(index) == 0:
+                n_days = 0
+            elif max(index.keys()) >= date.today():
+                self.last_update = time.time()
+                return
+            else:
+                # i.e., the days from the one after the newest stored date up to and including today
+                n_days = (date.today() - max(index.keys())).days
+
+            for entry in self.fetch(n_days):
+                index[datetime.strptime(entry["timestamp"], "%Y-%m-%d").date()] = int(entry["value"])
+
+            self.save()
+            self.last_update = time.time()
+
+
+    def get(self, day: date) -> int:
+        '''
+        Returns the index on the given day or None if it is unknown.
+        '''
+        with self.lock:
+            return self.load().get(day)
+
+
+    def get_newest_date(self) -> date:
+        with self.lock:
+            index = self.load()
+            return max(index.keys()) if len(index) > 0 else None
@@ -0,0 +1,228 @@
+'''
+USED BY THE DATA AGGREGATOR TO MAKE MANY API CALLS (E.G., ONE PER COIN PER DATE) CONCURRENTLY.
+
+FUNCTION: RUNS BLOCKING API CALLS ON AN ASYNCIO EVENT LOOP SO THAT A FIXED NUMBER OF REQUESTS ARE ALWAYS IN FLIGHT, WHILE ALL COINS DRAW FROM ONE SHARED RATE BUDGET (TOKEN BUCKET).
+
+NOTE: A JOB IS THE TUPLE OF ARGUMENTS PASSED TO THE FETCH FUNCTION, E.G., (COIN, DATE) FOR data_aggregator.get_historic_data.
+'''
+import asyncio
+import concurrent.futures as cf
+import email.utils
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+
+
+#
+# ---------- RATE LIMITING ----------
+#
+class TokenBucket:
+    '''
+    Token bucket refilled at calls_per_minute / 60 tokens per second and holding at most burst tokens.
+    NOTE: the bucket starts with burst tokens and never holds more, so that no minute (not even the first, or one after idling) sends more than calls_per_minute + burst calls.
+    NOTE: thread-safe so that a single bucket can be shared by several event loops (e.g., the threads in signal_generator.fetch_new_data).
+    '''
+    def __init__(self, calls_per_minute: int, burst: int = 1):
+        self.calls_per_minute = calls_per_minute
+        self.capacity = burst
+        self.refill_rate = calls_per_minute / 60
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        # no token is handed out (nor refilled) before this time (see pause)
+        self.paused_until = self.last_refill
+        self.lock = threading.Lock()
+
+
+    def refill(self, now: float) -> None:
+        '''
+        NOTE: must be called with the lock held.
+        '''
+        refill_from = max(self.last_refill, min(self.paused_until, now))
+        self.tokens = min(self.capacity, self.tokens + (now - refill_from) * self.refill_rate)
+        self.last_refill = now
+
+
+    def reserve(self) -> float:
+        '''
+        Takes one token from the bucket, going into debt if the bucket is empty.
+        Returns how many seconds the caller must wait before the reserved token is actually available.
+        '''
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            self.tokens -= 1
+
+            return max(0.0, self.paused_until - now) + max(0.0, -self.tokens) / self.refill_rate
+
+
+    def get_pause(self) -> float:
+        '''
+        Returns how many seconds are left of the current pause (0 if there is none).
+        '''
+        with self.lock:
+            return max(0.0, self.paused_until - time.monotonic())
+
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            # a pause may have started while waiting for the token
+            wait = self.get_pause()
+
+
+    def pause(self, seconds: float) -> None:
+        '''
+        Empties the bucket so that no caller gets a token for the given number of seconds, e.g., when the api answers with a 429 and a Retry-After header.
+        NOTE: pauses overlap rather than add up, i.e., many jobs hitting the same 429 at once pause the bucket once.
+        '''
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            self.tokens = min(self.tokens, 0)
+            self.paused_until = max(self.paused_until, now + seconds)
+
+
+    def get_calls_per_minute(self) -> int:
+        return self.calls_per_minute
+
+
+
+#
+# ---------- RETRYING ----------
+#
+class RetryPolicy:
+    '''
+    Exponential backoff with full jitter, i.e., the nth retry waits a random time between 0 and min(max_delay, base_delay * 2^n) seconds.
+    '''
+    def __init__(self, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+
+    def get_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+    def get_max_retries(self) -> int:
+        return self.max_retries
+
+
+
+def get_status_code(error: Exception) -> int:
+    '''
+    Returns the http status code of the response attached to the error (e.g., requests.HTTPError) or None if there is none.
+    '''
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+
+def get_retry_after(error: Exception) -> float:
+    '''
+    Returns the number of seconds the Retry-After header of the response attached to the error asks to wait, or None if there is no such header.
+    NOTE: the header is either a number of seconds or an http date.
+    '''
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is None or headers.get("Retry-After") is None:
+        return None
+
+    retry_after = headers.get("Retry-After")
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, (email.utils.parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+
+def is_retryable(error: Exception) -> bool:
+    '''
+    Connection errors, timeouts, bad payloads, 429s, and server errors are worth retrying; other client errors (e.g., 404 for an unknown coin) are not.
+    '''
+    status_code = get_status_code(error)
+
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+
+#
+# ---------- FETCHING ----------
+#
+async def fetch_one(job: Tuple, fetch: Callable[..., dict], rate_limiter: TokenBucket, in_flight: asyncio.Semaphore, executor: cf.Executor, retry_policy: RetryPolicy, verbose: bool) -> Tuple[Tuple, dict, Exception]:
+    '''
+    Waits for a free slot and a token, then runs the blocking fetch in the executor, retrying according to the retry policy.
+    Returns the job, its data, and the last exception raised (if it never succeeded).
+    NOTE: the slot is released while waiting to retry so that other jobs keep the requests in flight.
+    '''
+    attempt = 0
+    while True:
+        async with in_flight:
+            await rate_limiter.acquire()
+            try:
+                data = await asyncio.get_running_loop().run_in_executor(executor, fetch, *job)
+                break
+            except Exception as e:
+                error = e
+
+        if verbose:
+            print(f"Error: {error}\nJob that failed: {job}")
+
+        if retry_policy is None or attempt >= retry_policy.get_max_retries() or not is_retryable(error):
+            return job, None, error
+
+        # a 429 means every job is going too fast, not just this one
+        retry_after = get_retry_after(error)
+        delay = retry_after if retry_after is not None else retry_policy.get_delay(attempt)
+        if retry_after is not None or get_status_code(error) == 429:
+            rate_limiter.pause(delay)
+
+        attempt += 1
+        await asyncio.sleep(delay)
+
+    if verbose:
+        print(f"Fetched data for {job}")
+
+    return job, data, None
+
+
+
+async def fetch_all(jobs: List[Tuple], fetch: Callable[..., dict], rate_limiter: TokenBucket, max_in_flight: int, retry_policy: RetryPolicy, verbose: bool) -> Tuple[Dict[Tuple, dict], List[Tuple]]:
+    in_flight = asyncio.Semaphore(max_in_flight)
+    results = {}
+    failed = []
+
+    with cf.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        tasks = [fetch_one(job, fetch, rate_limiter, in_flight, executor, retry_policy, verbose) for job in jobs]
+        for job, data, error in await asyncio.gather(*tasks):
+            if error is None:
+                results[job] = data
+            else:
+                failed.append(job)
+
+    return results, failed
+
+
+
+def fetch_concurrently(jobs: List[Tuple], fetch: Callable[..., dict], rate_limiter: TokenBucket, max_in_flight: int = None, retry_policy: RetryPolicy = None, verbose: bool = False) -> Tuple[Dict[Tuple, dict], List[Tuple]]:
+    '''
+    Fetches every job with at most max_in_flight requests running at once; by default as many as the rate limiter allows per minute.
+    Failed jobs are retried according to param retry_policy (no retries if None).
+    Returns a dictionary mapping each successful job to its data and a list of the jobs that failed (in their original order).
+    NOTE: Param fetch must be a blocking function that is called with the elements of each job as its arguments.
+    '''
+    if len(jobs) == 0:
+        return {}, []
+
+    if max_in_flight is None:
+        max_in_flight = rate_limiter.get_calls_per_minute()
+    max_in_flight = max(1, min(max_in_flight, len(jobs)))
+
+    return asyncio.run(fetch_all(jobs, fetch, rate_limiter, max_in_flight, retry_policy, verbose))
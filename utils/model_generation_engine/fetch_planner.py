@@ -0,0 +1,60 @@
+'''
+USED BY THE DATA AGGREGATOR TO FIGURE OUT WHAT TO FETCH BEFORE FETCHING IT.
+
+FUNCTION: READS THE DATE INDEX OF EACH COIN'S RAW DATASET AND PLANS EXACTLY THE DATES THAT ARE MISSING FROM IT (PLUS ANY DEAD-LETTERED DATES), SO THAT A DAILY RUN ONLY REQUESTS THE NEW DAYS.
+'''
+import pandas as pd
+from . import dataset_storage as ds
+from datetime import date, timedelta
+from typing import Dict, List, Set
+
+
+
+def get_stored_dates(coin: str) -> Set[date]:
+    '''
+    Returns the set of dates in the coin's raw dataset or an empty set if there is no raw dataset.
+    NOTE: only reads the date column.
+    '''
+    try:
+        dates = ds.read_dataset(f"datasets/raw/{coin}_historical_data_raw.csv", columns=["date"])["date"]
+    except FileNotFoundError:
+        return set()
+
+    return set(pd.to_datetime(dates, dayfirst=True).dt.date)
+
+
+
+def get_missing_dates(stored_dates: Set[date], end_date: date) -> List[date]:
+    '''
+    Returns every date between the oldest stored date and end_date (inclusive) that is not stored, most recent first.
+    '''
+    if len(stored_dates) == 0:
+        return []
+
+    start_date = min(stored_dates)
+    n_days = (end_date - start_date).days + 1
+
+    return [end_date - timedelta(i) for i in range(n_days) if (end_date - timedelta(i)) not in stored_dates]
+
+
+
+def plan_missing_dates(coins: List[str], dead_letters: Dict[str, List[str]] = {}, end_date: date = None) -> Dict[str, List[str]]:
+    '''
+    Returns the plan, i.e., the dates (in the coingecko format, dd-mm-yyyy) each coin is missing up until end_date (today by default), including its dead-lettered dates.
+    NOTE: coins without a raw dataset are left out; use data_aggregator.aggregate_data_for_new_coins for them.
+    '''
+    if end_date is None:
+        end_date = date.today()
+
+    plan = {}
+    for coin in coins:
+        stored_dates = get_stored_dates(coin)
+        if len(stored_dates) == 0:
+            print(f"No raw dataset for {coin}; it must be aggregated as a new coin first.")
+            continue
+
+        missing_dates = [day.strftime("%d-%m-%Y") for day in get_missing_dates(stored_dates, end_date)]
+        missing_dates += [d for d in dead_letters.get(coin, []) if d not in missing_dates]
+        plan[coin] = missing_dates
+
+    return plan
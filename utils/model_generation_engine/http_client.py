@@ -0,0 +1,110 @@
+'''
+USED BY THE DATA AGGREGATOR FOR ALL API CALLS.
+
+FUNCTION: SHARES ONE POOLED, KEEP-ALIVE requests SESSION AMONG ALL THREADS (SO THAT EACH REQUEST DOES NOT PAY FOR A NEW TCP/TLS HANDSHAKE) AND RECORDS A LATENCY HISTOGRAM PER HOST.
+'''
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import List, Tuple
+from urllib.parse import urlparse
+
+# upper bounds (in milliseconds) of the latency histogram buckets; the last bucket holds everything slower
+LATENCY_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+
+class LatencyHistogram:
+    def __init__(self, buckets_ms: List[int] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = {}
+        self.totals = {}
+        self.lock = threading.Lock()
+
+
+    def record(self, host: str, seconds: float) -> None:
+        ms = seconds * 1000
+        bucket = 0
+        while bucket < len(self.buckets_ms) and ms > self.buckets_ms[bucket]:
+            bucket += 1
+
+        with self.lock:
+            if host not in self.counts:
+                self.counts[host] = [0] * (len(self.buckets_ms) + 1)
+                self.totals[host] = 0.0
+            self.counts[host][bucket] += 1
+            self.totals[host] += ms
+
+
+    def get_counts(self, host: str) -> List[int]:
+        with self.lock:
+            return list(self.counts.get(host, [0] * (len(self.buckets_ms) + 1)))
+
+
+    def report(self) -> str:
+        labels = [f"<={x}ms" for x in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        report = "Latency by host:"
+        with self.lock:
+            for host, counts in self.counts.items():
+                n_requests = sum(counts)
+                report += f"\n\t{host}: {n_requests} requests | avg: {self.totals[host] / n_requests:.1f}ms"
+                for label, count in zip(labels, counts):
+                    if count > 0:
+                        report += f"\n\t\t{label:>9}: {count}"
+
+        return report
+
+
+
+class HTTPClient:
+    '''
+    Param pool_size is the number of keep-alive connections kept per host; it should be at least the number of requests in flight.
+    Param timeout is a (connect, read) tuple in seconds.
+    Param compression asks the server for gzip/deflate compressed responses.
+    NOTE: requests' connection pool is thread-safe, so the same session is shared by every thread; each process creates its own.
+    '''
+    def __init__(self, pool_size: int = 10, timeout: Tuple[float, float] = (5.0, 30.0), compression: bool = True):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.compression = compression
+        self.latencies = LatencyHistogram()
+        self.lock = threading.Lock()
+        self.session = None
+        self.session_pid = None
+
+
+    def get_session(self) -> requests.Session:
+        with self.lock:
+            if self.session is None or self.session_pid != os.getpid():
+                session = requests.Session()
+                # block instead of opening (and then throwing away) extra connections when the pool is exhausted
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, pool_block=True)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers["Accept-Encoding"] = "gzip, deflate" if self.compression else "identity"
+                self.session = session
+                self.session_pid = os.getpid()
+
+            return self.session
+
+
+    def get(self, url: str) -> requests.Response:
+        session = self.get_session()
+        start_time = time.perf_counter()
+        try:
+            return session.get(url, timeout=self.timeout)
+        finally:
+            self.latencies.record(urlparse(url).netloc, time.perf_counter() - start_time)
+
+
+    def get_latencies(self) -> LatencyHistogram:
+        return self.latencies
+
+
+    def close(self) -> None:
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
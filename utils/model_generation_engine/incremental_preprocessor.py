@@ -0,0 +1,296 @@
+'''
+USED BY THE SIGNAL GENERATOR TO PREPROCESS THE NEW DAYS OF EACH COIN'S DATA.
+
+FUNCTION: KEEPS THE RUNNING STATE OF THE PREPROCESSING PIPELINE PER COIN (SMA WINDOW SUMS, RSI GAINS AND LOSSES, THE RUNNING MIN/MAX OF THE NORMALIZATION AND THE LAST PROCESSED DATE) SO THAT ONLY THE NEW ROWS HAVE TO BE PROCESSED AND APPENDED TO raw_all_features AND clean. FALLS BACK ON A FULL REBUILD (data_preprocessor.clean_data) WHENEVER THE STATE CANNOT BE TRUSTED, E.G., WHEN ALREADY PROCESSED RAW DATA HAS CHANGED.
+
+NOTE: APART FROM FLOATING-POINT ROUNDING OF THE SMAs, THE APPENDED ROWS ARE THE SAME AS A FULL REBUILD WOULD GIVE; THE ALREADY PROCESSED ROWS ARE NEVER RECALCULATED, EXCEPT FOR THE SIGNALS OF THE LAST SIGNAL_FOR_N_DAYS_FROM_NOW ROWS, WHICH ONLY NOW HAVE ENOUGH DAYS AFTER THEM.
+'''
+import hashlib
+import json
+import math
+import numpy as np
+import pandas as pd
+from . import data_preprocessor as dpp
+from . import dataset_storage as ds
+from . import indicators
+from .normalizer import CausalNormalizer
+from .. import common
+from typing import List
+
+STATE_DIRECTORY = "datasets/cache/preprocessing"
+BASIC_COLUMNS = ["date", "price", "market_cap", "volume", "fear_greed"]
+
+
+
+#
+# ---------- HELPER METHODS ----------
+#
+def get_state_filepath(coin: str) -> str:
+    return f"{STATE_DIRECTORY}/{coin}_preprocessing_state.json"
+
+
+
+def get_all_features_filepath(coin: str) -> str:
+    return f"datasets/raw/{coin}_historical_data_raw_all_features.csv"
+
+
+
+def get_clean_filepath(coin: str) -> str:
+    return f"datasets/clean/{coin}_historical_data_clean.csv"
+
+
+
+def get_all_features_columns() -> List[str]:
+    return BASIC_COLUMNS + indicators.get_SMA_column_names() + ["RSI", "signal"]
+
+
+
+def get_raw_hash(data: pd.DataFrame) -> str:
+    '''
+    Fingerprints the raw rows (in date order) so that any change to already processed raw data can be detected.
+    '''
+    data = data.sort_values(by=["date"]).reset_index(drop=True)
+    return hashlib.sha256(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()).hexdigest()
+
+
+
+def is_final(raw_row: pd.Series) -> bool:
+    '''
+    Returns whether the newest processed raw row has no gaps; otherwise its gaps were filled from older rows only and a newer row would change them.
+    '''
+    values = raw_row.drop("date").to_numpy(dtype=np.float64)
+    return bool(np.all(values != 0) and not np.isnan(values).any())
+
+
+
+def load_state(coin: str) -> dict:
+    try:
+        with open(get_state_filepath(coin), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+
+def save_state(coin: str, state: dict) -> None:
+    def write(tmp_filepath: str) -> None:
+        with open(tmp_filepath, 'w') as f:
+            json.dump(state, f)
+
+    ds.replace_atomically(get_state_filepath(coin), write)
+
+
+
+def build_state(raw_data: pd.DataFrame, all_features: pd.DataFrame) -> dict:
+    '''
+    Param raw_data is the raw dataset that was processed (before any filling) and param all_features its processed features in chronological order.
+    '''
+    last_date = all_features["date"].iloc[-1]
+    processed_raw_data = raw_data[raw_data["date"] <= last_date]
+    newest_raw_row = processed_raw_data.sort_values(by=["date"]).iloc[-1]
+
+    SMAs = {}
+    for column, windows in indicators.SMA_WINDOWS.items():
+        values = all_features[column].to_numpy(dtype=np.float64)[-max(windows):]
+        SMAs[column] = {"values": values.tolist(), "totals": {str(window): math.fsum(values[-window:]) for window in windows}}
+
+    # NOTE: the RSI is calculated over the 3rd column (see data_preprocessor.calculate_RSIs)
+    RSI_values = all_features.iloc[:, 2].to_numpy(dtype=np.float64)
+    changes = np.diff(RSI_values[-(indicators.RSI_PERIOD + 1):])
+
+    normalizer = CausalNormalizer(all_features.columns[1:-1])
+    normalizer.fit_transform(all_features[all_features.columns[1:-1]].to_numpy(dtype=np.float64))
+
+    return {
+        "last_date": str(last_date.date()),
+        "n_rows": len(all_features),
+        "columns": list(all_features.columns),
+        "raw_hash": get_raw_hash(processed_raw_data),
+        "final": is_final(newest_raw_row),
+        "SMA": SMAs,
+        "RSI": {
+            "last_value": float(RSI_values[-1]),
+            "gains": np.where(changes > 0, changes, 0.0).tolist(),
+            "losses": np.where(changes < 0, -changes, 0.0).tolist(),
+        },
+        "signal_prices": all_features["price"].to_numpy(dtype=np.float64)[-common.SIGNAL_FOR_N_DAYS_FROM_NOW:].tolist(),
+        "normalizer": normalizer.get_state(),
+    }
+
+
+
+def is_state_valid(state: dict, raw_data: pd.DataFrame, clean_data: pd.DataFrame) -> bool:
+    if state is None or clean_data is None or not state["final"]:
+        return False
+    # e.g., new SMA windows
+    if state["columns"] != get_all_features_columns():
+        return False
+    # the RSI's first window and the signals' interval must already be behind us
+    if state["n_rows"] < max(indicators.RSI_PERIOD, common.SIGNAL_FOR_N_DAYS_FROM_NOW):
+        return False
+    # e.g., the clean dataset was rebuilt or replaced without the state
+    if len(clean_data) != state["n_rows"] or str(clean_data["date"].iloc[-1].date()) != state["last_date"]:
+        return False
+
+    return get_raw_hash(raw_data[raw_data["date"] <= pd.Timestamp(state["last_date"])]) == state["raw_hash"]
+
+
+
+#
+# ---------- INCREMENTAL STEPS ----------
+#
+def calculate_new_SMAs(state: dict, new_data: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Updates the running window sums (the same running totals as the original row-by-row SMA calculation) row by row.
+    '''
+    n_rows = state["n_rows"]
+    for column, windows in indicators.SMA_WINDOWS.items():
+        values = state["SMA"][column]["values"]
+        totals = state["SMA"][column]["totals"]
+        SMAs = {window: [] for window in windows}
+        for i, value in enumerate(new_data[column].to_numpy(dtype=np.float64), start=n_rows):
+            for window in windows:
+                totals[str(window)] += value
+                if window <= i:
+                    totals[str(window)] -= values[-window]
+                    SMAs[window].append(totals[str(window)] / window)
+                else:
+                    SMAs[window].append(0.0)
+            values.append(float(value))
+        del values[:-max(windows)]
+
+        for window in windows:
+            new_data[f"{column}_{window}_SMA"] = SMAs[window]
+
+    return new_data
+
+
+
+def calculate_new_RSIs(state: dict, new_data: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Same as the simple RSI (see indicators.calculate_simple_RSI): the gains and losses of the last RSI_PERIOD days are summed in order.
+    '''
+    period = indicators.RSI_PERIOD
+    RSI_state = state["RSI"]
+    RSI = []
+    for value in new_data.iloc[:, 2].to_numpy(dtype=np.float64):
+        change = value - RSI_state["last_value"]
+        RSI_state["gains"] = (RSI_state["gains"] + [change if change > 0 else 0.0])[-period:]
+        RSI_state["losses"] = (RSI_state["losses"] + [-change if change < 0 else 0.0])[-period:]
+        RSI_state["last_value"] = float(value)
+
+        gain = 0.0
+        loss = 0.0
+        for k in range(period):
+            gain += RSI_state["gains"][k]
+            loss += RSI_state["losses"][k]
+        rs_value = 0.0 if loss == 0 else (gain / period) / (loss / period)
+        RSI.append(100.0 - (100.0 / (1.0 + rs_value)))
+
+    new_data["RSI"] = RSI
+
+    return new_data
+
+
+
+def calculate_new_signals(state: dict) -> np.ndarray:
+    '''
+    Returns the signals from the first row that did not yet have SIGNAL_FOR_N_DAYS_FROM_NOW days after it up until the newest row (0 for the rows that still do not).
+    '''
+    interval = common.SIGNAL_FOR_N_DAYS_FROM_NOW
+    prices = np.array(state["signal_prices"])
+    signals = np.zeros(len(prices))
+    signals[:len(prices) - interval] = dpp.get_signal_values(dpp.calculate_weighted_price_deltas(prices, interval))
+    state["signal_prices"] = prices[-interval:].tolist()
+
+    return signals
+
+
+
+#
+# ---------- CONTROLLER ----------
+#
+def rebuild(coin: str, raw_data: pd.DataFrame, start_date: str, end_date: str, verbose: bool = False) -> pd.DataFrame:
+    '''
+    Preprocesses the whole history with data_preprocessor.clean_data and persists the state for the next incremental update.
+    '''
+    clean_data = dpp.clean_data(coin, raw_data.copy(), start_date, end_date, verbose)
+    if clean_data is None:
+        return None
+
+    all_features = ds.read_dataset(get_all_features_filepath(coin))
+    save_state(coin, build_state(raw_data, all_features))
+
+    return clean_data
+
+
+
+def clean_data_incrementally(coin: str, raw_data: pd.DataFrame, start_date: str, end_date: str, verbose: bool = False) -> pd.DataFrame:
+    '''
+    Same as data_preprocessor.clean_data (including writing raw_all_features and returning the clean dataset, or None if missing dates had to be fetched), but only processes the rows after the last processed date.
+    '''
+    raw_data = raw_data.copy()
+    raw_data["date"] = pd.to_datetime(raw_data["date"])
+
+    state = load_state(coin)
+    try:
+        clean_data = ds.read_dataset(get_clean_filepath(coin))
+        all_features = ds.read_dataset(get_all_features_filepath(coin))
+    except FileNotFoundError:
+        clean_data = None
+        all_features = None
+
+    if not is_state_valid(state, raw_data, clean_data) or all_features is None or len(all_features) != state["n_rows"]:
+        if verbose:
+            print(f"No valid preprocessing state for {coin}. Rebuilding from scratch.")
+        return rebuild(coin, raw_data, start_date, end_date, verbose)
+
+    last_date = pd.Timestamp(state["last_date"])
+    new_data = raw_data[raw_data["date"] > last_date]
+    if len(new_data) == 0:
+        return clean_data
+
+    # the last processed row gives the gap filling the same neighbour it had in the full dataset (in the raw dataset's order, i.e., newest first)
+    new_data = pd.concat([new_data, raw_data[raw_data["date"] == last_date]]).sort_values(by=["date"], ascending=False).reset_index(drop=True)
+    new_data = dpp.handle_missing_data(coin, new_data, last_date, new_data["date"].iloc[0])
+    if new_data is None:
+        return None
+    new_data = new_data.iloc[:-1].iloc[::-1].reset_index(drop=True)
+    new_data = new_data[BASIC_COLUMNS]
+
+    new_data = calculate_new_SMAs(state, new_data)
+    new_data = calculate_new_RSIs(state, new_data)
+    new_data["signal"] = 0.0
+    new_data = new_data.fillna(0)
+
+    # relabel the rows that now have enough days after them
+    state["signal_prices"] += new_data["price"].tolist()
+    signals = calculate_new_signals(state)
+    n_relabelled = len(signals) - len(new_data)
+    all_features.loc[len(all_features) - n_relabelled:, "signal"] = signals[:n_relabelled]
+    clean_data.loc[len(clean_data) - n_relabelled:, "signal"] = signals[:n_relabelled]
+    new_data["signal"] = signals[n_relabelled:]
+
+    all_features = pd.concat([all_features, new_data]).reset_index(drop=True)
+    ds.write_dataset(all_features, get_all_features_filepath(coin))
+
+    normalizer = CausalNormalizer(new_data.columns[1:-1])
+    normalizer.set_state(state["normalizer"])
+    new_clean_data = new_data.copy()
+    new_clean_data[new_data.columns[1:-1]] = [normalizer.transform_row(row) for row in new_data[new_data.columns[1:-1]].to_numpy(dtype=np.float64)]
+    new_clean_data = new_clean_data.fillna(0)
+    clean_data = pd.concat([clean_data, new_clean_data]).reset_index(drop=True)
+
+    newest_raw_row = raw_data.sort_values(by=["date"]).iloc[-1]
+    state.update({
+        "last_date": str(new_data["date"].iloc[-1].date()),
+        "n_rows": len(all_features),
+        "raw_hash": get_raw_hash(raw_data[raw_data["date"] <= new_data["date"].iloc[-1]]),
+        "final": is_final(newest_raw_row),
+        "normalizer": normalizer.get_state(),
+    })
+    save_state(coin, state)
+    if verbose:
+        print(f"Appended {len(new_data)} new rows for {coin}.")
+
+    return clean_data
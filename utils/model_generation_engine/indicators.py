@@ -0,0 +1,119 @@
+'''
+USED BY THE DATA PREPROCESSOR TO CALCULATE THE TECHNICAL INDICATORS THAT ARE FED TO THE MODELS AS FEATURES.
+
+FUNCTION: HOLDS THE DECLARATIVE CONFIG OF WHICH INDICATORS ARE CALCULATED (E.G., WHICH SMA WINDOWS FOR WHICH COLUMN) AND CALCULATES THEM OVER A WHOLE SERIES AT ONCE WITH ARRAY OPERATIONS.
+
+NOTE: ALL SERIES ARE IN CHRONOLOGICAL ORDER, I.E., OLDEST FIRST.
+'''
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+# the simple moving averages (in days) calculated for each column; each becomes a feature column named {column}_{window}_SMA, in this order
+SMA_WINDOWS = {
+    "price": [5, 10, 25, 50, 75, 100, 150, 200, 250, 300, 350],
+    "fear_greed": [3, 5, 7, 9, 11, 13, 15, 30],
+}
+
+
+
+def get_SMA_column_names(sma_windows: Dict[str, List[int]] = SMA_WINDOWS) -> List[str]:
+    return [f"{column}_{window}_SMA" for column, windows in sma_windows.items() for window in windows]
+
+
+
+def calculate_SMAs(values: np.ndarray, windows: List[int]) -> np.ndarray:
+    '''
+    Returns a 2D array with the simple moving average of values for each window (one column per window), all from a single cumulative sum.
+    NOTE: the average for day i covers days i-window+1 until i, but is only calculated from day i = window onwards; before that it is 0.0 (i.e., the first full window is skipped as well).
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    n_values = len(values)
+    # totals[i] is the sum of the first i values
+    totals = np.concatenate([[0.0], np.cumsum(values)])
+
+    SMAs = np.zeros((n_values, len(windows)))
+    for j, window in enumerate(windows):
+        ends = np.arange(window, n_values)
+        SMAs[ends, j] = (totals[ends + 1] - totals[ends + 1 - window]) / window
+
+    return SMAs
+
+
+
+RSI_PERIOD = 14
+# simple: the gains and losses are plain averages over the period (the original variant)
+# wilder: the gains and losses are Wilder's smoothed averages, i.e., an exponential moving average with alpha = 1/period
+RSI_MODES = ["simple", "wilder"]
+
+
+
+def calculate_simple_RSI(values: np.ndarray, period: int) -> np.ndarray:
+    '''
+    NOTE: matches the original row-by-row implementation exactly:
+        the first period-1 days are 0.0,
+        a period without losses gives 0.0 rather than 100.0,
+        and the first window wraps around to compare the first value with the last one (i.e., iloc[-1]).
+    '''
+    n_values = len(values)
+    RSI = np.zeros(n_values)
+    if n_values < period:
+        return RSI
+
+    # changes[j] = values[j] - values[j-1], where changes[0] is the wrap-around change
+    changes = values - np.roll(values, 1)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    # summed in the same order as the original so that the result is bit-identical
+    ends = np.arange(period - 1, n_values)
+    gain = np.zeros(len(ends))
+    loss = np.zeros(len(ends))
+    for k in range(period):
+        gain += gains[ends - period + 1 + k]
+        loss += losses[ends - period + 1 + k]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs_value = np.where(loss == 0, 0.0, (gain / period) / (loss / period))
+    RSI[ends] = 100.0 - (100.0 / (1.0 + rs_value))
+
+    return RSI
+
+
+
+def calculate_wilder_RSI(values: np.ndarray, period: int) -> np.ndarray:
+    '''
+    NOTE: the first period days are 0.0 (there are not yet period changes to average) and a period without losses gives 100.0.
+    '''
+    n_values = len(values)
+    RSI = np.zeros(n_values)
+    if n_values <= period:
+        return RSI
+
+    changes = np.diff(values)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    # seeded with the plain average of the first period changes, then avg = (avg * (period-1) + change) / period
+    avg_gain = pd.Series(np.concatenate([[gains[:period].mean()], gains[period:]])).ewm(alpha=1/period, adjust=False).mean().to_numpy()
+    avg_loss = pd.Series(np.concatenate([[losses[:period].mean()], losses[period:]])).ewm(alpha=1/period, adjust=False).mean().to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        RSI[period:] = np.where(avg_loss == 0, 100.0, 100.0 - (100.0 / (1.0 + avg_gain / avg_loss)))
+
+    return RSI
+
+
+
+def calculate_RSI(values: np.ndarray, period: int = RSI_PERIOD, mode: str = "simple") -> np.ndarray:
+    '''
+    Returns the Relative Strength Index of values for every day.
+    Param mode is one of RSI_MODES.
+    '''
+    values = np.asarray(values, dtype=np.float64)
+    if mode == "simple":
+        return calculate_simple_RSI(values, period)
+    elif mode == "wilder":
+        return calculate_wilder_RSI(values, period)
+
+    raise ValueError(f"Unknown RSI mode: {mode}. Must be one of {RSI_MODES}.")
@@ -0,0 +1,173 @@
+'''
+USED BY THE DATA PROCESSOR TO TRAIN MANY CryptoSoothsayer MODELS OF THE SAME HIDDEN LAYER SIZE AT ONCE (E.G., THE GRID POINTS OF parameter_tuner).
+
+FUNCTION: STACKS THE WEIGHTS OF K MODELS INTO BATCHED TENSORS SO THAT ONE TRAINING STEP IS A SINGLE BATCHED MATMUL PER LAYER FOR ALL K MODELS, EACH WITH ITS OWN ETA, ETA DECAY AND DROPOUT. ANY MODEL CAN BE UNSTACKED INTO AN ORDINARY CryptoSoothsayer (OR ITS state_dict) TO BE SAVED, LOADED AND EVALUATED AS USUAL.
+
+NOTE: EVERY MODEL OF A BANK SEES THE SAME MINI-BATCHES. THE OPTIMIZER IS ADAM WITH PYTORCH'S DEFAULTS AND THE SCHEDULER DECAYS ETA BY ETA_DECAY PER SAMPLE, AS IN CryptoSoothsayer, BUT BOTH ARE KEPT PER MODEL: ONE MODEL OF THE BANK CAN BE FROZEN (E.G., WHEN IT TERMINATES ITS EPOCH EARLY) WHILE THE OTHERS KEEP TRAINING.
+'''
+import numpy as np
+import torch
+import torch.nn.functional as F
+from typing import List
+from . import neural_nets as nn
+
+# Adam's defaults in pytorch
+BETAS = (0.9, 0.999)
+EPSILON = 1e-8
+
+
+
+class ModelBank(torch.nn.Module):
+    '''
+    Params etas, eta_decays and dropouts hold one value per model of the bank.
+    NOTE: each model is initialized like a new CryptoSoothsayer (see neural_nets.create_model).
+    '''
+    def __init__(self, hidden_size: int, etas: List[float], eta_decays: List[float], dropouts: List[float]):
+        super(ModelBank, self).__init__()
+        if not len(etas) == len(eta_decays) == len(dropouts):
+            raise ValueError(f"Expected one eta, eta decay and dropout per model, but got {len(etas)} etas, {len(eta_decays)} eta decays and {len(dropouts)} dropouts.")
+
+        self.hidden_size = hidden_size
+        self.etas = [float(eta) for eta in etas]
+        self.eta_decays = [float(eta_decay) for eta_decay in eta_decays]
+        self.dropouts = [float(dropout) for dropout in dropouts]
+        self.device = (torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu"))
+
+        # architecture: the weights are stored transposed (input x output) for the batched matmuls
+        models = [nn.create_model(hidden_size, dropout, eta, eta_decay) for eta, eta_decay, dropout in zip(etas, eta_decays, dropouts)]
+        self.layer_1_weight = torch.nn.Parameter(torch.stack([model.layer_1.weight.detach().T for model in models]))
+        self.layer_1_bias = torch.nn.Parameter(torch.stack([model.layer_1.bias.detach()[None, :] for model in models]))
+        self.layer_output_weight = torch.nn.Parameter(torch.stack([model.layer_output.weight.detach().T for model in models]))
+        self.layer_output_bias = torch.nn.Parameter(torch.stack([model.layer_output.bias.detach()[None, :] for model in models]))
+        self.to(self.device)
+
+        # per-model hyperparameters, shaped to broadcast over the stacked weights
+        self.dropout_rates = torch.tensor(self.dropouts, dtype=torch.float32, device=self.device)[:, None, None]
+        self.decay_rates = torch.tensor(self.eta_decays, dtype=torch.float64, device=self.device)
+        self.learning_rates = torch.tensor(self.etas, dtype=torch.float64, device=self.device)
+        # the models that are still training (see freeze)
+        self.active = torch.ones(len(self), dtype=torch.bool, device=self.device)
+        # Adam's state
+        self.n_steps = torch.zeros(len(self), dtype=torch.float64, device=self.device)
+        self.first_moments = [torch.zeros_like(param) for param in self.parameters()]
+        self.second_moments = [torch.zeros_like(param) for param in self.parameters()]
+
+
+    def __len__(self) -> int:
+        return len(self.etas)
+
+
+    def forward(self, inputs: torch.tensor) -> torch.tensor:
+        '''
+        Maps a batch of feature vectors (batch x features) to every model's output (models x batch x signals).
+        '''
+        inputs = inputs.expand(len(self), -1, -1)
+        out = F.relu(torch.baddbmm(self.layer_1_bias, inputs, self.layer_1_weight))
+        if self.training:
+            # inverted dropout with each model's own rate, as nn.Dropout does
+            keep = (torch.rand_like(out) >= self.dropout_rates).to(out.dtype)
+            out = out * keep / (1 - self.dropout_rates)
+        out = torch.baddbmm(self.layer_output_bias, out, self.layer_output_weight)
+
+        return out
+
+
+    def get_losses(self, feature_tensor: torch.tensor, target_tensor: torch.tensor) -> torch.tensor:
+        '''
+        Returns every model's mean cross entropy loss over the batch.
+        '''
+        outputs = self(feature_tensor)
+        losses = F.cross_entropy(outputs.reshape(-1, outputs.shape[-1]), target_tensor.repeat(len(self)), reduction="none")
+
+        return losses.view(len(self), -1).mean(dim=1)
+
+
+    def take_one_batch(self, features: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        '''
+        Trains every active model on a mini-batch (see data_processor.take_one_batch) and decays their etas as much as len(targets) single steps would have.
+        Returns every model's mean training loss of the batch.
+        '''
+        self.train()
+        feature_tensor = torch.from_numpy(np.ascontiguousarray(features, dtype=np.float32)).to(self.device)
+        target_tensor = torch.from_numpy(np.ascontiguousarray(targets, dtype=np.int64)).to(self.device)
+        # Forward: summing the losses keeps each model's gradients its own
+        losses = self.get_losses(feature_tensor, target_tensor)
+        # Backward
+        self.zero_grad()
+        losses.sum().backward()
+        self.adam_step()
+        # adjust learning rates
+        self.learning_rates = torch.where(self.active, self.learning_rates * self.decay_rates ** len(targets), self.learning_rates)
+
+        return losses.detach().cpu().numpy()
+
+
+    def adam_step(self) -> None:
+        '''
+        Same update as torch.optim.Adam, but with each model's own eta and step count, leaving the frozen models untouched.
+        '''
+        self.n_steps += self.active.to(self.n_steps.dtype)
+        # models x 1 x 1, to broadcast over the stacked weights
+        active = self.active[:, None, None]
+        first_correction = (1 - BETAS[0] ** self.n_steps).float()[:, None, None]
+        second_correction = (1 - BETAS[1] ** self.n_steps).float()[:, None, None]
+        step_sizes = (self.learning_rates.float()[:, None, None] / first_correction)
+
+        with torch.no_grad():
+            for param, first_moment, second_moment in zip(self.parameters(), self.first_moments, self.second_moments):
+                first_moment.copy_(torch.where(active, BETAS[0] * first_moment + (1 - BETAS[0]) * param.grad, first_moment))
+                second_moment.copy_(torch.where(active, BETAS[1] * second_moment + (1 - BETAS[1]) * param.grad**2, second_moment))
+                update = step_sizes * first_moment / (second_moment.sqrt() / second_correction.sqrt() + EPSILON)
+                param.sub_(torch.where(active, update, torch.zeros_like(update)))
+
+
+    def validate(self, feature_tensor: torch.tensor, target_tensor: torch.tensor) -> np.ndarray:
+        '''
+        Returns every model's average loss on the validation dataset (e.g., from common.convert_dataset_to_tensors) in one batched forward pass.
+        '''
+        self.eval()
+        with torch.no_grad():
+            losses = self.get_losses(feature_tensor, target_tensor)
+
+        return losses.cpu().numpy()
+
+
+    def freeze(self, model_ind: int) -> None:
+        self.active[model_ind] = False
+
+
+    def unfreeze_all(self) -> None:
+        self.active[:] = True
+
+
+    def get_device(self):
+        return self.device
+
+
+    def get_eta(self, model_ind: int) -> float:
+        '''
+        Returns the model's current (i.e., decayed) eta.
+        '''
+        return self.learning_rates[model_ind].item()
+
+
+    def get_state_dict(self, model_ind: int) -> dict:
+        '''
+        Returns the model's weights as the state_dict of a CryptoSoothsayer.
+        '''
+        return {
+            "layer_1.weight": self.layer_1_weight[model_ind].detach().T.clone(),
+            "layer_1.bias": self.layer_1_bias[model_ind, 0].detach().clone(),
+            "layer_output.weight": self.layer_output_weight[model_ind].detach().T.clone(),
+            "layer_output.bias": self.layer_output_bias[model_ind, 0].detach().clone(),
+        }
+
+
+    def get_model(self, model_ind: int) -> nn.CryptoSoothsayer:
+        '''
+        Unstacks the model into a CryptoSoothsayer with the same hyperparameters and weights.
+        '''
+        model = nn.create_model(self.hidden_size, self.dropouts[model_ind], self.etas[model_ind], self.eta_decays[model_ind])
+        model.load_state_dict(self.get_state_dict(model_ind))
+
+        return model
@@ -1,6 +1,7 @@
 import glob
 import os
 import torch
+from . import dataset_storage as ds
 from . import neural_nets as nn
 from .. import common
 from typing import List, Tuple
@@ -87,7 +88,10 @@ def get_model_params(coin: str, filename: str) -> dict:
 # ---------- SAVE/LOAD MODELS ----------
 #
 def save_model(model: nn.CryptoSoothsayer, filepath: str) -> None:
-    torch.save(model.state_dict(), filepath)
+    '''
+    NOTE: written atomically, so that a model file being loaded (e.g., by another sweep worker or the pruning) is never half-written.
+    '''
+    ds.replace_atomically(filepath, lambda tmp_filepath: torch.save(model.state_dict(), tmp_filepath))
 
 
 
@@ -99,6 +103,34 @@ def load_model(model_to_load: nn.CryptoSoothsayer, filepath: str) -> nn.CryptoSo
 
 
 
+def save_training_state(model: nn.CryptoSoothsayer, lowest_valid_loss: float, filepath: str) -> None:
+    '''
+    Saves everything needed to resume training where it stopped: the latest weights, the optimizer's state (including the decayed eta), the scheduler's state and the lowest validation loss so far.
+    '''
+    training_state = {
+        "model": model.state_dict(),
+        "optimizer": model.get_optimizer().state_dict(),
+        "scheduler": model.get_scheduler().state_dict(),
+        "lowest_valid_loss": lowest_valid_loss,
+    }
+    ds.replace_atomically(filepath, lambda tmp_filepath: torch.save(training_state, tmp_filepath))
+
+
+
+def load_training_state(model: nn.CryptoSoothsayer, filepath: str) -> float:
+    '''
+    Restores the training state saved by save_training_state into param model (which must have been created with the same hyperparameters).
+    Returns the lowest validation loss so far.
+    '''
+    training_state = torch.load(filepath)
+    model.load_state_dict(training_state["model"])
+    model.get_optimizer().load_state_dict(training_state["optimizer"])
+    model.get_scheduler().load_state_dict(training_state["scheduler"])
+
+    return training_state["lowest_valid_loss"]
+
+
+
 def load_pretrained_model(filepath: str) -> nn.CryptoSoothsayer:
     start_ind = filepath.find('Hidden_') + 7
     end_ind = filepath.find('_', start_ind)
@@ -136,33 +168,27 @@ def print_evaluation_status(model_accuracy: List[float]) -> str:
 
 
 def evaluate_model(model: nn.CryptoSoothsayer, test_data: Tuple[List[float], float]) -> List[float]:
+    '''
+    Returns the fractions of perfect decisions, safe failures, nasty failures and catastrophic failures on the test dataset, from one batched forward pass.
+    '''
     model.eval()
-    correct = 0
-    safe_fail = 0
-    nasty_fail = 0
-    catastrophic_fail = 0
-    for features, target in test_data:
-        feature_tensor, target_tensor = common.convert_to_tensor(model, features, target)
-
-        with torch.no_grad():
-            output = model(feature_tensor)
-
-        decision = torch.argmax(output, dim=1)
-
-        # flawless
-        if decision == target_tensor:
-            correct += 1
-            # catastrophic failure (e.g., told to buy when should have sold)
-        elif (target_tensor > 1 and decision < 1) or (target_tensor < 1 and decision > 1):
-            catastrophic_fail += 1
-        # severe failure (e.g., should have hodled but was told to buy or sell
-        elif target_tensor == 1 and (decision < 1 or decision > 1):
-            nasty_fail += 1
-        # decision was to hodl, but should have sold or bought
-        else:
-            safe_fail += 1
+    feature_tensor, target_tensor = common.convert_dataset_to_tensors(model, test_data)
+
+    with torch.no_grad():
+        output = model(feature_tensor)
+
+    decision = torch.argmax(output, dim=1)
+
+    # flawless
+    correct = decision == target_tensor
+    # catastrophic failure (e.g., told to buy when should have sold)
+    catastrophic_fail = ((target_tensor > 1) & (decision < 1)) | ((target_tensor < 1) & (decision > 1))
+    # severe failure (e.g., should have hodled but was told to buy or sell
+    nasty_fail = ~correct & (target_tensor == 1)
+    # decision was to hodl, but should have sold or bought
+    safe_fail = ~(correct | catastrophic_fail | nasty_fail)
 
-    model_accuracy = [correct/len(test_data), safe_fail/len(test_data), nasty_fail/len(test_data), catastrophic_fail/len(test_data)]
+    model_accuracy = [correct.sum().item()/len(test_data), safe_fail.sum().item()/len(test_data), nasty_fail.sum().item()/len(test_data), catastrophic_fail.sum().item()/len(test_data)]
 
 
     return model_accuracy
@@ -171,23 +197,18 @@ def evaluate_model(model: nn.CryptoSoothsayer, test_data: Tuple[List[float], flo
 
 def validate_model(model: nn.CryptoSoothsayer, valid_data: Tuple[List[float], float], lowest_valid_loss: float, filepath: str) -> Tuple[float, float]:
     '''
-    Validates the model on the validation dataset.
+    Validates the model on the validation dataset in one batched forward pass.
     Saves model if validation loss is lower than the current lowest.
     Returns the average validation loss and lowest validation loss.
     '''
     # set to evaluate mode to turn off components like dropout
     model.eval()
-    valid_loss = 0.0
-    for features, target in valid_data:
-        # make data pytorch compatible
-        feature_tensor, target_tensor = common.convert_to_tensor(model, features, target)
-        # model makes prediction
-        with torch.no_grad():
-            model_output = model(feature_tensor)
-            loss = model.get_criterion()(model_output, target_tensor)
-            valid_loss += loss.item()
-
-    avg_valid_loss = valid_loss/len(valid_data)
+    # make data pytorch compatible (built once for an ArrayDataset)
+    feature_tensor, target_tensor = common.convert_dataset_to_tensors(model, valid_data)
+    # model makes prediction; the criterion averages the loss over the samples
+    with torch.no_grad():
+        model_output = model(feature_tensor)
+        avg_valid_loss = model.get_criterion()(model_output, target_tensor).item()
 
     return avg_valid_loss, lowest_valid_loss
 
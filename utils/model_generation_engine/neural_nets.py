@@ -23,7 +23,9 @@ class CryptoSoothsayer(nn.Module):
         self.eta_decay = eta_decay
         self.criterion = nn.CrossEntropyLoss()
         self.optimizer = optim.Adam(self.parameters(), lr=self.eta)
-        lambda1 = lambda epoch: self.eta_decay
+        # eta decays by eta_decay per training sample, however many samples a step takes (see step_scheduler)
+        self.n_samples_per_step = 1
+        lambda1 = lambda epoch: self.eta_decay ** self.n_samples_per_step
         self.scheduler =  lr_scheduler.MultiplicativeLR(self.optimizer, lambda1)
         # device
         self.device = (torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu"))
@@ -60,6 +62,14 @@ class CryptoSoothsayer(nn.Module):
         return self.scheduler
 
 
+    def step_scheduler(self, n_samples: int = 1) -> None:
+        '''
+        Decays eta once for each of the n_samples the last optimizer step was trained on, so that a mini-batch of n samples decays it as much as n single-sample steps.
+        '''
+        self.n_samples_per_step = n_samples
+        self.scheduler.step()
+
+
     def get_device(self):
         return self.device
 
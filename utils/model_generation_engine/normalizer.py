@@ -0,0 +1,97 @@
+'''
+USED BY THE DATA PREPROCESSOR (WHOLE DATASETS) AND THE SIGNAL GENERATOR (ONE NEW DAY AT A TIME).
+
+FUNCTION: CAUSAL MIN-MAX NORMALIZATION, I.E., EACH ROW IS NORMALIZED WITH THE MIN AND MAX OF ITS COLUMN UP UNTIL AND INCLUDING THAT ROW, SO THAT NO ROW HAS ANY KNOWLEDGE OF THE FUTURE. THE RUNNING MIN AND MAX ARE KEPT SO THAT A NEW ROW CAN BE NORMALIZED WITHOUT REVISITING THE HISTORY. FEAR & GREED COLUMNS ARE NOT MIN-MAX NORMALIZED BECAUSE THE INDEX IS ALREADY OUT OF 100.
+'''
+import numpy as np
+from typing import List, Tuple
+
+FEAR_GREED_SCALE = 100
+
+
+
+def apply_guards(col_max: np.ndarray, col_min: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Avoids division by zero: a constant non-zero column is shifted to 1.0 and an all zero (or non-positive) one to 0.0.
+    '''
+    constant = (col_max == col_min) & (col_max != 0)
+    col_min = np.where(constant, col_min - 1, col_min)
+    col_max = np.where(~constant & (col_max == 0), col_max + 1, col_max)
+
+    return col_max, col_min
+
+
+
+def normalize_min_max(values: np.ndarray) -> np.ndarray:
+    '''
+    Normalizes every column of the 2D array values by its expanding (i.e., running) max and min.
+    NOTE: NaN values are skipped by the running max and min (like pandas' max/min) and stay NaN.
+    '''
+    col_max, col_min = apply_guards(np.fmax.accumulate(values, axis=0), np.fmin.accumulate(values, axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized = (values - col_min) / (col_max - col_min)
+
+    # 1st row items only have themselves as history
+    if len(values) > 1:
+        normalized[0] = 1.0
+
+    return normalized
+
+
+
+class CausalNormalizer:
+    '''
+    Param columns are the names of the columns to be normalized, in order; any column with fear_greed in its name is divided by 100 instead.
+    '''
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self.is_fear_greed = np.array(["fear_greed" in str(column) for column in self.columns], dtype=bool)
+        self.col_max = None
+        self.col_min = None
+
+
+    def fit_transform(self, values: np.ndarray) -> np.ndarray:
+        '''
+        Normalizes the whole history (rows in chronological order) and keeps its max and min for transform_row.
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        normalized = normalize_min_max(values)
+        normalized[:, self.is_fear_greed] = values[:, self.is_fear_greed] / FEAR_GREED_SCALE
+
+        if len(values) > 0:
+            self.col_max = np.fmax.reduce(values, axis=0)
+            self.col_min = np.fmin.reduce(values, axis=0)
+
+        return normalized
+
+
+    def transform_row(self, row: np.ndarray) -> np.ndarray:
+        '''
+        Normalizes the next day's row, i.e., returns what fit_transform would return for it as the last row of the history so far.
+        '''
+        row = np.asarray(row, dtype=np.float64)
+        if self.col_max is None:
+            self.col_max, self.col_min = row.copy(), row.copy()
+        else:
+            self.col_max = np.fmax(self.col_max, row)
+            self.col_min = np.fmin(self.col_min, row)
+
+        col_max, col_min = apply_guards(self.col_max, self.col_min)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized = (row - col_min) / (col_max - col_min)
+        normalized[self.is_fear_greed] = row[self.is_fear_greed] / FEAR_GREED_SCALE
+
+        return normalized
+
+
+    def get_state(self) -> dict:
+        return {
+            "columns": [str(column) for column in self.columns],
+            "col_max": None if self.col_max is None else self.col_max.tolist(),
+            "col_min": None if self.col_min is None else self.col_min.tolist(),
+        }
+
+
+    def set_state(self, state: dict) -> None:
+        self.col_max = None if state["col_max"] is None else np.array(state["col_max"], dtype=np.float64)
+        self.col_min = None if state["col_min"] is None else np.array(state["col_min"], dtype=np.float64)
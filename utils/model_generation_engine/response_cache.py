@@ -0,0 +1,111 @@
+'''
+USED BY THE DATA AGGREGATOR SO THAT RERUNS DO NOT REQUEST THE SAME DATA FROM THE APIS AGAIN.
+
+FUNCTION: STORES API RESPONSES IN AN SQLITE FILE KEYED BY A HASH OF (ENDPOINT, COIN, DATE). RESPONSES FOR PAST DATES NEVER EXPIRE; RESPONSES FOR THE CURRENT DAY ARE GIVEN A SHORT TIME TO LIVE.
+'''
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Tuple
+
+# seconds a response for the current day (which can still change) is kept
+CURRENT_DAY_TTL = 15 * 60
+
+
+
+class ResponseCache:
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # opened on first use so that each process that imports this module opens its own connection
+        self.connection = None
+        self.connection_pid = None
+
+
+    def get_connection(self) -> sqlite3.Connection:
+        if self.connection is None or self.connection_pid != os.getpid():
+            directory = os.path.dirname(self.filepath)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.filepath, check_same_thread=False)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, endpoint TEXT, coin TEXT, date TEXT, response TEXT, fetched_at REAL, expires_at REAL)")
+            self.connection.commit()
+            self.connection_pid = os.getpid()
+
+        return self.connection
+
+
+    def get(self, endpoint: str, coin: str, date: str) -> dict:
+        '''
+        Returns the cached response or None if it is not cached or has expired.
+        NOTE: does not update the hit/miss counts.
+        '''
+        with self.lock:
+            row = self.get_connection().execute("SELECT response, expires_at FROM responses WHERE key = ?", (get_key(endpoint, coin, date),)).fetchone()
+
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+
+        return json.loads(row[0])
+
+
+    def lookup(self, endpoint: str, coin: str, date: str) -> dict:
+        '''
+        Same as get, but counted as a hit if the response is cached (see report).
+        '''
+        response = self.get(endpoint, coin, date)
+        if response is not None:
+            with self.lock:
+                self.hits += 1
+
+        return response
+
+
+    def put(self, endpoint: str, coin: str, date: str, response: dict, ttl: float = None) -> None:
+        '''
+        Stores the response. Param ttl is the number of seconds until it expires; None means it never expires.
+        '''
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self.lock:
+            connection = self.get_connection()
+            connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)", (get_key(endpoint, coin, date), endpoint, coin, date, json.dumps(response), now, expires_at))
+            connection.commit()
+
+
+    def get_or_fetch(self, endpoint: str, coin: str, date: str, fetch: Callable[[], dict], ttl: float = None) -> dict:
+        '''
+        Returns the cached response if there is one; otherwise calls fetch and caches what it returns.
+        NOTE: nothing is cached if fetch raises an exception.
+        '''
+        response = self.lookup(endpoint, coin, date)
+        if response is not None:
+            return response
+
+        with self.lock:
+            self.misses += 1
+        response = fetch()
+        self.put(endpoint, coin, date, response, ttl)
+
+        return response
+
+
+    def get_stats(self) -> Tuple[int, int]:
+        return self.hits, self.misses
+
+
+    def report(self) -> str:
+        return f"Response cache: {self.hits} hits | {self.misses} misses | {self.hits} network calls saved."
+
+
+
+#
+# ---------- HELPER METHODS ----------
+#
+def get_key(endpoint: str, coin: str, date: str) -> str:
+    return hashlib.sha256(f"{endpoint}|{coin}|{date}".encode()).hexdigest()
@@ -0,0 +1,127 @@
+'''
+USED BY THE DATA PROCESSOR TO SEARCH THE HYPERPARAMETERS OF THE MODELS ADAPTIVELY (SEE data_processor.search_parameters).
+
+FUNCTION: SUCCESSIVE HALVING STARTS MANY CONFIGS (E.G., ETA, DECAY AND DROPOUT) ON A SMALL BUDGET OF EPOCHS, KEEPS ONLY THE BEST 1/reduction_factor OF THEM BY VALIDATION LOSS AND GIVES THOSE reduction_factor TIMES THE BUDGET, UNTIL THE LAST RUNG TRAINS THE FEW SURVIVORS FOR max_epochs. HYPERBAND RUNS SEVERAL SUCCESSIVE HALVING BRACKETS THAT TRADE THE NUMBER OF CONFIGS AGAINST THEIR STARTING BUDGET, FOR WHEN IT IS UNCLEAR HOW EARLY A BAD CONFIG CAN BE TOLD APART. THE CONFIGS COME FROM A SAMPLER: EITHER A GRID (IN ORDER) OR RANDOM DRAWS FROM RANGES.
+
+NOTE: THE RUNGS ARE SYNCHRONOUS, I.E., A RUNG IS RUN AS ONE BATCH OF TRIALS (WHICH THE CALLER MAY SPREAD OVER PROCESSES) AND THE PROMOTIONS ARE DECIDED ONCE IT FINISHED.
+'''
+import math
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+# run_rung(configs, n_epochs, resume, is_last_rung) trains each config for n_epochs more epochs and returns the validation loss per model_number
+RungRunner = Callable[[List[dict], int, bool, bool], Dict[int, float]]
+
+
+
+#
+# ---------- SAMPLERS ----------
+#
+class GridSampler:
+    '''
+    Hands out the configs of a grid (each one a dict with a unique model_number) in order.
+    '''
+    def __init__(self, grid: List[dict]):
+        self.grid = grid
+        self.next_ind = 0
+
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of configs not handed out yet.
+        '''
+        return len(self.grid) - self.next_ind
+
+
+    def sample(self, n_configs: int) -> List[dict]:
+        configs = self.grid[self.next_ind:self.next_ind+n_configs]
+        self.next_ind += len(configs)
+
+        return configs
+
+
+
+class RandomSampler:
+    '''
+    Draws every hyperparameter uniformly from its (low, high) range in param ranges, numbering the configs in the order drawn.
+    '''
+    def __init__(self, ranges: Dict[str, Tuple[float, float]], seed: int = None):
+        self.ranges = ranges
+        self.rng = np.random.default_rng(seed)
+        self.n_sampled = 0
+
+
+    def sample(self, n_configs: int) -> List[dict]:
+        configs = []
+        for _ in range(n_configs):
+            config = {"model_number": self.n_sampled}
+            for name, (low, high) in self.ranges.items():
+                config[name] = float(self.rng.uniform(low, high))
+            configs.append(config)
+            self.n_sampled += 1
+
+        return configs
+
+
+
+#
+# ---------- SCHEDULERS ----------
+#
+def get_rung_budgets(min_epochs: int, max_epochs: int, reduction_factor: int) -> List[int]:
+    '''
+    Returns the total number of epochs trained by the end of each rung: min_epochs, min_epochs * reduction_factor, ... up to max_epochs.
+    '''
+    budgets = [min_epochs]
+    while budgets[-1] * reduction_factor < max_epochs:
+        budgets.append(budgets[-1] * reduction_factor)
+    if budgets[-1] < max_epochs:
+        budgets.append(max_epochs)
+
+    return budgets
+
+
+
+def successive_halving(configs: List[dict], run_rung: RungRunner, min_epochs: int, max_epochs: int, reduction_factor: int = 3) -> Dict[int, float]:
+    '''
+    Runs the configs through the rungs of get_rung_budgets, promoting the best len(configs) // reduction_factor (at least 1) of every rung by validation loss.
+    Each rung only trains the promoted configs for the epochs they have not been trained for yet, resuming from their previous rung.
+    Returns the validation loss per model_number of the configs that made it through the last rung.
+    '''
+    budgets = get_rung_budgets(min_epochs, max_epochs, reduction_factor)
+    trained_epochs = 0
+    valid_losses = {}
+
+    for rung, budget in enumerate(budgets):
+        is_last_rung = rung == len(budgets) - 1
+        print(f"Rung {rung+1}/{len(budgets)}: training {len(configs)} configs up to {budget} epochs.")
+        valid_losses = run_rung(configs, budget - trained_epochs, trained_epochs > 0, is_last_rung)
+        trained_epochs = budget
+
+        if not is_last_rung:
+            # NaN losses (i.e., diverged models) are never promoted
+            ranked_configs = sorted(configs, key=lambda config: np.nan_to_num(valid_losses[config["model_number"]], nan=np.inf))
+            configs = ranked_configs[:max(1, len(configs) // reduction_factor)]
+
+    return valid_losses
+
+
+
+def hyperband(sampler, run_rung: RungRunner, min_epochs: int, max_epochs: int, reduction_factor: int = 3) -> Dict[int, float]:
+    '''
+    Runs one successive halving bracket per starting budget (max_epochs, max_epochs / reduction_factor, ... down to min_epochs), the brackets with smaller starting budgets starting more configs.
+    Returns the validation loss per model_number of the configs that made it through the last rung of every bracket.
+    '''
+    n_brackets = len(get_rung_budgets(min_epochs, max_epochs, reduction_factor))
+    valid_losses = {}
+
+    for bracket in reversed(range(n_brackets)):
+        n_configs = math.ceil(n_brackets / (bracket + 1) * reduction_factor**bracket)
+        start_epochs = max(min_epochs, max_epochs // reduction_factor**bracket)
+        configs = sampler.sample(n_configs)
+        if len(configs) == 0:
+            break
+
+        print(f"Bracket {n_brackets-bracket}/{n_brackets}: {len(configs)} configs starting on {start_epochs} epochs.")
+        valid_losses.update(successive_halving(configs, run_rung, start_epochs, max_epochs, reduction_factor))
+
+    return valid_losses
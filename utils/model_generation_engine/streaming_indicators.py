@@ -0,0 +1,293 @@
+'''
+USED BY THE SIGNAL GENERATOR TO GET THE LATEST FEATURES OF EACH COIN WITHOUT RECALCULATING (OR REREADING) THE WHOLE HISTORY.
+
+FUNCTION: KEEPS, PER COIN, A FIXED-SIZE RING BUFFER FOR EVERY INDICATOR (THE LONGEST SMA WINDOW OF EACH COLUMN, THE RSI PERIOD) ALONG WITH THE RUNNING WINDOW SUMS AND THE NORMALIZER'S RUNNING MAX/MIN. EACH NEW DAILY OBSERVATION UPDATES THEM IN O(WINDOWS) AND EMITS THE SAME FEATURE VECTOR (IN THE SAME ORDER) AS THE COIN'S CLEAN DATASET, I.E., WHAT CryptoSoothsayer EXPECTS.
+
+NOTE: SEEDED FROM A raw_all_features DATASET (SEE data_preprocessor.clean_data), AFTER WHICH THE EMITTED FEATURES MATCH THOSE OF A FULL REBUILD UP TO THE FLOATING-POINT ROUNDING OF THE SMAs. THE STATE OF EACH COIN IS PERSISTED BETWEEN RUNS, SO THAT A RUN ONLY UPDATES IT WITH THE DAYS ADDED SINCE THE LAST ONE; IT IS ONLY SEEDED FROM THE WHOLE HISTORY AGAIN WHEN IT NO LONGER CONTINUES THAT HISTORY.
+'''
+import json
+import numpy as np
+import pandas as pd
+from . import dataset_storage as ds
+from . import indicators
+from .normalizer import CausalNormalizer
+from typing import List, Tuple
+
+STATE_DIRECTORY = "datasets/cache/streaming"
+BASIC_COLUMNS = ["price", "market_cap", "volume", "fear_greed"]
+# the RSI is calculated over market_cap (see data_preprocessor.calculate_RSIs)
+RSI_COLUMN = "market_cap"
+
+
+
+def get_raw_feature_columns() -> List[str]:
+    '''
+    Returns the columns of a raw_all_features dataset without the date and signal, in order.
+    '''
+    return BASIC_COLUMNS + indicators.get_SMA_column_names() + ["RSI"]
+
+
+
+def get_feature_columns() -> List[str]:
+    '''
+    Returns the columns fed to the models, in order.
+    NOTE: the models are not yet trained with the RSI (see signal_generator.generate_signals).
+    '''
+    return [column for column in get_raw_feature_columns() if column != "RSI"]
+
+
+
+def get_all_features_filepath(coin: str) -> str:
+    return f"datasets/raw/{coin}_historical_data_raw_all_features.csv"
+
+
+
+def get_state_filepath(coin: str) -> str:
+    return f"{STATE_DIRECTORY}/{coin}_streaming_state.json"
+
+
+
+class StreamingIndicators:
+    '''
+    Param sma_windows and RSI_period default to the indicators' config (see indicators.SMA_WINDOWS and indicators.RSI_PERIOD).
+    '''
+    def __init__(self, sma_windows: dict = indicators.SMA_WINDOWS, RSI_period: int = indicators.RSI_PERIOD):
+        self.sma_windows = {column: np.array(windows) for column, windows in sma_windows.items()}
+        self.RSI_period = RSI_period
+        self.n_rows = 0
+        self.last_observation = None
+
+        # the last max(windows) values of each SMA column; day i is stored at i % len(buffer)
+        self.SMA_buffers = {column: np.zeros(windows.max()) for column, windows in self.sma_windows.items()}
+        # sum of the last min(window, n_rows) values per window
+        self.SMA_totals = {column: np.zeros(len(windows)) for column, windows in self.sma_windows.items()}
+
+        # the gains and losses of the last RSI_period days; day i is stored at i % RSI_period
+        self.gains = np.zeros(RSI_period)
+        self.losses = np.zeros(RSI_period)
+        self.last_RSI_value = None
+
+        self.raw_columns = BASIC_COLUMNS + indicators.get_SMA_column_names(sma_windows) + ["RSI"]
+        self.is_feature = np.array([column != "RSI" for column in self.raw_columns], dtype=bool)
+        self.normalizer = CausalNormalizer(self.raw_columns)
+        self.raw_features = None
+        self.features = None
+
+
+    @classmethod
+    def from_history(cls, data: pd.DataFrame, sma_windows: dict = indicators.SMA_WINDOWS, RSI_period: int = indicators.RSI_PERIOD) -> "StreamingIndicators":
+        '''
+        Seeds the buffers from a raw_all_features dataset (in chronological order) so that the next update continues right after its last day, whose features become the current ones.
+        '''
+        streaming_indicators = cls(sma_windows, RSI_period)
+        n_rows = len(data)
+        if n_rows == 0:
+            return streaming_indicators
+        streaming_indicators.n_rows = n_rows
+        days = np.arange(n_rows)
+
+        for column, windows in streaming_indicators.sma_windows.items():
+            values = data[column].to_numpy(dtype=np.float64)
+            buffer = streaming_indicators.SMA_buffers[column]
+            kept = days[-len(buffer):]
+            buffer[kept % len(buffer)] = values[kept]
+            streaming_indicators.SMA_totals[column] = np.array([values[-window:].sum() for window in windows])
+
+        RSI_values = data[RSI_COLUMN].to_numpy(dtype=np.float64)
+        kept = days[1:][-RSI_period:]
+        changes = RSI_values[kept] - RSI_values[kept - 1]
+        streaming_indicators.gains[kept % RSI_period] = np.where(changes > 0, changes, 0.0)
+        streaming_indicators.losses[kept % RSI_period] = np.where(changes < 0, -changes, 0.0)
+        streaming_indicators.last_RSI_value = RSI_values[-1]
+
+        raw_values = data[streaming_indicators.raw_columns].to_numpy(dtype=np.float64)
+        normalized = streaming_indicators.normalizer.fit_transform(raw_values)
+        streaming_indicators.last_observation = raw_values[-1, :len(BASIC_COLUMNS)].copy()
+        streaming_indicators.raw_features = raw_values[-1]
+        streaming_indicators.features = np.nan_to_num(normalized[-1], nan=0.0)[streaming_indicators.is_feature]
+
+        return streaming_indicators
+
+
+    def fill_observation(self, observation: np.ndarray) -> np.ndarray:
+        '''
+        Missing (0 or NaN) values take the previous day's value, as the gap filling does for the newest day (see data_preprocessor.fill_gaps).
+        '''
+        observation = np.asarray(observation, dtype=np.float64).copy()
+        missing = np.isnan(observation) | (observation == 0)
+        if self.last_observation is not None:
+            observation[missing] = self.last_observation[missing]
+
+        return np.nan_to_num(observation, nan=0.0)
+
+
+    def update_SMAs(self, column: str, value: float) -> np.ndarray:
+        windows = self.sma_windows[column]
+        buffer = self.SMA_buffers[column]
+        totals = self.SMA_totals[column]
+        i = self.n_rows
+
+        totals += value
+        # the value that falls out of each (full) window
+        full = windows <= i
+        totals[full] -= buffer[(i - windows[full]) % len(buffer)]
+        buffer[i % len(buffer)] = value
+
+        return np.where(full, totals / windows, 0.0)
+
+
+    def update_RSI(self, value: float) -> float:
+        '''
+        Same as the simple RSI (see indicators.calculate_simple_RSI), except that the first day has no change rather than the wrap-around one.
+        '''
+        period = self.RSI_period
+        i = self.n_rows
+        change = 0.0 if self.last_RSI_value is None else value - self.last_RSI_value
+        self.gains[i % period] = change if change > 0 else 0.0
+        self.losses[i % period] = -change if change < 0 else 0.0
+        self.last_RSI_value = value
+        if i < period - 1:
+            return 0.0
+
+        # summed oldest to newest like the original so that the result is bit-identical
+        order = (np.arange(i - period + 1, i + 1)) % period
+        gain = sum(self.gains[order].tolist())
+        loss = sum(self.losses[order].tolist())
+        rs_value = 0.0 if loss == 0 else (gain / period) / (loss / period)
+
+        return 100.0 - (100.0 / (1.0 + rs_value))
+
+
+    def update(self, price: float, market_cap: float, volume: float, fear_greed: float) -> np.ndarray:
+        '''
+        Adds the next day's observation and returns its normalized feature vector (see get_feature_columns).
+        NOTE: the raw (i.e., unnormalized) features, including the RSI, are kept in raw_features.
+        '''
+        observation = self.fill_observation([price, market_cap, volume, fear_greed])
+        basic = dict(zip(BASIC_COLUMNS, observation))
+
+        SMAs = [self.update_SMAs(column, basic[column]) for column in self.sma_windows]
+        RSI = self.update_RSI(basic[RSI_COLUMN])
+        self.n_rows += 1
+        self.last_observation = observation
+
+        self.raw_features = np.concatenate([observation, *SMAs, [RSI]])
+        normalized = self.normalizer.transform_row(self.raw_features)
+        self.features = np.nan_to_num(normalized, nan=0.0)[self.is_feature]
+
+        return self.features
+
+
+    def get_state(self) -> dict:
+        '''
+        Returns everything update needs to continue (as json-serializable lists), see set_state.
+        '''
+        return {
+            "raw_columns": self.raw_columns,
+            "RSI_period": self.RSI_period,
+            "n_rows": self.n_rows,
+            "last_observation": None if self.last_observation is None else self.last_observation.tolist(),
+            "SMA_buffers": {column: buffer.tolist() for column, buffer in self.SMA_buffers.items()},
+            "SMA_totals": {column: totals.tolist() for column, totals in self.SMA_totals.items()},
+            "gains": self.gains.tolist(),
+            "losses": self.losses.tolist(),
+            "last_RSI_value": self.last_RSI_value,
+            "normalizer": self.normalizer.get_state(),
+            "raw_features": None if self.raw_features is None else self.raw_features.tolist(),
+            "features": None if self.features is None else self.features.tolist(),
+        }
+
+
+    def set_state(self, state: dict) -> None:
+        '''
+        NOTE: the state must come from streaming indicators with the same sma_windows and RSI_period.
+        '''
+        if state["raw_columns"] != self.raw_columns or state["RSI_period"] != self.RSI_period:
+            raise ValueError("The state is of streaming indicators with different SMA windows or RSI period.")
+
+        self.n_rows = state["n_rows"]
+        self.last_observation = None if state["last_observation"] is None else np.array(state["last_observation"], dtype=np.float64)
+        self.SMA_buffers = {column: np.array(buffer, dtype=np.float64) for column, buffer in state["SMA_buffers"].items()}
+        self.SMA_totals = {column: np.array(totals, dtype=np.float64) for column, totals in state["SMA_totals"].items()}
+        self.gains = np.array(state["gains"], dtype=np.float64)
+        self.losses = np.array(state["losses"], dtype=np.float64)
+        self.last_RSI_value = state["last_RSI_value"]
+        self.normalizer.set_state(state["normalizer"])
+        self.raw_features = None if state["raw_features"] is None else np.array(state["raw_features"], dtype=np.float64)
+        self.features = None if state["features"] is None else np.array(state["features"], dtype=np.float64)
+
+
+
+#
+# ---------- PERSISTENCE ----------
+#
+def save_streaming_indicators(coin: str, streaming_indicators: StreamingIndicators, last_date: pd.Timestamp) -> None:
+    '''
+    Param last_date is the date of the last day the streaming indicators were seeded or updated with.
+    '''
+    def write(tmp_filepath: str) -> None:
+        with open(tmp_filepath, 'w') as f:
+            json.dump(state, f)
+
+    state = {"last_date": str(last_date.date()), "streaming_indicators": streaming_indicators.get_state()}
+    ds.replace_atomically(get_state_filepath(coin), write)
+
+
+
+def load_streaming_indicators(coin: str) -> Tuple[StreamingIndicators, pd.Timestamp]:
+    '''
+    Returns the coin's persisted streaming indicators and the date of their last day, or (None, None) if there are none (or they were made with another indicators' config).
+    '''
+    try:
+        with open(get_state_filepath(coin), 'r') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, None
+
+    streaming_indicators = StreamingIndicators()
+    try:
+        streaming_indicators.set_state(state["streaming_indicators"])
+    except ValueError:
+        return None, None
+
+    return streaming_indicators, pd.Timestamp(state["last_date"])
+
+
+
+def continues_history(streaming_indicators: StreamingIndicators, last_date: pd.Timestamp, data: pd.DataFrame) -> bool:
+    '''
+    Returns whether the streaming indicators' last day is still the same row (same position, date and basic values) of param data (the date and basic columns of the raw_all_features dataset, in chronological order), e.g., not after a full rebuild that changed the history.
+    '''
+    if streaming_indicators is None or streaming_indicators.n_rows == 0 or streaming_indicators.n_rows > len(data):
+        return False
+
+    last_row = data.iloc[streaming_indicators.n_rows - 1]
+
+    return last_row["date"] == last_date and np.array_equal(last_row[BASIC_COLUMNS].to_numpy(dtype=np.float64), streaming_indicators.last_observation)
+
+
+
+#
+# ---------- CONTROLLER ----------
+#
+def get_streaming_indicators(coin: str, day: pd.Timestamp) -> StreamingIndicators:
+    '''
+    Returns the coin's streaming indicators up until and including the given day, whose features then become the current ones.
+    Only the days after the persisted streaming indicators' last day are read and pushed through update; the whole history is only read to seed them again if they do not continue it (see continues_history) or are already past the given day.
+    '''
+    filepath = get_all_features_filepath(coin)
+    data = ds.read_dataset(filepath, columns=["date"] + BASIC_COLUMNS)
+    data = data[data["date"] <= day]
+    if len(data) == 0 or data["date"].iloc[-1] != day:
+        raise ValueError(f"No data for {coin} on {day.date()}.")
+
+    streaming_indicators, last_date = load_streaming_indicators(coin)
+    if last_date is not None and last_date <= day and continues_history(streaming_indicators, last_date, data):
+        for row in data[BASIC_COLUMNS].iloc[streaming_indicators.n_rows:].to_numpy(dtype=np.float64):
+            streaming_indicators.update(*row)
+    else:
+        history = ds.read_dataset(filepath)
+        streaming_indicators = StreamingIndicators.from_history(history[history["date"] <= day])
+    save_streaming_indicators(coin, streaming_indicators, day)
+
+    return streaming_indicators
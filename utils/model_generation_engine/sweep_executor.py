@@ -0,0 +1,111 @@
+'''
+USED BY THE DATA PROCESSOR TO RUN THE TRIALS OF A HYPERPARAMETER SWEEP (E.G., parameter_tuner) IN PARALLEL.
+
+FUNCTION: SPREADS THE TRIALS OVER A POOL OF PROCESSES THAT EACH RUN PYTORCH ON A SINGLE INTRA-OP THREAD, SO THAT EVERY CORE TRAINS ITS OWN TINY MODEL INSTEAD OF ALL CORES SHARING THE MATMULS OF ONE. THE DATASETS ARE COPIED INTO SHARED MEMORY ONCE AND ATTACHED BY EVERY WORKER WHEN IT STARTS, RATHER THAN PICKLED FOR EVERY TRIAL.
+
+NOTE: THE WORKERS TREAT THE SHARED DATASETS AS READ-ONLY (SHUFFLING AND AUGMENTING ALWAYS MAKE NEW ARRAYS) AND ONLY RETURN THEIR RESULTS; THE CALLER OF run_sweep IS THE ONLY ONE WRITING THEM, SO NO TWO PROCESSES EVER APPEND TO THE SAME FILE.
+'''
+import concurrent.futures as cf
+import multiprocessing as mp
+import numpy as np
+import torch
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from . import dataset_methods as dm
+from .array_dataset import ArrayDataset
+from .augmented_dataset import AugmentedDataset
+
+# the datasets attached by this worker process and the shared memory blocks backing them (see init_worker)
+worker_datasets = {}
+worker_blocks = []
+
+
+
+#
+# ---------- SHARED MEMORY ----------
+#
+def share_array(array: np.ndarray, blocks: List[shared_memory.SharedMemory]) -> dict:
+    '''
+    Copies param array into a new shared memory block (appended to param blocks) and returns what a worker needs to attach it.
+    '''
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    blocks.append(block)
+
+    return {"name": block.name, "shape": array.shape, "dtype": array.dtype.str}
+
+
+
+def attach_array(spec: dict) -> np.ndarray:
+    block = shared_memory.SharedMemory(name=spec["name"])
+    worker_blocks.append(block)
+
+    return np.ndarray(spec["shape"], dtype=np.dtype(spec["dtype"]), buffer=block.buf)
+
+
+
+def share_dataset(dataset: ArrayDataset, blocks: List[shared_memory.SharedMemory]) -> dict:
+    '''
+    NOTE: an AugmentedDataset only shares its base rows and number of copies per row; every worker draws its own epochs.
+    '''
+    if isinstance(dataset, AugmentedDataset):
+        return {"class": "AugmentedDataset", "features": share_array(dataset.features, blocks), "labels": share_array(dataset.labels, blocks), "n_copies": share_array(dataset.sampler.n_copies, blocks)}
+
+    if not isinstance(dataset, ArrayDataset):
+        dataset = ArrayDataset(*dm.stack_rows(dataset))
+
+    return {"class": "ArrayDataset", "features": share_array(dataset.features, blocks), "labels": share_array(dataset.labels, blocks)}
+
+
+
+def attach_dataset(spec: dict) -> ArrayDataset:
+    features = attach_array(spec["features"])
+    labels = attach_array(spec["labels"])
+    if spec["class"] == "AugmentedDataset":
+        return AugmentedDataset(features, labels, attach_array(spec["n_copies"]))
+
+    return ArrayDataset(features, labels)
+
+
+
+#
+# ---------- WORKERS ----------
+#
+def init_worker(dataset_specs: Dict[str, dict]) -> None:
+    '''
+    Runs once in every worker process before its first trial.
+    '''
+    torch.set_num_threads(1)
+    for name, spec in dataset_specs.items():
+        worker_datasets[name] = attach_dataset(spec)
+
+
+
+def run_trial(trial_fn: Callable[[Dict[str, ArrayDataset], dict], Any], trial: dict) -> Any:
+    return trial_fn(worker_datasets, trial)
+
+
+
+def run_sweep(trial_fn: Callable[[Dict[str, ArrayDataset], dict], Any], trials: List[dict], datasets: Dict[str, ArrayDataset], n_workers: int = None) -> Iterator[Tuple[dict, Any]]:
+    '''
+    Runs trial_fn(datasets, trial) for every trial on up to n_workers processes (one per core by default) and yields the (trial, result) pairs as the trials finish.
+    Param trial_fn has to be picklable, i.e., a module-level function or a functools.partial of one.
+    NOTE: n_workers = 1 runs the trials in order in this process, without any shared memory.
+    '''
+    if n_workers == 1:
+        for trial in trials:
+            yield trial, trial_fn(datasets, trial)
+        return
+
+    blocks = []
+    try:
+        dataset_specs = {name: share_dataset(dataset, blocks) for name, dataset in datasets.items()}
+        # spawn rather than fork, since forking a process whose pytorch thread pool is already running can deadlock
+        with cf.ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn"), initializer=init_worker, initargs=(dataset_specs,)) as executor:
+            futures = {executor.submit(run_trial, trial_fn, trial): trial for trial in trials}
+            for future in cf.as_completed(futures):
+                yield futures[future], future.result()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
@@ -9,7 +9,7 @@ from . import common
 def get_datasets(coins: List[str], interval: int) -> pd.DataFrame:
     portfolio_dataset = pd.DataFrame()
     for coin in coins:
-        data = pd.read_csv(f"datasets/raw/{coin}_historical_data_raw.csv")
+        data = common.read_dataset(f"datasets/raw/{coin}_historical_data_raw.csv")
         data = data.iloc[:interval, :] # trim to specified interval
 
         start_date = data.iloc[0,0]
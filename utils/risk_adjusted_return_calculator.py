@@ -89,7 +89,7 @@ def prepare_dataframe(coin: str, interval: int = 365, time_delta: int = 0) -> pd
     '''
     Returns a data frame for specified coin up to the present day minus time_delta.
     '''
-    data = pd.read_csv(f"datasets/raw/{coin}_historical_data_raw.csv")
+    data = common.read_dataset(f"datasets/raw/{coin}_historical_data_raw.csv")
 
     # drop irrelevant columns
     data = data.drop(columns=["market_cap", "volume", "fear_greed"])
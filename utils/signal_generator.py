@@ -35,26 +35,25 @@ FG_30_SMA = FG_3_SMA+7
 RSI = 23
 
 
-def fetch_new_data(n_days: int) -> None:
+def fetch_new_data() -> None:
     '''
-    Uses multithreading to speed up fetching process.
+    Fetches exactly the dates missing from each coin's raw dataset in one batch shared by all coins (see data_aggregator.fetch_missing_data_by_plan).
     '''
-    with cf.ThreadPoolExecutor() as executor:
-        results = [executor.submit(common.aggregate_new_data, coin, n_days) for coin in common.coins]
-        for thread in cf.as_completed(results):
-            print(thread.result())
-
-    with cf.ThreadPoolExecutor() as executor:
-        results = [executor.submit(common.merge_newly_aggregated_data, coin) for coin in common.coins]
-        for thread in cf.as_completed(results):
-            print(thread.result())
+    messages = common.aggregate_missing_data(common.coins)
+    for coin in messages:
+        print(messages[coin])
 
 
 
 def process_individual_coin_new_data(start_date: str, end_date: str, coin: str) -> None:
-    data = pd.read_csv(f"datasets/raw/{coin}_historical_data_raw.csv")
-    data = common.clean_coin_data(coin, data, start_date, end_date)
-    data.to_csv(f"datasets/clean/{coin}_historical_data_clean.csv", index=False)
+    '''
+    NOTE: only the rows added since the last run are processed (see incremental_preprocessor); the whole history is only processed again if it has changed.
+    '''
+    data = common.read_dataset(f"datasets/raw/{coin}_historical_data_raw.csv")
+    data = common.clean_coin_data_incrementally(coin, data, start_date, end_date)
+    if data is None:
+        return f"Missing dates were fetched for {coin}; process the new data again."
+    common.write_dataset(data, f"datasets/clean/{coin}_historical_data_clean.csv")
 
     return f"All new data cleaned for {coin}."
 
@@ -432,16 +431,14 @@ def populate_nn_report(coin: str, data: pd.DataFrame, raw_data: pd.DataFrame, fu
 def generate_signals(full_report: bool, time_delta: int) -> List[str]:
     report = []
     for coin in common.coins:
-        # NOTE: raw_data is used for the SMA ratio calculations as the normalized data cannot adequately capture the ratios' significances
-        data = pd.read_csv(f"datasets/clean/{coin}_historical_data_clean.csv")
-        raw_data = pd.read_csv(f"datasets/raw/{coin}_historical_data_raw_all_features.csv")
-
-        # TODO: retrain models with RSI
-        data = data.drop(columns=["RSI"])
+        day = pd.Timestamp(date.today()-timedelta(time_delta))
+        # only the days since the last run are pushed through the coin's persisted streaming indicators
+        streaming_indicators = common.get_streaming_indicators(coin, day)
 
-        # extracts the most recent data as a python list
-        data = data[data["date"] == str(date.today()-timedelta(time_delta))].values.tolist()[0][1:-1]
-        raw_data = raw_data[raw_data["date"] == str(date.today()-timedelta(time_delta))].values.tolist()[0][1:-1]
+        # NOTE: raw_data is used for the SMA ratio calculations as the normalized data cannot adequately capture the ratios' significances
+        # TODO: retrain models with RSI (which is only in raw_data)
+        data = streaming_indicators.features.tolist()
+        raw_data = streaming_indicators.raw_features.tolist()
 
         # stat report
         if full_report:
@@ -496,10 +493,7 @@ def main() -> None:
     time_delta = int(input("Input #days before today whose report to generate [ex.: 1 if today is Friday and you want Thursday's report]: "))
     fetch_data = input("Fetch most recent daily data? [y/n; only if you haven't already fetched today]: ")
     if (fetch_data.lower())[0] == 'y':
-        days_back = -1
-        while days_back < 0:
-            days_back = int(input("How many days worth of data? [e.g., 5 if you haven't calculated a signal for 5 days]: "))
-        fetch_new_data(days_back)
+        fetch_new_data()
         process_new_data()
 
     # determines signal and creates report